@@ -0,0 +1 @@
+# Benchmarks for the HCM variant pipeline
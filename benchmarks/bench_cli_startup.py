@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+CLI startup benchmark
+Times `python -m src.cli lookup` and `python -m src.cli report` end to end
+(fresh interpreter, small synthetic combined table) against the import that
+every run used to pay: pandas, numpy, requests, matplotlib, seaborn, Bio.PDB
+and scipy, which src.variant_analysis loaded eagerly. Best of --repeat runs.
+Fails if either command takes more than --fraction of that import.
+
+    python benchmarks/bench_cli_startup.py --repeat 5 --fraction 0.5
+"""
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+EAGER_IMPORTS = "import pandas, numpy, requests, matplotlib.pyplot, seaborn, Bio.PDB, scipy.spatial"
+
+
+def synthetic_table(path: Path, n: int = 2000, seed: int = 0) -> None:
+    import pandas as pd
+
+    from src.notation import THREE_LETTER
+
+    rng = np.random.default_rng(seed)
+    pos = rng.integers(1, 1936, n)
+    wt, mut = rng.integers(0, 20, n), rng.integers(0, 20, n)
+    pd.DataFrame({
+        "ProteinChange": [f"{THREE_LETTER[w]}{p}{THREE_LETTER[m]}" for p, w, m in zip(pos, wt, mut)],
+        "VariantKey": pos * 400 + wt * 20 + mut,
+        "Residue": pos,
+        "ClinicalSignificance": rng.choice(["Pathogenic", "Benign", "Uncertain significance"], n),
+        "AlphaMissense_score": rng.random(n),
+        "pLDDT": rng.uniform(30, 98, n),
+        "Rosetta_ddG": np.where(rng.random(n) < 0.1, rng.normal(0, 2, n), np.nan),
+    }).to_parquet(path)
+
+
+def best_of(command, repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        subprocess.run(command, cwd=REPO_ROOT, check=True, stdout=subprocess.DEVNULL)
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--fraction", type=float, default=0.5,
+                        help="Maximum lookup/report time relative to the eager import")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        table = Path(tmp) / "combined.parquet"
+        synthetic_table(table)
+        cli = [sys.executable, "-m", "src.cli", "-q", "--results", tmp]
+        timings = {
+            "interpreter": best_of([sys.executable, "-c", "pass"], args.repeat),
+            "eager imports": best_of([sys.executable, "-c", EAGER_IMPORTS], args.repeat),
+            "import src.variant_analysis": best_of([sys.executable, "-c", "import src.variant_analysis"],
+                                                   args.repeat),
+            "cli lookup": best_of(cli + ["lookup", "Arg403Gln", "--table", str(table)], args.repeat),
+            "cli report": best_of(cli + ["report", "--table", str(table)], args.repeat),
+        }
+
+    reference = timings["eager imports"]
+    print(f"{'command':<28} {'seconds':>8} {'x eager':>8}")
+    for name, seconds in timings.items():
+        print(f"{name:<28} {seconds:>8.3f} {seconds / reference:>8.2f}")
+
+    for name in ("cli lookup", "cli report"):
+        assert timings[name] <= args.fraction * reference, (
+            f"{name} took {timings[name]:.3f}s, more than {args.fraction:.0%} of the eager import ({reference:.3f}s)"
+        )
+
+
+if __name__ == "__main__":
+    main()
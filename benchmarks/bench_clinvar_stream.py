@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+ClinVar ingestion benchmark: throughput and peak RSS
+Compares the streaming reader against the original whole-file read on a
+synthetic multi-million-row variant_summary fixture. Each mode runs in its own
+interpreter so peak RSS is measured in isolation.
+
+    python benchmarks/bench_clinvar_stream.py --rows 3000000
+"""
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def measure(mode: str, fixture: str, chunksize: int) -> dict:
+    """Run one ingestion mode in the current process and report its cost"""
+    import pandas as pd
+    from src.clinvar_stream import CLINVAR_COLUMNS, PROTEIN_CHANGE_PATTERN, read_clinvar_variants
+
+    baseline_rss = _peak_rss_mb()
+    start = time.perf_counter()
+
+    if mode == "stream":
+        vars_df = read_clinvar_variants(fixture, ["MYH7"], chunksize=chunksize)
+    else:
+        # Original path: whole table as strings, then filter
+        clinvar = pd.read_csv(fixture, sep="\t", compression="gzip", dtype=str)
+        mask = (
+            (clinvar.GeneSymbol == "MYH7") &
+            clinvar.Type.str.contains("single nucleotide", na=False) &
+            clinvar.Name.str.contains(r"\(p\.[A-Za-z]{3}\d+[A-Za-z]{3}\)", na=False)
+        )
+        vars_df = clinvar.loc[mask, CLINVAR_COLUMNS].copy()
+        vars_df["ProteinChange"] = vars_df["Name"].str.extract(PROTEIN_CHANGE_PATTERN)
+
+    elapsed = time.perf_counter() - start
+    return {
+        "mode": mode,
+        "seconds": elapsed,
+        "rows_kept": len(vars_df),
+        "baseline_rss_mb": baseline_rss,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=3_000_000)
+    parser.add_argument("--chunksize", type=int, default=250_000)
+    parser.add_argument("--fixture", help="Reuse an existing fixture instead of generating one")
+    parser.add_argument("--skip-eager", action="store_true", help="Only benchmark the streaming reader")
+    parser.add_argument("--measure", choices=["stream", "eager"], help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        print(json.dumps(measure(args.measure, args.fixture, args.chunksize)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixture = args.fixture
+        if fixture is None:
+            from benchmarks.synthetic import write_clinvar_fixture
+            fixture = str(Path(tmp) / "variant_summary.txt.gz")
+            start = time.perf_counter()
+            write_clinvar_fixture(fixture, args.rows)
+            print(f"Generated {args.rows:,}-row fixture in {time.perf_counter() - start:.1f}s")
+
+        size_mb = Path(fixture).stat().st_size / 1e6
+        modes = ["stream"] if args.skip_eager else ["stream", "eager"]
+
+        print(f"{'mode':<8} {'seconds':>8} {'rows/s':>12} {'MB/s (gz)':>10} {'peak RSS MB':>12} {'kept':>8}")
+        for mode in modes:
+            out = subprocess.run(
+                [sys.executable, __file__, "--measure", mode, "--fixture", fixture,
+                 "--chunksize", str(args.chunksize), "--rows", str(args.rows)],
+                capture_output=True, text=True, check=True,
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            print(
+                f"{mode:<8} {result['seconds']:>8.2f} {args.rows / result['seconds']:>12,.0f} "
+                f"{size_mb / result['seconds']:>10.1f} {result['peak_rss_mb']:>12.0f} {result['rows_kept']:>8}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Cropped vs full-structure ddG benchmark
+Runs the same variants through ddg_monomer on the full structure and on
+mutation-site crops at one or more radii, and reports job runtimes, crop sizes
+and how well the cropped ddG values agree with the full-structure ones.
+
+With the default fake executable (runtime proportional to structure size) this
+exercises the harness; point --executable at ddg_monomer for real numbers.
+
+    python benchmarks/bench_ddg_crop.py --variants 24 --radius 10 12 15 --workers 8
+    python benchmarks/bench_ddg_crop.py --executable ./ddg_monomer.linuxgccrelease --mutfile my.txt
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+FAKE_EXECUTABLE = Path(__file__).resolve().parent / "fake_ddg_monomer.py"
+
+
+def sample_tasks(structure: Path, n: int, seed: int = 0):
+    """Random substitutions at residues spread over the structure, with the structure's WT"""
+    from src.notation import AMINO_ACIDS, THREE_LETTER
+    from src.rosetta_executor import DDGTask
+    from src.structure_scan import scan_structure
+
+    three_to_one = {t.upper(): o for o, t in zip(AMINO_ACIDS, THREE_LETTER)}
+    ca = scan_structure(structure)
+    ca = ca[ca["ResName"].isin(three_to_one)]
+    rng = np.random.default_rng(seed)
+    rows = ca.iloc[np.sort(rng.choice(len(ca), size=min(n, len(ca)), replace=False))]
+    tasks = []
+    for row in rows.itertuples():
+        wt = three_to_one[row.ResName]
+        mut = rng.choice([a for a in AMINO_ACIDS if a != wt])
+        tasks.append(DDGTask(row.Chain, int(row.Residue), wt, str(mut)))
+    return tasks
+
+
+def run_mode(executable, structure, tasks, workers, crop, scratch):
+    from src.rosetta_executor import RosettaDDGExecutor
+
+    executor = RosettaDDGExecutor(executable, structure, max_workers=workers, crop=crop,
+                                  scratch_root=scratch)
+    start = time.perf_counter()
+    outcomes = executor.run(tasks)
+    wall = time.perf_counter() - start
+    return wall, outcomes
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--structure", default=str(REPO_ROOT / "MYH7_native.pdb"))
+    parser.add_argument("--mutfile", help="Variants to run (default: random sample from the structure)")
+    parser.add_argument("--variants", type=int, default=16)
+    parser.add_argument("--executable", default=str(FAKE_EXECUTABLE))
+    parser.add_argument("--radius", type=float, nargs="+", default=[10.0, 12.0, 15.0])
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--seconds-per-residue", type=float, default=0.001,
+                        help="Fake executable cost per residue")
+    args = parser.parse_args()
+
+    from src.rosetta_executor import read_mutfile
+    from src.structure_crop import CropOptions
+
+    os.environ.setdefault("FAKE_DDG_SLEEP", "0.05")
+    os.environ.setdefault("FAKE_DDG_SECONDS_PER_RESIDUE", str(args.seconds_per_residue))
+
+    structure = Path(args.structure)
+    tasks = read_mutfile(args.mutfile) if args.mutfile else sample_tasks(structure, args.variants)
+    print(f"{len(tasks)} variants on {structure.name}, {args.workers} workers\n")
+
+    with tempfile.TemporaryDirectory() as scratch:
+        full_wall, full = run_mode(args.executable, structure, tasks, args.workers, None, scratch)
+        full_ddg = np.array([o.ddg for o in full])
+        full_job = np.mean([o.runtime for o in full])
+
+        print(f"{'mode':<12} {'wall s':>8} {'job s':>8} {'speedup':>8} {'residues':>9} "
+              f"{'ok':>4} {'r':>6} {'MAE':>6}")
+        print(f"{'full':<12} {full_wall:>8.2f} {full_job:>8.3f} {'1.0x':>8} {'all':>9} "
+              f"{sum(o.status == 'Success' for o in full):>4} {'':>6} {'':>6}")
+
+        for radius in args.radius:
+            crop = CropOptions(radius=radius)
+            wall, cropped = run_mode(args.executable, structure, tasks, args.workers, crop, scratch)
+            ddg = np.array([o.ddg for o in cropped])
+            both = np.isfinite(ddg) & np.isfinite(full_ddg)
+            r = np.corrcoef(ddg[both], full_ddg[both])[0, 1] if both.sum() > 2 else np.nan
+            mae = np.abs(ddg[both] - full_ddg[both]).mean() if both.any() else np.nan
+            sizes = [o.extra.get("crop_residues", 0) for o in cropped]
+            job = np.mean([o.runtime for o in cropped])
+            print(f"{f'crop {radius:g} Å':<12} {wall:>8.2f} {job:>8.3f} {full_job / job:>7.1f}x "
+                  f"{np.mean(sizes):>9.0f} {sum(o.status == 'Success' for o in cropped):>4} "
+                  f"{r:>6.3f} {mae:>6.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Rosetta ddG executor benchmark: serial vs parallel with a fake ddg_monomer
+Runs the executor against benchmarks/fake_ddg_monomer.py, which sleeps and
+writes a score file, and checks that failures and timeouts are reported in the
+Status column rather than aborting the run.
+
+    python benchmarks/bench_ddg_executor.py --variants 32 --sleep 0.5 --workers 8
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+FAKE_EXECUTABLE = Path(__file__).resolve().parent / "fake_ddg_monomer.py"
+
+
+def make_tasks(n: int):
+    from src.rosetta_executor import DDGTask
+    from src.notation import AMINO_ACIDS
+
+    return [DDGTask("A", 100 + i, AMINO_ACIDS[i % 20], AMINO_ACIDS[(i + 7) % 20]) for i in range(n)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--variants", type=int, default=32)
+    parser.add_argument("--sleep", type=float, default=0.5, help="Fake ddg_monomer runtime (s)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+
+    from src.rosetta_executor import RosettaDDGExecutor
+
+    os.environ["FAKE_DDG_SLEEP"] = str(args.sleep)
+    tasks = make_tasks(args.variants)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        structure = Path(tmp) / "wt.pdb"
+        structure.write_text("END\n")
+
+        timings = {}
+        for workers in (1, args.workers):
+            executor = RosettaDDGExecutor(FAKE_EXECUTABLE, structure, max_workers=workers,
+                                          scratch_root=Path(tmp) / "scratch")
+            start = time.perf_counter()
+            table = executor.run_table(tasks)
+            timings[workers] = time.perf_counter() - start
+            assert (table["Status"] == "Success").all(), table["Status"].value_counts()
+            assert not any((Path(tmp) / "scratch").iterdir()), "scratch dirs left behind"
+            print(f"{workers:>3} workers: {timings[workers]:6.2f}s "
+                  f"({len(tasks) / timings[workers]:.1f} variants/s)")
+        print(f"speedup: {timings[1] / timings[args.workers]:.1f}x")
+
+        # One failing and one hanging variant must come back as Error / Timeout
+        os.environ["FAKE_DDG_FAIL"] = tasks[0].mutfile_line.strip()
+        os.environ["FAKE_DDG_HANG"] = tasks[1].mutfile_line.strip()
+        executor = RosettaDDGExecutor(FAKE_EXECUTABLE, structure, max_workers=args.workers,
+                                      timeout=args.sleep + 2, kill_grace=1)
+        start = time.perf_counter()
+        table = executor.run_table(tasks[:4])
+        print(f"\nfailure handling ({time.perf_counter() - start:.2f}s):")
+        print(table.to_string(index=False))
+        assert table["Status"].iloc[0].startswith("Error")
+        assert table["Status"].iloc[1] == "Timeout"
+
+
+if __name__ == "__main__":
+    main()
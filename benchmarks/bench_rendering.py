@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Figure rendering benchmark
+Renders the analyzer's figures for synthetic combined tables of growing size
+three ways: every point drawn serially (the previous behaviour), through
+render_figures (pre-binned above the point threshold, figures in a process
+pool), and a second render_figures call on unchanged data. Reports seconds
+and the total PNG size.
+
+    python benchmarks/bench_rendering.py --rows 3000 30000 300000
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+
+def synthetic_combined(n: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    significance = np.array(["Pathogenic", "Likely pathogenic", "Uncertain significance", "Benign", None],
+                            dtype=object)
+    return pd.DataFrame({
+        "Residue": rng.integers(1, 1936, n),
+        "pLDDT": rng.uniform(25, 98, n),
+        "AlphaMissense_score": rng.beta(0.6, 0.5, n),
+        "Rosetta_ddG": rng.normal(0.3, 2.0, n),
+        "ClinicalSignificance": rng.choice(significance, n),
+    })
+
+
+def render_points(df: pd.DataFrame, out_dir: Path) -> None:
+    """Every variant as its own marker, one figure after another"""
+    from src.rendering import analysis_figures, draw_figure, prepare_panel
+
+    for spec in analysis_figures():
+        payloads = [prepare_panel(df, panel, threshold=len(df)) for panel in spec.panels]
+        draw_figure(spec, payloads, out_dir / spec.name)
+
+
+def png_megabytes(out_dir: Path) -> float:
+    return sum(path.stat().st_size for path in out_dir.glob("*.png")) / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[3000, 30000, 300000])
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    from src.rendering import analysis_figures, render_figures
+
+    print(f"{'rows':>8} {'points s':>9} {'points MB':>10} {'render s':>9} {'render MB':>10} {'unchanged s':>12}")
+    for n in args.rows:
+        df = synthetic_combined(n)
+        with tempfile.TemporaryDirectory() as points_dir, tempfile.TemporaryDirectory() as render_dir:
+            start = time.perf_counter()
+            render_points(df, Path(points_dir))
+            points = time.perf_counter() - start
+
+            start = time.perf_counter()
+            render_figures(analysis_figures(), df, render_dir, max_workers=args.workers)
+            rendered = time.perf_counter() - start
+
+            start = time.perf_counter()
+            render_figures(analysis_figures(), df, render_dir, max_workers=args.workers)
+            unchanged = time.perf_counter() - start
+
+            print(f"{n:>8} {points:>9.2f} {png_megabytes(Path(points_dir)):>10.1f} {rendered:>9.2f} "
+                  f"{png_megabytes(Path(render_dir)):>10.1f} {unchanged:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
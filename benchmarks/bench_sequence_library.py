@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+"""
+Mutant-sequence library benchmark
+Builds saturation libraries for 1..N synthetic genes of the MYH7 length and
+reports throughput, next to the per-variant list-copy approach of
+create_variants.py. With --memory a second pass under tracemalloc reports
+peak traced memory, to show the streaming builder stays flat while holding
+every sequence does not.
+
+    python benchmarks/bench_sequence_library.py --genes 1 4 16 --format fasta yaml --memory
+"""
+
+import argparse
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+LENGTH = 1935
+
+
+def random_sequences(n: int, length: int = LENGTH, seed: int = 0):
+    from src.notation import AMINO_ACIDS
+
+    rng = np.random.default_rng(seed)
+    letters = np.array(list(AMINO_ACIDS))
+    return [(f"GENE{i + 1}", "".join(rng.choice(letters, length))) for i in range(n)]
+
+
+def list_copy(genes) -> int:
+    """create_variants.create_variant_sequence for every key, keeping the results"""
+    from src.notation import AMINO_ACIDS, decode_keys
+    from src.sequence_library import saturation_keys
+
+    kept = []
+    for _, wt in genes:
+        pos, _, mut = decode_keys(saturation_keys(wt))
+        for p, m in zip(pos, mut):
+            sequence_list = list(wt)
+            sequence_list[p - 1] = AMINO_ACIDS[m]
+            kept.append("".join(sequence_list))
+    return len(kept)
+
+
+def library(genes, formats, per_shard):
+    from src.sequence_library import build_library, saturation_keys
+
+    with tempfile.TemporaryDirectory() as out:
+        return build_library(((gene, wt, saturation_keys(wt)) for gene, wt in genes), out, formats, per_shard)
+
+
+def measure(func, *args, memory: bool = False):
+    """(seconds, result) or, with memory, (peak traced MB, result)"""
+    if memory:
+        tracemalloc.start()
+        result = func(*args)
+        peak = tracemalloc.get_traced_memory()[1] / 1e6
+        tracemalloc.stop()
+        return peak, result
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--genes", type=int, nargs="+", default=[1, 4, 16])
+    parser.add_argument("--format", nargs="+", default=["fasta"])
+    parser.add_argument("--per-shard", type=int, default=2000)
+    parser.add_argument("--memory", action="store_true", help="Also trace peak memory (slow)")
+    args = parser.parse_args()
+
+    header = f"{'genes':>5} {'variants':>9} {'library s':>10} {'var/s':>9} {'list-copy s':>12}"
+    if args.memory:
+        header += f" {'library MB':>11} {'list-copy MB':>13}"
+    print(header)
+    for n_genes in args.genes:
+        genes = random_sequences(n_genes)
+        elapsed, summary = measure(library, genes, args.format, args.per_shard)
+        baseline, _ = measure(list_copy, genes)
+        line = (f"{n_genes:>5} {summary.variants:>9} {elapsed:>10.2f} "
+                f"{summary.variants / elapsed:>9.0f} {baseline:>12.2f}")
+        if args.memory:
+            peak, _ = measure(library, genes, args.format, args.per_shard, memory=True)
+            baseline_peak, _ = measure(list_copy, genes, memory=True)
+            line += f" {peak:>11.1f} {baseline_peak:>13.1f}"
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Stand-in for Rosetta's ddg_monomer used by the executor benchmark
+Sleeps, then writes ``SCORE: ddG <value>`` to the ``-out:file:scorefile`` name
+in the working directory. Behaviour is controlled through the environment:
+
+    FAKE_DDG_SLEEP   seconds to sleep (default 1.0)
+    FAKE_DDG_SECONDS_PER_RESIDUE
+                     extra sleep per residue in the -s structure, so runtime
+                     scales with structure size as it does for ddg_monomer
+    FAKE_DDG_FAIL    exit non-zero when the mutfile mentions this substring
+    FAKE_DDG_HANG    sleep forever when the mutfile mentions this substring
+"""
+
+import os
+import sys
+import time
+import zlib
+
+
+def option(argv, name):
+    return argv[argv.index(name) + 1] if name in argv else None
+
+
+def main():
+    argv = sys.argv[1:]
+    mutfile = option(argv, "-ddg:mutfile")
+    scorefile = option(argv, "-out:file:scorefile") or "score.sc"
+    with open(mutfile) as f:
+        mutation = f.read().strip()
+
+    if os.environ.get("FAKE_DDG_HANG") and os.environ["FAKE_DDG_HANG"] in mutation:
+        while True:
+            time.sleep(60)
+    n_residues = 0
+    structure = option(argv, "-s")
+    if structure and os.path.exists(structure):
+        with open(structure) as f:
+            n_residues = sum(1 for line in f if line.startswith("ATOM") and line[12:16] == " CA ")
+    per_residue = float(os.environ.get("FAKE_DDG_SECONDS_PER_RESIDUE", "0"))
+    time.sleep(float(os.environ.get("FAKE_DDG_SLEEP", "1.0")) + per_residue * n_residues)
+    if os.environ.get("FAKE_DDG_FAIL") and os.environ["FAKE_DDG_FAIL"] in mutation:
+        print(f"fake failure for {mutation}", file=sys.stderr)
+        sys.exit(1)
+
+    # Deterministic pseudo ddG from the substitution, with a small structure-size term
+    chain, pos, wt, mut = mutation.split()
+    ddg = (zlib.crc32(f"{wt}{mut}".encode()) % 1000) / 100 - 2.0 + 1e-4 * n_residues
+    with open(scorefile, "w") as f:
+        f.write(f"SCORE: description ddG {ddg:.3f}\n")
+    print(f"done {mutation}")
+
+
+if __name__ == "__main__":
+    main()
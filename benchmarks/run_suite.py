@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite runner
+Discovers the asv-style classes in benchmarks/suite.py, times every `time_*`
+method at every scale (best and median of --repeat calls after setup), and
+stores the results as benchmarks/results/<machine>/<commit>.json. Runs on the
+same commit are merged, so scales can be added incrementally. Each run is
+compared with the nearest ancestor commit that has results on this machine;
+slowdowns beyond --threshold are flagged (and fail the run with
+--fail-on-regression).
+
+    python benchmarks/run_suite.py --scales 1 10 100
+    HCM_BENCH_MAX_SCALE=1000 python benchmarks/run_suite.py --bench Combine --scales 1000
+"""
+
+import argparse
+import inspect
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+RESULTS_DIR = REPO_ROOT / "benchmarks" / "results"
+
+
+def git(*args: str) -> str:
+    return subprocess.run(["git", *args], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def discover(pattern: Optional[str] = None) -> List[type]:
+    from benchmarks import suite
+
+    classes = []
+    for name, cls in inspect.getmembers(suite, inspect.isclass):
+        if name.startswith("_") or cls.__module__ != suite.__name__:
+            continue
+        if pattern and pattern.lower() not in name.lower():
+            continue
+        classes.append(cls)
+    return classes
+
+
+def time_class(cls: type, scales: List[int], repeat: int) -> Dict[str, Dict[str, Optional[dict]]]:
+    """{"Class.time_x": {scale: {"min", "median", "repeat"} or None if skipped}}"""
+    methods = [name for name in dir(cls) if name.startswith("time_")]
+    results: Dict[str, Dict[str, Optional[dict]]] = {f"{cls.__name__}.{m}": {} for m in methods}
+    for scale in scales:
+        if scale not in cls.params:
+            continue
+        bench = cls()
+        try:
+            bench.setup(scale)
+        except NotImplementedError as e:
+            print(f"  {cls.__name__} {scale}x: skipped ({e})")
+            for method in methods:
+                results[f"{cls.__name__}.{method}"][str(scale)] = None
+            continue
+        try:
+            for method in methods:
+                times = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    getattr(bench, method)(scale)
+                    times.append(time.perf_counter() - start)
+                entry = {"min": min(times), "median": statistics.median(times), "repeat": repeat}
+                results[f"{cls.__name__}.{method}"][str(scale)] = entry
+                print(f"  {cls.__name__}.{method} {scale}x: {entry['min']:.4f}s")
+        finally:
+            if hasattr(bench, "teardown"):
+                bench.teardown(scale)
+    return results
+
+
+def environment() -> dict:
+    import numpy
+    import pandas
+    import pyarrow
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpus": os.cpu_count(),
+        "packages": {"numpy": numpy.__version__, "pandas": pandas.__version__, "pyarrow": pyarrow.__version__},
+    }
+
+
+def save(machine_dir: Path, commit: str, results: dict) -> Path:
+    """Merge into the commit's result file"""
+    machine_dir.mkdir(parents=True, exist_ok=True)
+    path = machine_dir / f"{commit}.json"
+    stored = json.loads(path.read_text()) if path.exists() else {"results": {}}
+    for name, by_scale in results.items():
+        stored["results"].setdefault(name, {}).update(by_scale)
+    stored.update(
+        commit=commit,
+        dirty=bool(git("status", "--porcelain", "--untracked-files=no")),
+        date=time.strftime("%Y-%m-%dT%H:%M:%S"),
+        subject=git("log", "-1", "--format=%s", commit),
+        environment=environment(),
+    )
+    path.write_text(json.dumps(stored, indent=2, sort_keys=True))
+    return path
+
+
+def previous_results(machine_dir: Path, commit: str) -> Optional[dict]:
+    """Results of the nearest ancestor commit measured on this machine"""
+    for ancestor in git("rev-list", "--max-count=500", f"{commit}~1").splitlines():
+        path = machine_dir / f"{ancestor[:12]}.json"
+        if path.exists():
+            return json.loads(path.read_text())
+    return None
+
+
+def compare(current: dict, previous: dict, threshold: float) -> int:
+    """Print current vs previous; returns the number of regressions"""
+    print(f"\nCompared with {previous['commit']} ({previous.get('subject', '')})")
+    print(f"{'benchmark':<46} {'scale':>6} {'before s':>10} {'after s':>10} {'ratio':>7}")
+    regressions = 0
+    for name, by_scale in sorted(current.items()):
+        for scale, entry in by_scale.items():
+            before = previous["results"].get(name, {}).get(scale)
+            if entry is None or before is None:
+                continue
+            ratio = entry["min"] / before["min"]
+            flag = ""
+            if ratio > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            elif ratio < 1 / threshold:
+                flag = "  faster"
+            print(f"{name:<46} {scale + 'x':>6} {before['min']:>10.4f} {entry['min']:>10.4f} {ratio:>7.2f}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--bench", help="Only classes whose name contains this")
+    parser.add_argument("--scales", type=int, nargs="+", default=[1, 10, 100])
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--machine", default=socket.gethostname())
+    parser.add_argument("--threshold", type=float, default=1.2, help="Slowdown ratio flagged as a regression")
+    parser.add_argument("--no-save", action="store_true")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+
+    import logging
+    logging.disable(logging.INFO)
+
+    commit = git("rev-parse", "--short=12", "HEAD")
+    results = {}
+    for cls in discover(args.bench):
+        print(cls.__name__)
+        results.update(time_class(cls, args.scales, args.repeat))
+
+    machine_dir = RESULTS_DIR / args.machine
+    if not args.no_save:
+        print(f"\nResults saved to {save(machine_dir, commit, results)}")
+
+    previous = previous_results(machine_dir, commit)
+    regressions = compare(results, previous, args.threshold) if previous else 0
+    if previous is None:
+        print("\nNo earlier results on this machine to compare with")
+    if regressions and args.fail_on_regression:
+        sys.exit(f"{regressions} benchmarks slowed down by more than {args.threshold}x")
+
+
+if __name__ == "__main__":
+    main()
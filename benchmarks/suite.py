@@ -0,0 +1,202 @@
+"""
+Scaled pipeline benchmark suite
+asv-style classes: `params` lists the scales (x the MYH7 workload), `setup`
+builds or loads the synthetic inputs and raises NotImplementedError to skip
+a scale, and every `time_*` method is one timed operation. run_suite.py
+discovers and times them and stores the results per commit.
+
+Scales above a class's max_scale are skipped unless HCM_BENCH_MAX_SCALE is
+raised (1000x inputs take gigabytes of disk and minutes to generate).
+"""
+
+import os
+import tempfile
+from pathlib import Path
+
+from .synthetic import SCALES, fixture, synthetic_tables
+
+
+def _check_scale(scale: int, max_scale: int) -> None:
+    limit = int(os.environ.get("HCM_BENCH_MAX_SCALE", max_scale))
+    if scale > limit:
+        raise NotImplementedError(f"scale {scale}x is above the limit {limit}x")
+
+
+def _analyzer(tmp: str):
+    from src.variant_analysis import MYH7VariantAnalyzer
+
+    return MYH7VariantAnalyzer(data_dir=os.path.join(tmp, "data"), results_dir=os.path.join(tmp, "results"))
+
+
+def _in_memory_analyzer(tmp: str, tables):
+    """Analyzer whose sources come from memory, so only the merges are timed"""
+    analyzer = _analyzer(tmp)
+    am = tables["alphamissense"]
+    analyzer.fetch_clinvar_variants = lambda **kwargs: tables["clinvar"]
+    analyzer.fetch_alphamisense_scores = lambda columns=None, **kwargs: am if columns is None else am[columns]
+    analyzer.extract_alphafold_plddt = lambda **kwargs: tables["plddt"]
+    analyzer.extract_structural_features = lambda **kwargs: tables["features"]
+    return analyzer
+
+
+class ClinVarFilter:
+    """Streaming variant_summary read filtered to MYH7"""
+    params = SCALES
+    param_names = ["scale"]
+    max_scale = 100
+
+    def setup(self, scale):
+        _check_scale(scale, self.max_scale)
+        self.path = fixture("clinvar", scale)
+
+    def time_read_clinvar_variants(self, scale):
+        from src.clinvar_stream import read_clinvar_variants
+
+        read_clinvar_variants(self.path, ["MYH7"])
+
+
+class AlphaMissenseParse:
+    """Raw AlphaMissense rows to the keyed three-letter table"""
+    params = SCALES
+    param_names = ["scale"]
+    max_scale = 100
+
+    def setup(self, scale):
+        import pandas as pd
+
+        _check_scale(scale, self.max_scale)
+        self.path = fixture("alphamissense", scale)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.analyzer = _analyzer(self.tmp.name)
+        self.raw = pd.read_csv(self.path, sep="\t", comment="#", names=["uniprot", "variant", "score", "class"])
+
+    def teardown(self, scale):
+        self.tmp.cleanup()
+
+    def time_read(self, scale):
+        import pandas as pd
+
+        pd.read_csv(self.path, sep="\t", comment="#", names=["uniprot", "variant", "score", "class"])
+
+    def time_format(self, scale):
+        self.analyzer._format_alphamissense(self.raw)
+
+
+class PLDDTExtraction:
+    """pLDDT from MYH7_native.pdb tiled scale times"""
+    params = SCALES
+    param_names = ["scale"]
+    max_scale = 100
+
+    def setup(self, scale):
+        _check_scale(scale, self.max_scale)
+        self.path = fixture("pdb", scale)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.analyzer = _analyzer(self.tmp.name)
+
+    def teardown(self, scale):
+        self.tmp.cleanup()
+
+    def time_extract_plddt(self, scale):
+        self.analyzer._extract_plddt(str(self.path))
+
+
+class Combine:
+    """combine_data's merges over in-memory source tables"""
+    params = SCALES
+    param_names = ["scale"]
+    max_scale = 100
+
+    def setup(self, scale):
+        from src.table_cache import write_table
+
+        _check_scale(scale, self.max_scale)
+        tables = synthetic_tables(scale)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.analyzer = _in_memory_analyzer(self.tmp.name, tables)
+        write_table(tables["rosetta"], self.analyzer.results_dir / "rosetta_ddg_results.parquet", "rosetta")
+
+    def teardown(self, scale):
+        self.tmp.cleanup()
+
+    def time_combine(self, scale):
+        self.analyzer._combine()
+
+
+class _CombinedTable:
+    params = SCALES
+    param_names = ["scale"]
+    max_scale = 100
+
+    def setup(self, scale):
+        _check_scale(scale, self.max_scale)
+        self.tmp = tempfile.TemporaryDirectory()
+        self.combined = _in_memory_analyzer(self.tmp.name, synthetic_tables(scale))._combine()
+
+    def teardown(self, scale):
+        self.tmp.cleanup()
+
+
+class SummaryReport(_CombinedTable):
+    """Markdown report over the combined table"""
+
+    def time_summary_report(self, scale):
+        from src.report import summary_report
+
+        summary_report(self.combined, "MYH7")
+
+
+class SummaryStatistics(_CombinedTable):
+    """stats_engine over the combined table, overall and per functional site"""
+
+    def time_compute_stats(self, scale):
+        from src.stats_engine import compute_stats, variant_stats_spec
+
+        compute_stats(self.combined, variant_stats_spec())
+
+    def time_compute_stats_by_site(self, scale):
+        from src.stats_engine import compute_stats, variant_stats_spec
+
+        compute_stats(self.combined, variant_stats_spec(), by="Nearest_site")
+
+
+class FigureRendering(_CombinedTable):
+    """The analyzer's figures, always re-rendered"""
+
+    def time_render_figures(self, scale):
+        from src.rendering import analysis_figures, render_figures
+
+        render_figures(analysis_figures(), self.combined, Path(self.tmp.name) / "figures", force=True)
+
+
+class CorrelationResampling:
+    """10,000 bootstrap and permutation resamples of scale x 5,710 AM-ddG pairs"""
+    params = SCALES
+    param_names = ["scale"]
+    max_scale = 1
+    n_resamples = 10_000
+
+    def setup(self, scale):
+        import numpy as np
+
+        _check_scale(scale, self.max_scale)
+        rng = np.random.default_rng(0)
+        n = 5_710 * scale
+        # AlphaMissense scores carry 4 decimals, so x has ties like the real table
+        self.x = rng.beta(0.6, 0.6, n).round(4)
+        self.y = rng.gamma(2.0, 1.5, n) - 1.0
+
+    def time_bootstrap_pearson(self, scale):
+        from src.resampling import bootstrap_distribution
+
+        bootstrap_distribution(self.x, self.y, ("pearson",), self.n_resamples)
+
+    def time_bootstrap_spearman(self, scale):
+        from src.resampling import bootstrap_distribution
+
+        bootstrap_distribution(self.x, self.y, ("spearman",), self.n_resamples)
+
+    def time_permutation(self, scale):
+        from src.resampling import permutation_distribution
+
+        permutation_distribution(self.x, self.y, n_resamples=self.n_resamples)
@@ -0,0 +1,223 @@
+"""
+Synthetic input generators for benchmarks
+Writes ClinVar-, AlphaMissense- and PDB-shaped fixtures of arbitrary size
+without touching the network, and builds the in-memory tables combine_data
+merges. Sizes are given as a scale factor of the MYH7 workload (1x, 10x,
+100x, 1000x); generated files are kept in FIXTURE_DIR between runs.
+"""
+
+import gzip
+import os
+import tempfile
+from pathlib import Path
+from typing import Dict, Sequence, Union
+
+import numpy as np
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+SCALES = (1, 10, 100, 1000)
+MYH7_LENGTH = 1935
+MYH7_CLINVAR_ROWS = 6000  # MYH7 submissions in variant_summary, roughly
+CLINVAR_ROWS_PER_SCALE = 60_000  # dump rows per 1x; 100x is about the full variant_summary
+FIXTURE_DIR = Path(os.environ.get("HCM_BENCH_FIXTURES", Path(tempfile.gettempdir()) / "hcm_bench_fixtures"))
+
+AMINO_ACIDS_3 = [
+    "Ala", "Arg", "Asn", "Asp", "Cys", "Gln", "Glu", "Gly", "His", "Ile",
+    "Leu", "Lys", "Met", "Phe", "Pro", "Ser", "Thr", "Trp", "Tyr", "Val",
+]
+
+# Header of variant_summary.txt.gz; only four of these columns are ever read
+CLINVAR_HEADER = [
+    "#AlleleID", "Type", "Name", "GeneID", "GeneSymbol", "HGNC_ID",
+    "ClinicalSignificance", "ClinSigSimple", "LastEvaluated", "RS# (dbSNP)",
+    "nsv/esv (dbVar)", "RCVaccession", "PhenotypeIDS", "PhenotypeList", "Origin",
+    "OriginSimple", "Assembly", "ChromosomeAccession", "Chromosome", "Start",
+    "Stop", "ReferenceAllele", "AlternateAllele", "Cytogenetic", "ReviewStatus",
+    "NumberSubmitters", "Guidelines", "TestedInGTR", "OtherIDs",
+    "SubmitterCategories", "VariationID", "PositionVCF", "ReferenceAlleleVCF",
+    "AlternateAlleleVCF",
+]
+
+BACKGROUND_GENES = ["TTN", "BRCA1", "BRCA2", "APC", "NF1", "ATM", "SCN5A", "KCNQ1"]
+VARIANT_TYPES = ["single nucleotide variant", "Deletion", "Duplication", "Indel"]
+SIGNIFICANCE = [
+    "Pathogenic", "Likely pathogenic", "Uncertain significance",
+    "Likely benign", "Benign", "Conflicting classifications of pathogenicity",
+]
+
+
+def write_clinvar_fixture(
+    path: Union[str, Path],
+    n_rows: int,
+    genes: Sequence[str] = ("MYH7",),
+    gene_fraction: float = 0.002,
+    seed: int = 0,
+    block_rows: int = 100_000,
+) -> Path:
+    """Write a gzipped variant_summary-shaped table with ``n_rows`` data rows"""
+    path = Path(path)
+    rng = np.random.default_rng(seed)
+    filler = "\t".join(["-"] * (len(CLINVAR_HEADER) - 7))
+
+    with gzip.open(path, "wt", compresslevel=1) as f:
+        f.write("\t".join(CLINVAR_HEADER) + "\n")
+
+        written = 0
+        while written < n_rows:
+            n = min(block_rows, n_rows - written)
+            target = rng.random(n) < gene_fraction
+            gene_idx = rng.integers(0, len(genes), n)
+            background_idx = rng.integers(0, len(BACKGROUND_GENES), n)
+            type_idx = rng.integers(0, len(VARIANT_TYPES), n)
+            sig_idx = rng.integers(0, len(SIGNIFICANCE), n)
+            positions = rng.integers(1, 2000, n)
+            wt_idx = rng.integers(0, 20, n)
+            mut_idx = rng.integers(0, 20, n)
+
+            lines = []
+            for i in range(n):
+                gene = genes[gene_idx[i]] if target[i] else BACKGROUND_GENES[background_idx[i]]
+                change = f"{AMINO_ACIDS_3[wt_idx[i]]}{positions[i]}{AMINO_ACIDS_3[mut_idx[i]]}"
+                name = f"NM_000000.1({gene}):c.{positions[i] * 3}G>A (p.{change})"
+                lines.append(
+                    f"{written + i}\t{VARIANT_TYPES[type_idx[i]]}\t{name}\t0\t{gene}\t-\t"
+                    f"{SIGNIFICANCE[sig_idx[i]]}\t{filler}\n"
+                )
+            f.write("".join(lines))
+            written += n
+
+    return path
+
+
+def _saturation(length: int, seed: int):
+    """Position, wild-type and mutant indices of every substitution of a random protein"""
+    rng = np.random.default_rng(seed)
+    wt_seq = rng.integers(0, 20, length)
+    pos = np.repeat(np.arange(1, length + 1), 19)
+    wt = wt_seq[pos - 1]
+    # The 19 non-wild-type residues at each position
+    offset = np.tile(np.arange(1, 20), length)
+    mut = (wt + offset) % 20
+    return pos, wt, mut, wt_seq
+
+
+def write_alphamissense_fixture(path: Union[str, Path], scale: int, seed: int = 0) -> Path:
+    """AlphaMissense_aa_substitutions-shaped TSV for a protein scale x the MYH7 length"""
+    import pandas as pd
+
+    from src.notation import ONE_LETTER
+
+    path = Path(path)
+    rng = np.random.default_rng(seed)
+    pos, wt, mut, _ = _saturation(MYH7_LENGTH * scale, seed)
+    score = rng.beta(0.6, 0.5, len(pos)).round(4)
+    table = pd.DataFrame({
+        "uniprot_id": "P12883",
+        "protein_variant": pd.Series(ONE_LETTER[wt]) + pd.Series(pos).astype(str) + pd.Series(ONE_LETTER[mut]),
+        "am_pathogenicity": score,
+        "am_class": np.where(score > 0.564, "likely_pathogenic",
+                             np.where(score < 0.34, "likely_benign", "ambiguous")),
+    })
+    with gzip.open(path, "wt", compresslevel=1) as f:
+        f.write("# Synthetic AlphaMissense fixture\n")
+        table.to_csv(f, sep="\t", index=False, header=False)
+    return path
+
+
+def write_pdb_fixture(path: Union[str, Path], scale: int, template: Union[str, Path] = None,
+                      seed: int = 0) -> Path:
+    """MYH7_native.pdb's ATOM records tiled scale times with fresh chain ids and pLDDT values"""
+    template = Path(template or REPO_ROOT / "MYH7_native.pdb")
+    lines = [line for line in template.read_bytes().splitlines() if line.startswith(b"ATOM")]
+    block = np.frombuffer(b"".join(line.ljust(80)[:80] for line in lines), dtype=np.uint8).reshape(-1, 80)
+    chains = np.frombuffer(b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789", dtype=np.uint8)
+    rng = np.random.default_rng(seed)
+
+    with open(path, "wb") as f:
+        for copy in range(scale):
+            tiled = block.copy()
+            tiled[:, 21] = chains[copy % len(chains)]
+            # New B-factors (pLDDT) per copy so every tile is parsed, not just repeated
+            bfactor = np.char.mod("%6.2f", rng.uniform(20, 98, len(tiled))).astype("S6")
+            tiled[:, 60:66] = np.frombuffer(bfactor.tobytes(), dtype=np.uint8).reshape(-1, 6)
+            f.write(np.hstack([tiled, np.full((len(tiled), 1), ord("\n"), dtype=np.uint8)]).tobytes())
+        f.write(b"END\n")
+    return Path(path)
+
+
+def synthetic_tables(scale: int, seed: int = 0) -> Dict[str, "pd.DataFrame"]:
+    """Schema-typed clinvar / alphamissense / plddt / features / rosetta tables for combine"""
+    import pandas as pd
+
+    from src.notation import THREE_LETTER
+    from src.table_cache import SCHEMAS, apply_schema
+
+    rng = np.random.default_rng(seed)
+    length = MYH7_LENGTH * scale
+    pos, wt, mut, wt_seq = _saturation(length, seed)
+    keys = pos * 400 + wt * 20 + mut
+    score = rng.beta(0.6, 0.5, len(keys))
+    alphamissense = apply_schema(pd.DataFrame({
+        "ProteinChange": pd.Series(THREE_LETTER[wt]) + pd.Series(pos).astype(str) + pd.Series(THREE_LETTER[mut]),
+        "VariantKey": keys,
+        "score": score,
+        "class": np.where(score > 0.564, "likely_pathogenic", np.where(score < 0.34, "likely_benign", "ambiguous")),
+    }), "alphamissense")
+
+    # ClinVar: repeated submissions of a subset of the substitutions
+    n = MYH7_CLINVAR_ROWS * scale
+    picked = rng.integers(0, len(keys), n)
+    clinvar = apply_schema(pd.DataFrame({
+        "GeneSymbol": "MYH7",
+        "Type": "single nucleotide variant",
+        "Name": alphamissense["ProteinChange"].to_numpy()[picked],
+        "ClinicalSignificance": np.array(SIGNIFICANCE)[rng.integers(0, len(SIGNIFICANCE), n)],
+        "ProteinChange": alphamissense["ProteinChange"].to_numpy()[picked],
+        "Residue": pos[picked],
+        "VariantKey": keys[picked],
+    }), "clinvar")
+
+    residues = np.arange(1, length + 1)
+    plddt = apply_schema(pd.DataFrame({"Residue": residues, "pLDDT": rng.uniform(20, 98, length)}), "plddt")
+    features = {"Residue": residues}
+    for column, dtype in SCHEMAS["features"].items():
+        if column == "Residue":
+            continue
+        if dtype == "int16":
+            features[column] = rng.integers(0, 40, length)
+        elif dtype == "category":
+            features[column] = np.array(["P-loop", "Switch-1", "Converter"])[rng.integers(0, 3, length)]
+        else:
+            features[column] = rng.random(length)
+    features = apply_schema(pd.DataFrame(features), "features")
+
+    # Three ddG replicates for the top 20 variants per 1x
+    top = np.argsort(-score)[:20 * scale]
+    rosetta = apply_schema(pd.DataFrame({
+        "ProteinChange": np.repeat(alphamissense["ProteinChange"].to_numpy()[top], 3),
+        "VariantKey": np.repeat(keys[top], 3),
+        "Rosetta_ddG": rng.normal(0.5, 2.0, 3 * len(top)),
+        "Status": "Success",
+    }), "rosetta")
+    return {"clinvar": clinvar, "alphamissense": alphamissense, "plddt": plddt,
+            "features": features, "rosetta": rosetta}
+
+
+def fixture(kind: str, scale: int, seed: int = 0) -> Path:
+    """Path of a generated clinvar / alphamissense / pdb fixture, written on first use"""
+    FIXTURE_DIR.mkdir(parents=True, exist_ok=True)
+    suffix = {"clinvar": "tsv.gz", "alphamissense": "tsv.gz", "pdb": "pdb"}[kind]
+    path = FIXTURE_DIR / f"{kind}_{scale}x_seed{seed}.{suffix}"
+    if path.exists():
+        return path
+    tmp = path.with_name(path.name + ".tmp")
+    if kind == "clinvar":
+        rows = CLINVAR_ROWS_PER_SCALE * scale
+        write_clinvar_fixture(tmp, rows, gene_fraction=MYH7_CLINVAR_ROWS / CLINVAR_ROWS_PER_SCALE, seed=seed)
+    elif kind == "alphamissense":
+        write_alphamissense_fixture(tmp, scale, seed)
+    else:
+        write_pdb_fixture(tmp, scale, seed=seed)
+    os.replace(tmp, path)
+    return path
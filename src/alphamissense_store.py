@@ -0,0 +1,136 @@
+"""
+Indexed local AlphaMissense store
+One-time builder that turns a local AlphaMissense_aa_substitutions.tsv.gz into
+a block-gzip file partitioned by UniProt accession plus a byte-offset index.
+Fetching a protein afterwards is a seek and a read of only its blocks.
+"""
+
+import argparse
+import gzip
+import io
+import json
+import logging
+import os
+import zlib
+from pathlib import Path
+from typing import Dict, Iterable, List, Union
+
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+DATA_FILE = "alphamissense.tsv.bgz"
+INDEX_FILE = "alphamissense.index.json"
+COLUMNS = ["uniprot", "variant", "score", "class"]
+
+# Flush a block at an accession boundary or once it grows past this size,
+# so very long proteins (e.g. titin) do not inflate the builder's memory
+MAX_BLOCK_BYTES = 4 << 20
+
+
+def build_alphamissense_store(source: Union[str, Path], store_dir: Union[str, Path]) -> Path:
+    """Partition an AlphaMissense dump by accession into an indexed block-gzip store"""
+    store_dir = Path(store_dir)
+    store_dir.mkdir(parents=True, exist_ok=True)
+    data_path = store_dir / DATA_FILE
+
+    index: Dict[str, List[List[int]]] = {}
+    n_rows = 0
+
+    logger.info(f"Building AlphaMissense store from {source}...")
+    with gzip.open(source, "rb") as src, open(data_path, "wb") as out:
+        block: List[bytes] = []
+        block_bytes = 0
+        block_rows = 0
+        current = None
+
+        def flush():
+            nonlocal block, block_bytes, block_rows
+            if not block:
+                return
+            payload = gzip.compress(b"".join(block), compresslevel=6)
+            index.setdefault(current, []).append([out.tell(), len(payload), block_rows])
+            out.write(payload)
+            block, block_bytes, block_rows = [], 0, 0
+
+        for line in src:
+            if line.startswith(b"#") or line.startswith(b"uniprot_id"):
+                continue
+            accession, _, rest = line.partition(b"\t")
+            accession = accession.decode()
+            if accession != current or block_bytes >= MAX_BLOCK_BYTES:
+                flush()
+                current = accession
+            block.append(rest)
+            block_bytes += len(rest)
+            block_rows += 1
+            n_rows += 1
+        flush()
+
+    # Write the index last and atomically; a store without it is incomplete
+    tmp_index = store_dir / (INDEX_FILE + ".tmp")
+    with open(tmp_index, "w") as f:
+        json.dump({"source": str(source), "rows": n_rows, "accessions": index}, f)
+    os.replace(tmp_index, store_dir / INDEX_FILE)
+
+    logger.info(f"Indexed {n_rows} substitutions across {len(index)} accessions")
+    return store_dir
+
+
+class AlphaMissenseStore:
+    """Read-only accessor for a store written by build_alphamissense_store"""
+
+    def __init__(self, store_dir: Union[str, Path]):
+        self.store_dir = Path(store_dir)
+        with open(self.store_dir / INDEX_FILE) as f:
+            meta = json.load(f)
+        self.index: Dict[str, List[List[int]]] = meta["accessions"]
+        self.n_rows = meta["rows"]
+
+    @staticmethod
+    def exists(store_dir: Union[str, Path]) -> bool:
+        return (Path(store_dir) / INDEX_FILE).exists()
+
+    def __contains__(self, accession: str) -> bool:
+        return accession in self.index
+
+    def fetch(self, accession: str) -> pd.DataFrame:
+        """Return the substitutions for one accession"""
+        return self.fetch_many([accession])
+
+    def fetch_many(self, accessions: Iterable[str]) -> pd.DataFrame:
+        """Return the substitutions for several accessions in one table"""
+        frames = []
+        with open(self.store_dir / DATA_FILE, "rb") as f:
+            for accession in accessions:
+                blocks = self.index.get(accession, [])
+                if not blocks:
+                    logger.warning(f"No AlphaMissense rows for {accession}")
+                    continue
+                raw = []
+                for offset, length, _ in blocks:
+                    f.seek(offset)
+                    raw.append(zlib.decompress(f.read(length), wbits=31))
+                frame = pd.read_csv(
+                    io.BytesIO(b"".join(raw)), sep="\t", names=COLUMNS[1:]
+                )
+                frame.insert(0, "uniprot", accession)
+                frames.append(frame)
+
+        if not frames:
+            return pd.DataFrame(columns=COLUMNS)
+        return pd.concat(frames, ignore_index=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build an indexed AlphaMissense store")
+    parser.add_argument("source", help="Local AlphaMissense_aa_substitutions.tsv.gz")
+    parser.add_argument("store_dir", nargs="?", default="data/variants/alphamissense_store")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    build_alphamissense_store(args.source, args.store_dir)
+
+
+if __name__ == "__main__":
+    main()
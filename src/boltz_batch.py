@@ -0,0 +1,324 @@
+"""
+Sharded Boltz-2 input generation
+Builds mutant sequences for a ranked variant table, checks every variant's
+wild-type residue against the reference sequence and writes the Boltz YAML
+inputs into shard directories. Each shard holds as many variants as fit in one
+GPU job's wall time after the one-off model load, and is predicted by a single
+`boltz predict <shard_dir>` process, so weights and caches are loaded once per
+shard instead of once per variant. A SLURM array script runs one shard per
+array task.
+
+    python -m src.boltz_batch results/MYH7_variants_comprehensive.parquet \\
+        --sequence MYH7.fasta --top 200 --out boltz_shards --wall-time 4:00:00
+    sbatch boltz_shards/boltz_shards.job  # one array task per shard
+"""
+
+import argparse
+import logging
+import math
+import re
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .dedup import unique_variants, with_variant_key
+from .notation import AMINO_ACIDS, INVALID_KEY, decode_keys, format_variants
+
+logger = logging.getLogger(__name__)
+
+MANIFEST = "manifest.csv"
+JOB_SCRIPT = "boltz_shards.job"
+
+PathLike = Union[str, Path]
+
+AA_BYTES = np.frombuffer(AMINO_ACIDS.encode(), dtype=np.uint8)
+
+
+def parse_wall_time(value: str) -> float:
+    """SLURM time string ([days-]hours:minutes[:seconds] or minutes) in minutes"""
+    days = 0
+    if "-" in value:
+        day_part, value = value.split("-", 1)
+        days = int(day_part)
+    parts = [float(p) for p in value.split(":")]
+    if len(parts) == 1:
+        minutes = parts[0]
+    elif len(parts) == 2:
+        minutes = parts[0] * 60 + parts[1]
+    else:
+        minutes = parts[0] * 60 + parts[1] + parts[2] / 60
+    return days * 24 * 60 + minutes
+
+
+def format_wall_time(minutes: float) -> str:
+    minutes = int(math.ceil(minutes))
+    return f"{minutes // 60}:{minutes % 60:02d}:00"
+
+
+@dataclass(frozen=True)
+class ShardPlan:
+    """How many variants one GPU job can predict within its wall time"""
+    wall_time: float = 240.0  # minutes, as requested from SLURM (boltz_production.job: 4:00:00)
+    load_minutes: float = 10.0  # staging, weight and cache load, once per job
+    minutes_per_variant: float = 30.0  # one full-length prediction (~1,935 residues for MYH7)
+    safety: float = 0.85  # fraction of the wall time the plan may use
+    max_variants: Optional[int] = None
+
+    def variants_per_shard(self) -> int:
+        usable = self.wall_time * self.safety - self.load_minutes
+        per_shard = max(1, int(usable // self.minutes_per_variant))
+        if usable < self.minutes_per_variant:
+            logger.warning(
+                f"Wall time {format_wall_time(self.wall_time)} leaves {usable:.0f} min after loading; "
+                f"one {self.minutes_per_variant:.0f} min prediction per shard may not finish"
+            )
+        return min(per_shard, self.max_variants) if self.max_variants else per_shard
+
+
+def read_sequence(source: PathLike) -> str:
+    """Protein sequence from a FASTA file, a Boltz YAML, a plain text file or a literal string"""
+    text = str(source)
+    path = Path(text)
+    if len(text) < 4096 and path.exists():
+        text = path.read_text()
+        if path.suffix in (".yaml", ".yml"):
+            text = _yaml_sequence(text, path)
+        elif text.lstrip().startswith(">"):
+            records = text.lstrip().split("\n>")
+            if len(records) > 1:
+                logger.warning(f"{path} has {len(records)} records; using the first")
+            text = records[0].split("\n", 1)[1] if "\n" in records[0] else ""
+    sequence = "".join(text.split()).upper()
+    invalid = set(sequence) - set(AMINO_ACIDS)
+    if not sequence or invalid:
+        raise ValueError(f"Not a protein sequence (unexpected characters {sorted(invalid)})")
+    return sequence
+
+
+def _yaml_sequence(text: str, path: Path) -> str:
+    """First "sequence:" value of a Boltz YAML, inline or as a folded block"""
+    lines = text.splitlines()
+    for i, line in enumerate(lines):
+        key, _, value = line.partition(":")
+        if key.strip().lstrip("- ") != "sequence":
+            continue
+        value = value.strip().lstrip(">|").rstrip("-+").strip()
+        parts = [value] if value else []
+        for follow in lines[i + 1:]:
+            if not re.fullmatch(r"\s+[A-Za-z]+\s*", follow):
+                break
+            parts.append(follow.strip())
+        return "".join(parts)
+    raise ValueError(f"No protein sequence found in {path}")
+
+
+def check_wild_type(keys: np.ndarray, sequence: str) -> np.ndarray:
+    """Boolean mask of variant keys whose position and wild-type residue match the sequence"""
+    keys = np.asarray(keys, dtype=np.int64)
+    pos, wt, _ = decode_keys(keys)
+    inside = (keys != INVALID_KEY) & (pos >= 1) & (pos <= len(sequence))
+    seq = np.frombuffer(sequence.encode(), dtype=np.uint8)
+    observed = seq[np.where(inside, pos - 1, 0)]
+    return inside & (observed == AA_BYTES[np.where(inside, wt, 0)])
+
+
+def mutant_sequences(variants: pd.DataFrame, sequence: str, on_mismatch: str = "raise") -> pd.DataFrame:
+    """One row per unique variant with its Boltz record name and full mutant sequence
+
+    Variants whose wild-type residue does not match the reference raise a
+    ValueError listing them, or are dropped with a warning (on_mismatch="drop").
+    """
+    variants, _ = unique_variants(with_variant_key(variants))
+    missense = variants["VariantKey"] != INVALID_KEY
+    if not missense.all():
+        logger.warning(f"Skipping {(~missense).sum()} variants that are not missense substitutions")
+        variants = variants[missense].reset_index(drop=True)
+    keys = variants["VariantKey"].to_numpy(dtype=np.int64)
+    ok = check_wild_type(keys, sequence)
+    if not ok.all():
+        bad = variants.loc[~ok, "ProteinChange"].astype(str).tolist()
+        message = (
+            f"{len(bad)} of {len(variants)} variants do not match the reference wild type "
+            f"({len(sequence)} residues): {', '.join(bad[:10])}{' ...' if len(bad) > 10 else ''}"
+        )
+        if on_mismatch != "drop":
+            raise ValueError(message)
+        logger.warning(f"{message}; dropping them")
+        variants, keys = variants[ok].reset_index(drop=True), keys[ok]
+
+    pos, wt, mut = decode_keys(keys)
+    base = bytearray(sequence.encode())
+    sequences = []
+    for p, m in zip(pos, mut):
+        mutant = bytearray(base)
+        mutant[p - 1] = AA_BYTES[m]
+        sequences.append(mutant.decode())
+
+    return pd.DataFrame({
+        "Name": format_variants(pos, wt, mut, "three").str.lower().to_numpy(),
+        "ProteinChange": format_variants(pos, wt, mut, "three").to_numpy(),
+        "VariantKey": keys,
+        "Sequence": sequences,
+    })
+
+
+def boltz_yaml(sequence: str, chain: str = "A", msa: Optional[str] = None) -> str:
+    """Boltz-2 input for a single protein chain, in the layout of the existing variant YAMLs"""
+    lines = [
+        "sequences:",
+        "  - protein:",
+        f"      id: {chain}",
+        "      sequence: >",
+        f"        {sequence}",
+    ]
+    if msa is not None:
+        lines.append(f"      msa: {msa}")
+    return "\n".join(lines) + "\n"
+
+
+def write_shards(variants: pd.DataFrame, sequence: str, out_dir: PathLike,
+                 plan: Optional[ShardPlan] = None, on_mismatch: str = "raise",
+                 msa: Optional[str] = None) -> pd.DataFrame:
+    """Write shard_NNNN/<variant>.yaml inputs in rank order and return the manifest"""
+    plan = plan or ShardPlan()
+    out_dir = Path(out_dir)
+    table = mutant_sequences(variants, sequence, on_mismatch)
+    per_shard = plan.variants_per_shard()
+
+    table["Shard"] = np.arange(len(table)) // per_shard
+    table["Input"] = [f"shard_{s:04d}/{name}.yaml" for s, name in zip(table["Shard"], table["Name"])]
+    for shard in np.unique(table["Shard"]):
+        (out_dir / f"shard_{shard:04d}").mkdir(parents=True, exist_ok=True)
+    for path, mutant in zip(table["Input"], table["Sequence"]):
+        (out_dir / path).write_text(boltz_yaml(mutant, msa=msa))
+
+    manifest = table.drop(columns="Sequence")
+    manifest.to_csv(out_dir / MANIFEST, index=False)
+    n_shards = int(table["Shard"].max()) + 1 if len(table) else 0
+    logger.info(f"Wrote {len(table)} Boltz inputs in {n_shards} shards of up to {per_shard} to {out_dir}")
+    return manifest
+
+
+JOB_TEMPLATE = """#!/bin/bash
+#SBATCH --job-name=hcm_boltz_shard
+#SBATCH --output=cluster_logs/hcm_shard_%A_%a.out
+#SBATCH --error=cluster_logs/hcm_shard_%A_%a.err
+#SBATCH --partition={partition}
+#SBATCH --gres=gpu:a100:1
+#SBATCH --mem=32G
+#SBATCH --cpus-per-task=8
+#SBATCH --time={wall_time}
+{account}#SBATCH --array=0-{last_shard}
+
+# One array task predicts one shard of {per_shard} variants in a single boltz process
+# Generated by src/boltz_batch.py; shard inputs and manifest.csv live next to this script
+
+SHARD_ROOT="{shard_root}"
+SHARD=$(printf "shard_%04d" "$SLURM_ARRAY_TASK_ID")
+echo "Shard $SHARD | Job $SLURM_ARRAY_JOB_ID.$SLURM_ARRAY_TASK_ID | Node $SLURMD_NODENAME | $(date)"
+
+module reset
+module load Python/3.11.5-GCCcore-13.2.0
+module load CUDA/11.8.0
+source boltz-env/bin/activate
+
+export SSL_CERT_FILE=/etc/pki/tls/certs/ca-bundle.crt
+export REQUESTS_CA_BUNDLE=/etc/pki/tls/certs/ca-bundle.crt
+export CURL_CA_BUNDLE=/etc/pki/tls/certs/ca-bundle.crt
+
+# Weights are downloaded once into a persistent cache, not into per-job scratch
+export BOLTZ_CACHE="{cache}"
+mkdir -p "$BOLTZ_CACHE"
+
+LOCAL_WORK="/local/$USER/${{SLURM_ARRAY_JOB_ID}}_${{SLURM_ARRAY_TASK_ID}}"
+mkdir -p "$LOCAL_WORK"
+cp -r "$SHARD_ROOT/$SHARD" "$LOCAL_WORK/input"
+cd "$LOCAL_WORK"
+
+boltz predict input \\
+    --out_dir output \\
+    --cache "$BOLTZ_CACHE" \\
+    --accelerator gpu \\
+    --devices 1 \\
+    --sampling_steps {sampling_steps}{extra_args}
+STATUS=$?
+
+mkdir -p "$SHARD_ROOT/results/$SHARD"
+cp -r output/* "$SHARD_ROOT/results/$SHARD/"
+echo "$SHARD,$STATUS,$SLURM_ARRAY_JOB_ID,$SLURM_ARRAY_TASK_ID,$(date),$SECONDS" >> "$SHARD_ROOT/shard_log.csv"
+rm -rf "$LOCAL_WORK"
+exit $STATUS
+"""
+
+
+def write_job_script(out_dir: PathLike, n_shards: int, plan: Optional[ShardPlan] = None,
+                     partition: str = "amperenodes", account: Optional[str] = None,
+                     cache: str = "$HOME/.boltz", sampling_steps: int = 200,
+                     extra_args: str = "") -> Path:
+    """SLURM array script that predicts shard $SLURM_ARRAY_TASK_ID of out_dir"""
+    plan = plan or ShardPlan()
+    out_dir = Path(out_dir)
+    script = JOB_TEMPLATE.format(
+        partition=partition,
+        wall_time=format_wall_time(plan.wall_time),
+        account=f"#SBATCH --account={account}\n" if account else "",
+        last_shard=max(n_shards - 1, 0),
+        per_shard=plan.variants_per_shard(),
+        shard_root=out_dir.resolve(),
+        cache=cache,
+        sampling_steps=sampling_steps,
+        extra_args=f" \\\n    {extra_args}" if extra_args else "",
+    )
+    path = out_dir / JOB_SCRIPT
+    path.write_text(script)
+    path.chmod(0o755)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write sharded multi-variant Boltz-2 inputs")
+    parser.add_argument("table", help="Ranked variant table (.csv or .parquet) with ProteinChange or VariantKey")
+    parser.add_argument("--sequence", required=True, help="Reference protein sequence (FASTA, YAML, text or literal)")
+    parser.add_argument("--out", default="boltz_shards", help="Output directory")
+    parser.add_argument("--top", type=int, help="Only the first N unique variants after ranking")
+    parser.add_argument("--rank-by", default="AlphaMissense_score",
+                        help="Column to rank by (descending); empty to keep the table order")
+    parser.add_argument("--wall-time", default="4:00:00", help="SLURM wall time per shard job")
+    parser.add_argument("--load-minutes", type=float, default=ShardPlan.load_minutes)
+    parser.add_argument("--minutes-per-variant", type=float, default=ShardPlan.minutes_per_variant)
+    parser.add_argument("--max-per-shard", type=int, help="Cap on variants per shard")
+    parser.add_argument("--drop-mismatches", action="store_true",
+                        help="Drop variants whose wild type does not match instead of failing")
+    parser.add_argument("--account", help="SLURM account for the job script")
+    parser.add_argument("--partition", default="amperenodes")
+    parser.add_argument("--sampling-steps", type=int, default=200)
+    args = parser.parse_args()
+
+    path = Path(args.table)
+    table = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    if args.rank_by:
+        table = table.sort_values(args.rank_by, ascending=False, kind="stable")
+    unique, _ = unique_variants(with_variant_key(table))
+    if args.top:
+        unique = unique.head(args.top)
+
+    plan = ShardPlan(
+        wall_time=parse_wall_time(args.wall_time), load_minutes=args.load_minutes,
+        minutes_per_variant=args.minutes_per_variant, max_variants=args.max_per_shard,
+    )
+    manifest = write_shards(
+        unique, read_sequence(args.sequence), args.out, plan,
+        on_mismatch="drop" if args.drop_mismatches else "raise",
+    )
+    n_shards = int(manifest["Shard"].max()) + 1 if len(manifest) else 0
+    script = write_job_script(args.out, n_shards, plan, partition=args.partition,
+                              account=args.account, sampling_steps=args.sampling_steps)
+    print(f"{len(manifest)} variants in {n_shards} shards of up to {plan.variants_per_shard()}")
+    print(f"Submit with: sbatch {script}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,319 @@
+"""
+Content-addressed cache manager
+Every fetch/compute stage caches through one CacheManager. Keys are derived
+from the identity of the stage's sources (URL + ETag, or file content hash),
+its parameters and the version of the code that produced it, so stale or
+mismatched data is never silently reused. Entries can carry a TTL, the store
+is capped in total size with LRU eviction, and hits/misses are counted per
+stage.
+"""
+
+import hashlib
+import inspect
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Union
+from urllib.request import Request, urlopen
+
+import pandas as pd
+
+from .table_cache import TableSchema, read_table, write_table
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 10 << 30  # 10 GiB
+HASH_BLOCK_BYTES = 1 << 20
+
+
+def _digest(payload: Any) -> str:
+    """Stable sha256 of a JSON-serializable payload"""
+    text = json.dumps(payload, sort_keys=True, default=str)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+@lru_cache(maxsize=None)
+def code_version(*objects: Any) -> str:
+    """Fingerprint of the source code of the given functions, classes or modules"""
+    h = hashlib.sha256()
+    for obj in objects:
+        h.update(inspect.getsource(obj).encode())
+    return h.hexdigest()[:16]
+
+
+def url_identity(url: str, timeout: float = 10.0) -> Dict[str, str]:
+    """Identify a remote source by its ETag/Last-Modified headers"""
+    identity = {"url": url}
+    try:
+        with urlopen(Request(url, method="HEAD"), timeout=timeout) as response:
+            for header in ("ETag", "Last-Modified", "Content-Length"):
+                value = response.headers.get(header)
+                if value:
+                    identity[header.lower()] = value
+    except Exception as e:
+        # Without validators only the URL and the entry TTL protect freshness
+        logger.warning(f"Could not validate {url}: {e}")
+    return identity
+
+
+class CacheManager:
+    """Content-addressed store for stage outputs with TTL and size-capped LRU eviction"""
+
+    def __init__(self, root: Union[str, Path], max_bytes: int = DEFAULT_MAX_BYTES,
+                 default_ttl: Optional[float] = None):
+        self.root = Path(root)
+        self.objects_dir = self.root / "objects"
+        self.objects_dir.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.stats: Dict[str, Dict[str, int]] = defaultdict(
+            lambda: {"hits": 0, "misses": 0, "evictions": 0}
+        )
+        # The same counters for the calling thread only, for per-stage attribution
+        self._thread_stats = threading.local()
+
+        # SQLite keeps the index consistent across panel worker processes
+        with self._connect() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS entries (
+                    key TEXT PRIMARY KEY,
+                    stage TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    expires REAL,
+                    meta TEXT
+                );
+                CREATE TABLE IF NOT EXISTS file_hashes (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    sha256 TEXT NOT NULL
+                );
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection; commits on success and always closes"""
+        db = sqlite3.connect(self.root / "index.sqlite", timeout=60)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Source identity and keys
+    # ------------------------------------------------------------------
+    def file_identity(self, path: Union[str, Path]) -> Dict[str, str]:
+        """Identify a local file by content hash, memoized on (size, mtime)"""
+        path = Path(path).resolve()
+        stat = path.stat()
+        with self._connect() as db:
+            row = db.execute(
+                "SELECT sha256 FROM file_hashes WHERE path=? AND size=? AND mtime_ns=?",
+                (str(path), stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        if row:
+            return {"sha256": row[0]}
+
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(HASH_BLOCK_BYTES), b""):
+                h.update(block)
+        sha = h.hexdigest()
+
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime_ns, sha),
+            )
+        return {"sha256": sha}
+
+    def source_identity(self, source: Union[str, Path]) -> Dict[str, str]:
+        """Identity of a URL or local file source"""
+        text = str(source)
+        if text.startswith(("http://", "https://", "ftp://")):
+            return url_identity(text)
+        return self.file_identity(source)
+
+    @staticmethod
+    def make_key(stage: str, sources: Dict[str, Any], params: Dict[str, Any],
+                 code: str) -> str:
+        """Content address of a stage output"""
+        return _digest({"stage": stage, "sources": sources, "params": params, "code": code})
+
+    # ------------------------------------------------------------------
+    # Entries
+    # ------------------------------------------------------------------
+    def lookup(self, key: str, stage: str) -> Optional[Path]:
+        """Path of a live entry, or None; expired and orphaned entries are dropped"""
+        now = time.time()
+        with self._connect() as db:
+            row = db.execute("SELECT path, expires FROM entries WHERE key=?", (key,)).fetchone()
+            if row is not None:
+                path, expires = Path(row[0]), row[1]
+                if (expires is not None and expires < now) or not path.exists():
+                    db.execute("DELETE FROM entries WHERE key=?", (key,))
+                    path.unlink(missing_ok=True)
+                    row = None
+                else:
+                    db.execute("UPDATE entries SET last_access=? WHERE key=?", (now, key))
+
+        if row is None:
+            self._count(stage, "misses")
+            logger.info(f"Cache miss for {stage} ({key[:12]})")
+            return None
+        self._count(stage, "hits")
+        logger.info(f"Cache hit for {stage} ({key[:12]})")
+        return path
+
+    def _register(self, key: str, stage: str, path: Path, ttl: Optional[float],
+                  meta: Optional[Dict[str, Any]]) -> Path:
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        with self._connect() as db:
+            db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, stage, str(path), path.stat().st_size, now, now,
+                 now + ttl if ttl is not None else None, json.dumps(meta or {}, default=str)),
+            )
+        self.evict()
+        return path
+
+    def _object_path(self, key: str, suffix: str) -> Path:
+        path = self.objects_dir / key[:2] / f"{key}{suffix}"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        return path
+
+    def get_table(self, key: str, stage: str,
+                  columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        path = self.lookup(key, stage)
+        return read_table(path, columns=columns) if path is not None else None
+
+    def put_table(self, key: str, stage: str, df: pd.DataFrame, schema: TableSchema = None,
+                  ttl: Optional[float] = None, meta: Optional[Dict[str, Any]] = None) -> Path:
+        path = write_table(df, self._object_path(key, ".parquet"), schema)
+        return self._register(key, stage, path, ttl, meta)
+
+    def put_file(self, key: str, stage: str, source: Union[str, Path],
+                 ttl: Optional[float] = None, meta: Optional[Dict[str, Any]] = None) -> Path:
+        """Store a file artifact (e.g. a prepared structure) under a key"""
+        source = Path(source)
+        path = self._object_path(key, source.suffix)
+        tmp_path = path.with_name(path.name + ".tmp")
+        shutil.copyfile(source, tmp_path)
+        os.replace(tmp_path, path)
+        return self._register(key, stage, path, ttl, meta)
+
+    def cached_table(self, stage: str, compute: Callable[[], pd.DataFrame], key: str,
+                     schema: TableSchema = None, ttl: Optional[float] = None,
+                     force_refresh: bool = False, columns: Optional[List[str]] = None,
+                     meta: Optional[Dict[str, Any]] = None) -> pd.DataFrame:
+        """Return a stage's table from cache, computing and storing it on a miss"""
+        if not force_refresh:
+            cached = self.get_table(key, stage, columns=columns)
+            if cached is not None:
+                return cached
+        else:
+            self._count(stage, "misses")
+
+        df = compute()
+        self.put_table(key, stage, df, schema=schema, ttl=ttl, meta=meta)
+        return df[columns] if columns else df
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+    def invalidate(self, stage: Optional[str] = None, key: Optional[str] = None) -> int:
+        """Drop entries by key, by stage, or all of them"""
+        query, args = "SELECT key, path FROM entries", ()
+        if key is not None:
+            query, args = query + " WHERE key=?", (key,)
+        elif stage is not None:
+            query, args = query + " WHERE stage=?", (stage,)
+        with self._connect() as db:
+            rows = db.execute(query, args).fetchall()
+            for entry_key, path in rows:
+                db.execute("DELETE FROM entries WHERE key=?", (entry_key,))
+                Path(path).unlink(missing_ok=True)
+        return len(rows)
+
+    def evict(self) -> int:
+        """Drop expired entries, then least recently used ones until under the size cap"""
+        now = time.time()
+        evicted = 0
+        with self._connect() as db:
+            expired = db.execute(
+                "SELECT key, stage, path FROM entries WHERE expires IS NOT NULL AND expires < ?",
+                (now,),
+            ).fetchall()
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            lru = []
+            if total > self.max_bytes:
+                lru = db.execute(
+                    "SELECT key, stage, path, size FROM entries ORDER BY last_access"
+                ).fetchall()
+
+            for key, stage, path in expired:
+                db.execute("DELETE FROM entries WHERE key=?", (key,))
+                Path(path).unlink(missing_ok=True)
+                self._count(stage, "evictions")
+                evicted += 1
+
+            total = db.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+            for key, stage, path, size in lru:
+                if total <= self.max_bytes:
+                    break
+                if not db.execute("SELECT 1 FROM entries WHERE key=?", (key,)).fetchone():
+                    continue
+                db.execute("DELETE FROM entries WHERE key=?", (key,))
+                Path(path).unlink(missing_ok=True)
+                self._count(stage, "evictions")
+                total -= size
+                evicted += 1
+
+        if evicted:
+            logger.info(f"Evicted {evicted} cache entries")
+        return evicted
+
+    def entries(self, stage: str) -> List[Dict[str, Any]]:
+        """Live entries of a stage with their metadata, newest first"""
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT key, path, created, meta FROM entries WHERE stage=? ORDER BY created DESC",
+                (stage,),
+            ).fetchall()
+        return [
+            {"key": key, "path": Path(path), "created": created, "meta": json.loads(meta or "{}")}
+            for key, path, created, meta in rows
+        ]
+
+    def _count(self, stage: str, counter: str) -> None:
+        self.stats[stage][counter] += 1
+        own = self.thread_stats()
+        own.setdefault(stage, {"hits": 0, "misses": 0, "evictions": 0})[counter] += 1
+
+    def thread_stats(self) -> Dict[str, Dict[str, int]]:
+        """Hit/miss/eviction counters of the calling thread, per stage"""
+        if not hasattr(self._thread_stats, "counts"):
+            self._thread_stats.counts = {}
+        return self._thread_stats.counts
+
+    def summary(self) -> Dict[str, Any]:
+        """Hit/miss/eviction counters per stage plus current store size"""
+        with self._connect() as db:
+            n_entries, total = db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM entries"
+            ).fetchone()
+        return {"entries": n_entries, "bytes": total, "stages": {k: dict(v) for k, v in self.stats.items()}}
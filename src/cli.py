@@ -0,0 +1,231 @@
+"""
+Command-line interface
+One subcommand per pipeline step. Nothing heavy is imported at module load:
+each subcommand imports only what it needs, so report and lookup start
+without the analyzer, the structure code, scipy or matplotlib, and nothing
+prompts, so every command runs unattended in batch jobs.
+
+    python -m src.cli fetch
+    python -m src.cli ddg --top-n 20
+    python -m src.cli run --rosetta-top-n 20
+    python -m src.cli --profile combine --trace-memory run
+    python -m src.cli lookup Arg403Gln R719W
+    python -m src.cli report
+    python -m src.cli correlations --strata Nearest_site
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+LOOKUP_COLUMNS = [
+    "ProteinChange", "ClinicalSignificance", "AlphaMissense_score", "AlphaMissense_class",
+    "pLDDT", "RSA_approx", "Nearest_site", "Site_distance", "Rosetta_ddG", "Rosetta_ddG_std", "Rosetta_ddG_n",
+]
+
+
+def _combined_file(args) -> Path:
+    if args.table:
+        return Path(args.table)
+    return Path(args.results) / f"{args.gene}_variants_comprehensive.parquet"
+
+
+def _read_combined(args, **kwargs):
+    path = _combined_file(args)
+    if not path.exists():
+        sys.exit(f"{path} not found; run `python -m src.cli combine` first or pass --table")
+    import pandas as pd
+
+    return pd.read_parquet(path, **kwargs) if path.suffix == ".parquet" else pd.read_csv(path)
+
+
+def _pipeline(args, rosetta_top_n: Optional[int] = None):
+    from .pipeline_dag import analysis_pipeline
+    from .variant_analysis import MYH7VariantAnalyzer
+
+    analyzer = MYH7VariantAnalyzer(data_dir=args.data, results_dir=args.results, gene=args.gene)
+    if getattr(args, "clinvar", None):
+        analyzer.clinvar_source = args.clinvar
+    if getattr(args, "rosetta", None):
+        analyzer.rosetta_executable = args.rosetta
+    analyzer.instrumentation.profile = set(args.profile)
+    analyzer.instrumentation.profiler = args.profiler
+    analyzer.instrumentation.trace_memory = args.trace_memory
+    return analysis_pipeline(analyzer, rosetta_top_n, args.workers)
+
+
+def _run_stages(args, stages: List[str], rosetta_top_n: Optional[int] = None) -> None:
+    force = stages if args.force else []
+    status = _pipeline(args, rosetta_top_n).run(stages, force)
+    print(json.dumps(status, indent=2))
+
+
+def cmd_fetch(args) -> None:
+    _run_stages(args, args.source or ["clinvar", "alphamissense"])
+
+
+def cmd_plddt(args) -> None:
+    _run_stages(args, ["plddt"])
+
+
+def cmd_ddg(args) -> None:
+    _run_stages(args, ["ddg"], rosetta_top_n=args.top_n)
+
+
+def cmd_combine(args) -> None:
+    _run_stages(args, ["combine"])
+
+
+def cmd_run(args) -> None:
+    from .report import REPORT_FILE
+
+    status = _pipeline(args, args.rosetta_top_n).run(force=args.force_stage)
+    print(json.dumps(status, indent=2))
+    print((Path(args.results) / REPORT_FILE).read_text())
+
+
+def cmd_figures(args) -> None:
+    from .rendering import analysis_figures, render_figures
+
+    data = _read_combined(args)
+    status = render_figures(analysis_figures(), data, Path(args.results) / "figures",
+                            max_workers=args.workers, force=args.force)
+    print(json.dumps(status, indent=2))
+
+
+def cmd_report(args) -> None:
+    from .report import write_summary_report
+
+    print(write_summary_report(_read_combined(args), args.results, args.gene, by=args.by))
+
+
+def cmd_correlations(args) -> None:
+    from .resampling import correlation_tests, format_tests, manuscript_subsets
+
+    subsets = () if args.no_subsets else manuscript_subsets(args.x)
+    result = correlation_tests(_read_combined(args), args.x, args.y, subsets, n_resamples=args.resamples,
+                               correction=args.correction, strata=args.strata, seed=args.seed)
+    print(format_tests(result))
+    path = Path(args.results) / "correlation_tests.csv"
+    result.to_csv(path, index=False)
+    print(f"Saved {path}")
+
+
+def _query_notation(query: str) -> str:
+    if query.startswith("p."):
+        return "hgvs"
+    if re.fullmatch(r"[A-Z]\d+[A-Z]", query):
+        return "one"
+    return "three"
+
+
+def cmd_lookup(args) -> None:
+    import pandas as pd
+
+    from .notation import INVALID_KEY, variant_keys
+
+    keys = []
+    for query in args.variants:
+        key = int(variant_keys(pd.Series([query]), _query_notation(query))[0])
+        if key == INVALID_KEY:
+            sys.exit(f"Cannot parse variant {query}; expected e.g. Arg403Gln, R403Q or p.Arg403Gln")
+        keys.append(key)
+
+    path = _combined_file(args)
+    if path.suffix == ".parquet" and path.exists():
+        # Only the matching row groups are decoded
+        import pyarrow.parquet as pq
+
+        available = pq.read_schema(path).names
+        columns = [c for c in LOOKUP_COLUMNS + ["VariantKey"] if c in available]
+        rows = _read_combined(args, columns=columns, filters=[("VariantKey", "in", keys)])
+    else:
+        from .dedup import with_variant_key
+
+        rows = with_variant_key(_read_combined(args))
+        rows = rows[rows["VariantKey"].isin(keys)]
+
+    if rows.empty:
+        print(f"No rows for {', '.join(args.variants)} in {path}")
+        return
+    columns = [c for c in LOOKUP_COLUMNS if c in rows.columns]
+    print(rows[columns].to_string(index=False))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m src.cli", description="HCM variant analysis pipeline")
+    parser.add_argument("--gene", default="MYH7")
+    parser.add_argument("--data", default="data/variants", help="Data and cache directory")
+    parser.add_argument("--results", default="results")
+    parser.add_argument("--workers", type=int, help="Concurrent stages / render processes")
+    parser.add_argument("-q", "--quiet", action="store_true", help="Only log warnings")
+    parser.add_argument("--profile", action="append", default=[], metavar="STAGE",
+                        help="Profile this stage (e.g. combine, rosetta, dag.plddt) or all")
+    parser.add_argument("--profiler", choices=["cprofile", "pyinstrument"], default="cprofile")
+    parser.add_argument("--trace-memory", action="store_true", help="Record tracemalloc peaks (slower)")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def stage_command(name: str, func, help_text: str) -> argparse.ArgumentParser:
+        sub = commands.add_parser(name, help=help_text)
+        sub.add_argument("--force", action="store_true", help="Re-execute even if the inputs are unchanged")
+        sub.add_argument("--clinvar", help="ClinVar variant_summary URL or local path")
+        sub.set_defaults(func=func)
+        return sub
+
+    fetch = stage_command("fetch", cmd_fetch, "Fetch ClinVar and AlphaMissense (concurrently)")
+    fetch.add_argument("--source", action="append", choices=["clinvar", "alphamissense"])
+    stage_command("plddt", cmd_plddt, "Extract pLDDT and structural features")
+    ddg = stage_command("ddg", cmd_ddg, "Rosetta ddG for the top variants by AlphaMissense score")
+    ddg.add_argument("--top-n", type=int, default=20)
+    ddg.add_argument("--rosetta", help="ddg_monomer executable")
+    stage_command("combine", cmd_combine, "Combine all sources into the comprehensive table")
+
+    run = commands.add_parser("run", help="Run every stage whose inputs changed")
+    run.add_argument("--rosetta-top-n", type=int, help="Include the ddG stage for the top N variants")
+    run.add_argument("--rosetta", help="ddg_monomer executable")
+    run.add_argument("--clinvar", help="ClinVar variant_summary URL or local path")
+    run.add_argument("--force-stage", action="append", default=[], help="Re-execute this stage")
+    run.set_defaults(func=cmd_run)
+
+    figures = commands.add_parser("figures", help="Render figures from the combined table")
+    figures.add_argument("--table", help="Combined table (default: the results directory's)")
+    figures.add_argument("--force", action="store_true", help="Re-render unchanged figures")
+    figures.set_defaults(func=cmd_figures)
+
+    report = commands.add_parser("report", help="Write the summary report from the combined table")
+    report.add_argument("--table", help="Combined table (default: the results directory's)")
+    report.add_argument("--by", help="Add a per-group table, e.g. Nearest_site or GeneSymbol")
+    report.set_defaults(func=cmd_report)
+
+    correlations = commands.add_parser("correlations", help="Bootstrap CIs and permutation p-values")
+    correlations.add_argument("--table", help="Combined table (default: the results directory's)")
+    correlations.add_argument("--x", default="AlphaMissense_score")
+    correlations.add_argument("--y", default="Rosetta_ddG")
+    correlations.add_argument("--resamples", type=int, default=10_000)
+    correlations.add_argument("--correction", choices=["holm", "bonferroni", "fdr_bh", "none"], default="holm")
+    correlations.add_argument("--strata", help="Resample and shuffle within groups, e.g. Nearest_site")
+    correlations.add_argument("--no-subsets", action="store_true", help="Only test the full table")
+    correlations.add_argument("--seed", type=int, default=0)
+    correlations.set_defaults(func=cmd_correlations)
+
+    lookup = commands.add_parser("lookup", help="Print the combined rows of one or more variants")
+    lookup.add_argument("variants", nargs="+", help="Arg403Gln, R403Q or p.Arg403Gln")
+    lookup.add_argument("--table", help="Combined table (default: the results directory's)")
+    lookup.set_defaults(func=cmd_lookup)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.WARNING if args.quiet else logging.INFO)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
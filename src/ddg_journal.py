@@ -0,0 +1,229 @@
+"""
+Crash-safe journal for Rosetta ddG runs
+Every finished ddg_monomer attempt is appended to a SQLite journal (WAL,
+synchronous=FULL) together with a hash of its inputs, its status, ddG, runtime
+and attempt number. A restarted run skips variants that already finished with
+the same inputs, retries timeouts and transient failures according to a
+RetryPolicy, and the results table can be materialized from the journal at any
+time, including while a run is still going.
+
+    python -m src.ddg_journal data/variants/rosetta_journal.sqlite --out partial.csv
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Union
+
+import numpy as np
+import pandas as pd
+
+from .rosetta_executor import DDGOutcome, DDGTask, RosettaDDGExecutor
+
+logger = logging.getLogger(__name__)
+
+RESULT_COLUMNS = ["ProteinChange", "Rosetta_ddG", "Status"]
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """Which failed attempts are retried, how often and after what delay
+
+    Only timeouts and missing score files are retried by default. Non-zero
+    ddg_monomer exits ("Error: ...") are opt-in; launch and validation
+    failures ("Invalid: ...") fail the same way every time.
+    """
+    max_attempts: int = 3
+    retry_on: Sequence[str] = ("Timeout", "No output file")
+    backoff: float = 5.0  # seconds before the first retry round, doubled each round
+
+    def should_retry(self, status: str, attempts: int) -> bool:
+        if status == "Success" or attempts >= self.max_attempts:
+            return False
+        return any(status.startswith(prefix) for prefix in self.retry_on)
+
+    def delay(self, round_number: int) -> float:
+        return self.backoff * 2 ** (round_number - 1)
+
+
+def task_inputs_hash(task: DDGTask, context: Dict[str, Any]) -> str:
+    """Hash of everything that determines a variant's ddG (structure, binary, options, mutation)"""
+    payload = json.dumps({"mutation": task.mutfile_line, **context}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class DDGJournal:
+    """Append-only per-variant attempt log"""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as db:
+            db.executescript("""
+                CREATE TABLE IF NOT EXISTS attempts (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    inputs_hash TEXT NOT NULL,
+                    variant TEXT NOT NULL,
+                    protein_change TEXT NOT NULL,
+                    attempt INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    ddg REAL,
+                    runtime REAL,
+                    returncode INTEGER,
+                    stderr TEXT,
+                    finished REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS attempts_inputs ON attempts (inputs_hash, id);
+            """)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """Short-lived connection; every commit is fsynced before returning"""
+        db = sqlite3.connect(self.path, timeout=60)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute("PRAGMA synchronous=FULL")
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def record(self, outcome: DDGOutcome, inputs_hash: str) -> int:
+        """Append one finished attempt; returns its attempt number"""
+        with self._connect() as db:
+            attempt = db.execute(
+                "SELECT COUNT(*) FROM attempts WHERE inputs_hash=?", (inputs_hash,)
+            ).fetchone()[0] + 1
+            stderr = outcome.stderr
+            if "crash_log" in outcome.extra:
+                stderr = f"{stderr}\n{outcome.extra['crash_log']}"
+            db.execute(
+                "INSERT INTO attempts (inputs_hash, variant, protein_change, attempt, status, ddg,"
+                " runtime, returncode, stderr, finished) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (inputs_hash, outcome.task.name, outcome.task.protein_change, attempt,
+                 outcome.status, None if np.isnan(outcome.ddg) else float(outcome.ddg),
+                 outcome.runtime, outcome.returncode, stderr, time.time()),
+            )
+        return attempt
+
+    def latest(self, inputs_hashes: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Most recent attempt per inputs hash, with the number of attempts made"""
+        query = """
+            SELECT a.inputs_hash, a.variant, a.protein_change, a.status, a.ddg, a.runtime,
+                   a.returncode, a.finished, n.attempts
+            FROM attempts a
+            JOIN (SELECT inputs_hash, MAX(id) AS last_id, COUNT(*) AS attempts
+                  FROM attempts GROUP BY inputs_hash) n
+              ON a.id = n.last_id
+            ORDER BY a.id
+        """
+        with self._connect() as db:
+            df = pd.read_sql_query(query, db)
+        if inputs_hashes is not None:
+            df = df[df["inputs_hash"].isin(set(inputs_hashes))]
+        return df.reset_index(drop=True)
+
+    def pending(self, hashes: Dict[str, DDGTask], policy: RetryPolicy) -> List[str]:
+        """Inputs hashes that have never run or whose last attempt should be retried"""
+        done = self.latest(hashes)
+        state = dict(zip(done["inputs_hash"], zip(done["status"], done["attempts"])))
+        return [
+            h for h in hashes
+            if h not in state or policy.should_retry(*state[h])
+        ]
+
+    def materialize(self, tasks: Optional[Sequence[DDGTask]] = None,
+                    hashes: Optional[Sequence[str]] = None) -> pd.DataFrame:
+        """ProteinChange / Rosetta_ddG / Status table from the latest attempts
+
+        With tasks and their hashes, rows follow task order and variants not
+        yet attempted are reported as Pending.
+        """
+        latest = self.latest(hashes)
+        if tasks is None:
+            # Only the newest inputs per variant (e.g. after the structure changed)
+            latest = latest.drop_duplicates("variant", keep="last")
+            table = latest.rename(columns={
+                "protein_change": "ProteinChange", "ddg": "Rosetta_ddG", "status": "Status",
+            })
+            return table[RESULT_COLUMNS]
+
+        by_hash = latest.set_index("inputs_hash")
+        rows = []
+        for task, h in zip(tasks, hashes):
+            if h in by_hash.index:
+                row = by_hash.loc[h]
+                ddg = row["ddg"] if pd.notna(row["ddg"]) else np.nan
+                rows.append({"ProteinChange": task.protein_change, "Rosetta_ddG": ddg,
+                             "Status": row["status"]})
+            else:
+                rows.append({"ProteinChange": task.protein_change, "Rosetta_ddG": np.nan,
+                             "Status": "Pending"})
+        return pd.DataFrame(rows, columns=RESULT_COLUMNS)
+
+
+def run_journaled(executor: RosettaDDGExecutor, tasks: Sequence[DDGTask], journal: DDGJournal,
+                  context: Dict[str, Any], policy: Optional[RetryPolicy] = None) -> pd.DataFrame:
+    """Run tasks through the executor, skipping finished ones and retrying per policy"""
+    policy = policy or RetryPolicy()
+    tasks = list(dict.fromkeys(tasks))
+    hashes = {task_inputs_hash(task, context): task for task in tasks}
+
+    round_number = 0
+    while True:
+        todo = journal.pending(hashes, policy)
+        if not todo:
+            break
+        if round_number == 0:
+            skipped = len(hashes) - len(todo)
+            if skipped:
+                logger.info(f"Journal: {skipped} of {len(hashes)} variants already finished")
+        else:
+            delay = policy.delay(round_number)
+            logger.info(f"Retrying {len(todo)} variants (round {round_number}) in {delay:.0f}s")
+            time.sleep(delay)
+
+        task_hash = {hashes[h]: h for h in todo}
+        executor.run(
+            [hashes[h] for h in todo],
+            on_result=lambda outcome: journal.record(outcome, task_hash[outcome.task]),
+        )
+        round_number += 1
+
+    return journal.materialize(list(hashes.values()), list(hashes))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Materialize ddG results from a run journal")
+    parser.add_argument("journal", help="Journal SQLite file")
+    parser.add_argument("--out", help="Write the table here (.csv or .parquet) instead of printing")
+    parser.add_argument("--attempts", action="store_true", help="Show every attempt, not just the latest")
+    args = parser.parse_args()
+
+    journal = DDGJournal(args.journal)
+    if args.attempts:
+        with journal._connect() as db:
+            table = pd.read_sql_query(
+                "SELECT variant, attempt, status, ddg, runtime, returncode, finished"
+                " FROM attempts ORDER BY id", db,
+            )
+    else:
+        table = journal.materialize()
+
+    if args.out and args.out.endswith(".parquet"):
+        from .table_cache import write_table
+        write_table(table, args.out, "rosetta")
+    elif args.out:
+        table.to_csv(args.out, index=False)
+    else:
+        print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
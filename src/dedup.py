@@ -0,0 +1,103 @@
+"""
+Compute-once-per-unique-variant helpers
+Submission tables repeat the same protein change on several rows (different
+ClinVar records, different nucleotide changes). Expensive stages run on the
+unique (position, wt, mut) keys only and their results are broadcast back to
+every row. Replicate measurements of one variant, such as several ddG values,
+are aggregated into mean, standard deviation and count instead of being kept
+as conflicting rows.
+
+    python -m src.dedup MYH7_variants_final_annotated.csv --out results/MYH7_variants_dedup.csv
+"""
+
+import argparse
+import logging
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .notation import INVALID_KEY, variant_keys
+
+logger = logging.getLogger(__name__)
+
+KEY = "VariantKey"
+
+
+def with_variant_key(df: pd.DataFrame, notation: str = "three") -> pd.DataFrame:
+    """Table with the int64 VariantKey derived from ProteinChange if it is missing"""
+    if KEY in df.columns:
+        return df
+    return df.assign(**{KEY: variant_keys(df["ProteinChange"], notation)})
+
+
+def unique_variants(df: pd.DataFrame, key: str = KEY) -> Tuple[pd.DataFrame, np.ndarray]:
+    """First row of every distinct variant, and for every input row the index of its variant"""
+    codes, _ = pd.factorize(df[key], sort=False)
+    # factorize numbers keys by first appearance, so first rows come out in input order
+    first = np.unique(codes, return_index=True)[1]
+    return df.iloc[first].reset_index(drop=True), codes
+
+
+def broadcast(results: pd.DataFrame, rows: pd.DataFrame, key: str = KEY,
+              columns: Optional[Sequence[str]] = None) -> pd.DataFrame:
+    """Attach per-variant results to every row of a submission table (row order kept)"""
+    columns = [c for c in (columns or results.columns) if c != key]
+    return rows.drop(columns=[c for c in columns if c in rows.columns]).merge(
+        results[[key, *columns]], on=key, how="left", validate="many_to_one",
+    )
+
+
+def aggregate_replicates(df: pd.DataFrame, value: str, key: str = KEY) -> pd.DataFrame:
+    """One row per variant: the mean of value, plus value_std and value_n (non-missing replicates)"""
+    grouped = df.groupby(key, sort=False)[value]
+    aggregated = pd.DataFrame({
+        value: grouped.mean(),
+        f"{value}_std": grouped.std(),
+        f"{value}_n": grouped.count(),
+    }).reset_index()
+    replicated = aggregated[f"{value}_n"] > 1
+    if replicated.any():
+        logger.info(f"Aggregated {value} replicates for {replicated.sum()} of {len(aggregated)} variants")
+    return aggregated
+
+
+def collapse_replicates(df: pd.DataFrame, values: Sequence[str], key: str = KEY) -> pd.DataFrame:
+    """Replace replicate columns by their per-variant aggregates on every row"""
+    df = df[df[key] != INVALID_KEY]
+    for value in values:
+        df = broadcast(aggregate_replicates(df, value, key), df, key)
+    return df
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Aggregate replicate values per unique protein change")
+    parser.add_argument("table", help="Annotated variant table (.csv or .parquet) with ProteinChange")
+    parser.add_argument("--values", nargs="+", default=["Rosetta_ddG"], help="Replicate columns")
+    parser.add_argument("--unique", action="store_true", help="Write one row per variant instead of every row")
+    parser.add_argument("--out", help="Write the table here (.csv or .parquet) instead of printing a summary")
+    args = parser.parse_args()
+
+    df = pd.read_parquet(args.table) if args.table.endswith(".parquet") else pd.read_csv(args.table)
+    keyed = with_variant_key(df)
+    invalid = int((keyed[KEY] == INVALID_KEY).sum())
+    if invalid:
+        example = keyed.loc[keyed[KEY] == INVALID_KEY, "ProteinChange"].iloc[0]
+        logger.warning(f"Dropping {invalid} rows that are not missense substitutions (e.g. {example})")
+    table = collapse_replicates(keyed, args.values)
+    if args.unique:
+        table = unique_variants(table)[0]
+
+    if args.out and args.out.endswith(".parquet"):
+        table.to_parquet(args.out, index=False)
+    elif args.out:
+        table.to_csv(args.out, index=False)
+    else:
+        print(f"{len(df)} rows, {table[KEY].nunique()} unique variants")
+        for value in args.values:
+            n = table.drop_duplicates(KEY)[f"{value}_n"]
+            print(f"{value}: {int((n > 1).sum())} variants with replicates (max n = {int(n.max())})")
+
+
+if __name__ == "__main__":
+    main()
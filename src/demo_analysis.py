@@ -10,6 +10,10 @@ import matplotlib.pyplot as plt
 from pathlib import Path
 import sys
 
+# Runs as `python src/demo_analysis.py` from the repository root
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+from src.stats_engine import compute_stats, variant_stats_spec
+
 def main():
     """Main demonstration function"""
     print("🚀 MYH7 Variant Analysis Pipeline Demo")
@@ -25,54 +29,48 @@ def main():
         print(f"✅ Loaded {len(df)} variants")
         print(f"📊 Columns: {list(df.columns)}")
         
+        # One pass for every statistic below
+        stats = compute_stats(df, variant_stats_spec("AlphaMissense", top_k=5))
+        
         # Basic analysis
-        if 'AlphaMissense' in df.columns:
-            am_stats = df['AlphaMissense'].describe()
+        if stats.has('AlphaMissense'):
             print(f"\n🧬 AlphaMissense Statistics:")
-            print(f"   Mean: {am_stats['mean']:.3f}")
-            print(f"   Std:  {am_stats['std']:.3f}")
-            print(f"   Range: [{am_stats['min']:.3f}, {am_stats['max']:.3f}]")
+            print(f"   Mean: {stats.agg('AlphaMissense', 'mean'):.3f}")
+            print(f"   Std:  {stats.agg('AlphaMissense', 'std'):.3f}")
+            print(f"   Range: [{stats.agg('AlphaMissense', 'min'):.3f}, {stats.agg('AlphaMissense', 'max'):.3f}]")
             
             # High pathogenicity variants
-            high_path = df[df['AlphaMissense'] > 0.8]
-            print(f"   High pathogenicity (>0.8): {len(high_path)} variants")
+            print(f"   High pathogenicity (>0.8): {stats.count('am_high')} variants")
         
-        if 'Rosetta_ddG' in df.columns:
-            ddg_mask = df['Rosetta_ddG'].notna()
-            if ddg_mask.any():
-                ddg_stats = df.loc[ddg_mask, 'Rosetta_ddG'].describe()
-                print(f"\n⚖️ Rosetta ΔΔG Statistics:")
-                print(f"   Mean: {ddg_stats['mean']:.3f} REU")
-                print(f"   Std:  {ddg_stats['std']:.3f} REU")
-                print(f"   Range: [{ddg_stats['min']:.3f}, {ddg_stats['max']:.3f}] REU")
-                
-                # Stability analysis
-                destabilizing = df[df['Rosetta_ddG'] > 1.0]
-                stabilizing = df[df['Rosetta_ddG'] < -1.0]
-                print(f"   Destabilizing (>1 REU): {len(destabilizing)} variants")
-                print(f"   Stabilizing (<-1 REU): {len(stabilizing)} variants")
+        if stats.agg('Rosetta_ddG', 'count'):
+            print(f"\n⚖️ Rosetta ΔΔG Statistics:")
+            print(f"   Mean: {stats.agg('Rosetta_ddG', 'mean'):.3f} REU")
+            print(f"   Std:  {stats.agg('Rosetta_ddG', 'std'):.3f} REU")
+            print(f"   Range: [{stats.agg('Rosetta_ddG', 'min'):.3f}, {stats.agg('Rosetta_ddG', 'max'):.3f}] REU")
+            
+            # Stability analysis
+            print(f"   Destabilizing (>1 REU): {stats.count('destabilizing')} variants")
+            print(f"   Stabilizing (<-1 REU): {stats.count('stabilizing')} variants")
         
-        if 'pLDDT' in df.columns:
-            plddt_stats = df['pLDDT'].describe()
+        if stats.has('pLDDT'):
             print(f"\n🏗️ pLDDT Confidence Statistics:")
-            print(f"   Mean: {plddt_stats['mean']:.1f}")
-            print(f"   High confidence (>90): {(df['pLDDT'] > 90).sum()} variants")
-            print(f"   Low confidence (<50): {(df['pLDDT'] < 50).sum()} variants")
+            print(f"   Mean: {stats.agg('pLDDT', 'mean'):.1f}")
+            print(f"   High confidence (>90): {stats.count('plddt_high')} variants")
+            print(f"   Low confidence (<50): {stats.count('plddt_low')} variants")
         
         # Correlations
-        if all(col in df.columns for col in ['AlphaMissense', 'Rosetta_ddG']):
-            corr = df['AlphaMissense'].corr(df['Rosetta_ddG'])
+        if stats.has('AlphaMissense') and stats.has('Rosetta_ddG'):
             print(f"\n🔗 Key Correlation:")
-            print(f"   AlphaMissense vs Rosetta ΔΔG: r = {corr:.3f}")
+            print(f"   AlphaMissense vs Rosetta ΔΔG: r = {stats.corr('AlphaMissense', 'Rosetta_ddG'):.3f}, "
+                  f"ρ = {stats.corr('AlphaMissense', 'Rosetta_ddG', 'spearman'):.3f}")
         
         # Top variants for research focus
-        if 'AlphaMissense' in df.columns:
+        if stats.has('AlphaMissense'):
             print(f"\n🎯 TOP 5 RESEARCH TARGETS:")
-            top_variants = df.nlargest(5, 'AlphaMissense')
-            for i, (_, row) in enumerate(top_variants.iterrows(), 1):
-                variant = row.get('ProteinChange', 'N/A')
-                am_score = row.get('AlphaMissense', 0)
-                ddg = row.get('Rosetta_ddG', np.nan)
+            top_variants = stats.top_rows('pathogenic')
+            variants = top_variants['ProteinChange'] if 'ProteinChange' in top_variants else ['N/A'] * len(top_variants)
+            ddgs = top_variants['Rosetta_ddG'] if 'Rosetta_ddG' in top_variants else [np.nan] * len(top_variants)
+            for i, (variant, am_score, ddg) in enumerate(zip(variants, top_variants['AlphaMissense'], ddgs), 1):
                 ddg_str = f"{ddg:.2f}" if pd.notna(ddg) else "pending"
                 print(f"   {i}. {variant}: AlphaMissense={am_score:.3f}, ΔΔG={ddg_str}")
         
@@ -0,0 +1,338 @@
+"""
+Stage instrumentation
+A Recorder collects one record per stage call: wall and CPU time, RSS
+high-water mark and growth, optionally the tracemalloc peak, input/output row
+counts, bytes read by the process, cache hits/misses and every external
+subprocess the stage launched (command, wall time, exit status). At the end
+of a run it writes a JSON manifest. Profiling is opt-in per stage (cProfile,
+or pyinstrument when installed); without it a record costs a handful of
+syscalls, so instrumentation stays on.
+
+    analyzer.instrumentation.profile = {"combine"}
+    python -m pstats results/profiles/<run>_combine.prof
+    python -m src.cli --profile combine --trace-memory run
+"""
+
+import functools
+import json
+import logging
+import os
+import platform
+import resource
+import socket
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "run_manifest.json"
+PROFILERS = ("cprofile", "pyinstrument")
+
+PathLike = Union[str, Path]
+
+
+@dataclass
+class SubprocessRecord:
+    command: str
+    wall_s: float
+    returncode: Optional[int]
+    status: str = "ok"  # ok / failed / timeout
+    stage: Optional[str] = None
+
+
+@dataclass
+class StageRecord:
+    stage: str
+    parent: Optional[str] = None
+    thread: str = ""
+    started: str = ""
+    status: str = "running"
+    error: Optional[str] = None
+    wall_s: float = 0.0
+    cpu_s: float = 0.0  # this thread's CPU; worker processes are not included
+    rss_peak_mb: Optional[float] = None  # process high-water mark at stage end
+    rss_delta_mb: Optional[float] = None
+    traced_peak_mb: Optional[float] = None
+    rows_in: Optional[int] = None
+    rows_out: Optional[int] = None
+    bytes_read: Optional[int] = None  # process-wide, includes concurrent stages
+    cache: Dict[str, Dict[str, int]] = field(default_factory=dict)  # this thread's lookups
+    subprocesses: List[SubprocessRecord] = field(default_factory=list)
+    profile: Optional[str] = None
+
+
+def _rss_mb() -> Optional[float]:
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 1e6
+    except (OSError, ValueError):
+        return None
+
+
+def _bytes_read() -> Optional[int]:
+    # rchar counts every read() including sockets, so downloads are covered too
+    try:
+        with open("/proc/self/io") as f:
+            for line in f:
+                if line.startswith("rchar:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def _peak_rss_mb() -> float:
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return peak / (1e6 if sys.platform == "darwin" else 1e3)
+
+
+def _rows(value: Any) -> Optional[int]:
+    return len(value) if hasattr(value, "__len__") and hasattr(value, "columns") else None
+
+
+class _Stack(threading.local):
+    def __init__(self):
+        self.frames: List[Tuple["Recorder", StageRecord]] = []
+
+
+# Open stages of the calling thread, innermost last
+_stack = _Stack()
+# Recorder that most recently opened a stage; subprocesses started from threads
+# without a stage of their own (executor pools) are reported to it
+_active: Optional["Recorder"] = None
+
+
+class Recorder:
+    """Per-run collection of stage and subprocess records"""
+
+    def __init__(self, cache=None, profile: Sequence[str] = (), profile_dir: Optional[PathLike] = None,
+                 profiler: str = "cprofile", trace_memory: bool = False):
+        if profiler not in PROFILERS:
+            raise ValueError(f"Unknown profiler {profiler}; expected one of {PROFILERS}")
+        self.cache = cache
+        self.profile: Set[str] = set(profile)  # stage names, or "all"
+        self.profile_dir = Path(profile_dir) if profile_dir else Path("profiles")
+        self.profiler = profiler
+        self.trace_memory = trace_memory
+        self.records: List[StageRecord] = []
+        self.unattributed: List[SubprocessRecord] = []
+        self._open: List[StageRecord] = []
+        self._lock = threading.Lock()
+        self.start_run()
+
+    def start_run(self) -> str:
+        """Begin a new run: fresh run_id, and only stages still open are kept"""
+        with self._lock:
+            self.run_id = uuid.uuid4().hex[:12]
+            self.started = time.strftime("%Y-%m-%dT%H:%M:%S")
+            self.records = list(self._open)
+            self.unattributed = []
+        return self.run_id
+
+    def _cache_snapshot(self) -> Dict[str, Dict[str, int]]:
+        if self.cache is None:
+            return {}
+        return {stage: dict(counts) for stage, counts in list(self.cache.thread_stats().items())}
+
+    def _profiled(self, name: str) -> bool:
+        return bool(self.profile) and ("all" in self.profile or name in self.profile)
+
+    @contextmanager
+    def _profiling(self, record: StageRecord) -> Iterator[None]:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        stem = str(self.profile_dir / f"{self.run_id}_{record.stage}")
+        if self.profiler == "pyinstrument":
+            from pyinstrument import Profiler  # optional dependency
+
+            profiler = Profiler()
+            profiler.start()
+            try:
+                yield
+            finally:
+                profiler.stop()
+                record.profile = f"{stem}.html"
+                Path(record.profile).write_text(profiler.output_html())
+            return
+
+        import cProfile
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            record.profile = f"{stem}.prof"
+            profiler.dump_stats(record.profile)
+
+    @contextmanager
+    def stage(self, name: str, rows_in: Optional[int] = None) -> Iterator[StageRecord]:
+        """Record one stage; set .rows_in / .rows_out (or .status) on the yielded record"""
+        global _active
+        stack = _stack.frames
+        record = StageRecord(
+            stage=name, parent=stack[-1][1].stage if stack else None, thread=threading.current_thread().name,
+            started=time.strftime("%Y-%m-%dT%H:%M:%S"), rows_in=rows_in,
+        )
+        if self.trace_memory:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+        cache_before = self._cache_snapshot()
+        read_before = _bytes_read()
+        rss_before = _rss_mb()
+        cpu_start = time.thread_time()
+        start = time.perf_counter()
+
+        stack.append((self, record))
+        _active = self
+        with self._lock:
+            self._open.append(record)
+            self.records.append(record)
+        try:
+            if self._profiled(name):
+                with self._profiling(record):
+                    yield record
+            else:
+                yield record
+            if record.status == "running":
+                record.status = "ok"
+        except BaseException as e:
+            record.status = "failed"
+            record.error = f"{type(e).__name__}: {e}"[:500]
+            raise
+        finally:
+            record.wall_s = round(time.perf_counter() - start, 6)
+            record.cpu_s = round(time.thread_time() - cpu_start, 6)
+            rss_after = _rss_mb()
+            record.rss_peak_mb = round(_peak_rss_mb(), 1)
+            if rss_before is not None and rss_after is not None:
+                record.rss_delta_mb = round(rss_after - rss_before, 1)
+            if self.trace_memory:
+                record.traced_peak_mb = round(tracemalloc.get_traced_memory()[1] / 1e6, 1)
+            read_after = _bytes_read()
+            if read_before is not None and read_after is not None:
+                record.bytes_read = read_after - read_before
+            for cache_stage, counts in self._cache_snapshot().items():
+                before = cache_before.get(cache_stage, {})
+                delta = {k: v - before.get(k, 0) for k, v in counts.items() if v - before.get(k, 0)}
+                if delta:
+                    record.cache[cache_stage] = delta
+            stack.pop()
+            with self._lock:
+                self._open.remove(record)
+
+    def record_subprocess(self, command: Union[str, Sequence[str]], wall_s: float,
+                          returncode: Optional[int], status: str = "ok") -> None:
+        """Attach a finished subprocess to the calling thread's stage
+
+        Worker threads (e.g. the ddG executor pool) have no stage of their own;
+        their subprocesses go to the most recently opened stage still running.
+        """
+        text = command if isinstance(command, str) else " ".join(str(part) for part in command)
+        entry = SubprocessRecord(text[:300], round(wall_s, 6), returncode, status)
+        own = [record for recorder, record in _stack.frames if recorder is self]
+        with self._lock:
+            stage = own[-1] if own else (self._open[-1] if self._open else None)
+            entry.stage = stage.stage if stage else None
+            (stage.subprocesses if stage else self.unattributed).append(entry)
+
+    def manifest(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = [asdict(record) for record in self.records]
+            unattributed = [asdict(entry) for entry in self.unattributed]
+        top = [s for s in stages if s["parent"] is None]
+        return {
+            "run_id": self.run_id,
+            "started": self.started,
+            "finished": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "argv": sys.argv,
+            "host": socket.gethostname(),
+            "python": platform.python_version(),
+            "totals": {
+                "wall_s": round(sum(s["wall_s"] for s in top), 3),
+                "cpu_s": round(sum(s["cpu_s"] for s in top), 3),
+                "rss_peak_mb": round(_peak_rss_mb(), 1),
+                "subprocesses": sum(len(s["subprocesses"]) for s in stages) + len(unattributed),
+                "failed": [s["stage"] for s in stages if s["status"] == "failed"],
+            },
+            "stages": stages,
+            "unattributed_subprocesses": unattributed,
+            "cache": self.cache.summary() if self.cache is not None else None,
+        }
+
+    def write_manifest(self, path: PathLike) -> Path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.manifest(), indent=2, default=str))
+        os.replace(tmp, path)
+        logger.info(f"Run manifest written to {path}")
+        return path
+
+
+def record_subprocess(command: Union[str, Sequence[str]], wall_s: float,
+                      returncode: Optional[int], status: str = "ok") -> None:
+    """Report a finished subprocess to the calling thread's recorder, else the active one"""
+    recorder = _stack.frames[-1][0] if _stack.frames else _active
+    if recorder is not None:
+        recorder.record_subprocess(command, wall_s, returncode, status)
+
+
+def run_subprocess(command: Union[str, Sequence[str]], **kwargs) -> subprocess.CompletedProcess:
+    """subprocess.run, recorded"""
+    start = time.perf_counter()
+    returncode: Optional[int] = None
+    status = "failed"
+    try:
+        result = subprocess.run(command, **kwargs)
+        returncode = result.returncode
+        status = "ok" if returncode == 0 else "failed"
+        return result
+    except subprocess.CalledProcessError as e:
+        returncode = e.returncode
+        raise
+    except subprocess.TimeoutExpired:
+        status = "timeout"
+        raise
+    finally:
+        record_subprocess(command, time.perf_counter() - start, returncode, status)
+
+
+def instrumented(name: str):
+    """Method decorator: record the call as stage `name` on self.instrumentation
+
+    rows_in is the length of the first DataFrame argument and rows_out the
+    length of a DataFrame result, when there are any.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            recorder: Optional[Recorder] = getattr(self, "instrumentation", None)
+            if recorder is None:
+                return method(self, *args, **kwargs)
+            rows_in = next((_rows(a) for a in args if _rows(a) is not None), None)
+            with recorder.stage(name, rows_in) as record:
+                result = method(self, *args, **kwargs)
+                record.rows_out = _rows(result)
+            return result
+        return wrapper
+    return decorator
+
+
+def note(**fields) -> None:
+    """Set fields (e.g. rows_in) on the calling thread's current stage, if any"""
+    if not _stack.frames:
+        return
+    record = _stack.frames[-1][1]
+    for key, value in fields.items():
+        setattr(record, key, value)
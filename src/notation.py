@@ -0,0 +1,109 @@
+"""
+Vectorized variant-notation codec
+Converts whole columns between one-letter (R403Q), three-letter (Arg403Gln) and
+HGVS (p.Arg403Gln) notation, and packs substitutions into compact integer keys
+(position * 400 + wt * 20 + mut) so tables can be joined on int64 columns.
+"""
+
+from typing import Tuple
+
+import numpy as np
+import pandas as pd
+
+# Canonical amino-acid order; indices 0..19 are used in variant keys
+AMINO_ACIDS = "ACDEFGHIKLMNPQRSTVWY"
+ONE_LETTER = np.array(list(AMINO_ACIDS))
+THREE_LETTER = np.array([
+    "Ala", "Cys", "Asp", "Glu", "Phe", "Gly", "His", "Ile", "Lys", "Leu",
+    "Met", "Asn", "Pro", "Gln", "Arg", "Ser", "Thr", "Val", "Trp", "Tyr",
+])
+
+N_AA = len(AMINO_ACIDS)
+KEY_STRIDE = N_AA * N_AA
+INVALID_KEY = -1
+
+NOTATIONS = ("one", "three", "hgvs")
+
+
+def _codes(values: pd.Series, alphabet: np.ndarray) -> np.ndarray:
+    """Map amino-acid codes to 0..19 (or -1) without a Python-level loop"""
+    return pd.Categorical(values, categories=alphabet).codes.astype(np.int16)
+
+
+def parse_variants(values: pd.Series, notation: str = "three") -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Split a column of substitutions into position, wt index and mut index arrays
+
+    Unparsable entries (stop codons, frameshifts, missing values) get position 0
+    and amino-acid index -1.
+    """
+    if notation not in NOTATIONS:
+        raise ValueError(f"Unknown notation {notation}; expected one of {NOTATIONS}")
+
+    values = pd.Series(values, copy=False).astype("string")
+    if notation == "hgvs":
+        values = values.str.replace(r"^p\.\(?|\)$", "", regex=True)
+
+    width = 1 if notation == "one" else 3
+    alphabet = ONE_LETTER if notation == "one" else THREE_LETTER
+
+    wt = _codes(values.str[:width], alphabet)
+    mut = _codes(values.str[-width:], alphabet)
+    pos = pd.to_numeric(values.str[width:-width], errors="coerce")
+    pos = pos.where(pos > 0).fillna(0).to_numpy(dtype=np.int64)
+
+    invalid = (wt < 0) | (mut < 0) | (pos == 0)
+    wt[invalid] = -1
+    mut[invalid] = -1
+    pos[invalid] = 0
+    return pos, wt, mut
+
+
+def encode_keys(pos: np.ndarray, wt: np.ndarray, mut: np.ndarray) -> np.ndarray:
+    """Pack (position, wt, mut) arrays into int64 variant keys"""
+    pos = np.asarray(pos, dtype=np.int64)
+    wt = np.asarray(wt, dtype=np.int64)
+    mut = np.asarray(mut, dtype=np.int64)
+    keys = pos * KEY_STRIDE + wt * N_AA + mut
+    keys[(pos <= 0) | (wt < 0) | (mut < 0)] = INVALID_KEY
+    return keys
+
+
+def decode_keys(keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Unpack int64 variant keys into (position, wt index, mut index) arrays"""
+    keys = np.asarray(keys, dtype=np.int64)
+    pos, rest = np.divmod(keys, KEY_STRIDE)
+    wt, mut = np.divmod(rest, N_AA)
+    return pos, wt.astype(np.int16), mut.astype(np.int16)
+
+
+def variant_keys(values: pd.Series, notation: str = "three") -> np.ndarray:
+    """Integer variant keys for a column of substitutions; -1 where unparsable"""
+    return encode_keys(*parse_variants(values, notation))
+
+
+def format_variants(pos: np.ndarray, wt: np.ndarray, mut: np.ndarray,
+                    notation: str = "three") -> pd.Series:
+    """Render (position, wt, mut) arrays as strings in the requested notation"""
+    if notation not in NOTATIONS:
+        raise ValueError(f"Unknown notation {notation}; expected one of {NOTATIONS}")
+
+    alphabet = ONE_LETTER if notation == "one" else THREE_LETTER
+    wt = np.asarray(wt)
+    mut = np.asarray(mut)
+    valid = (wt >= 0) & (mut >= 0)
+
+    text = (
+        pd.Series(alphabet[np.where(valid, wt, 0)])
+        + pd.Series(np.asarray(pos)).astype(str)
+        + pd.Series(alphabet[np.where(valid, mut, 0)])
+    )
+    if notation == "hgvs":
+        text = "p." + text
+    return text.where(valid)
+
+
+def convert_notation(values: pd.Series, source: str, target: str) -> pd.Series:
+    """Convert a column of substitutions between notations; NaN where unparsable"""
+    converted = format_variants(*parse_variants(values, source), notation=target)
+    converted.index = pd.Series(values, copy=False).index
+    return converted
@@ -0,0 +1,127 @@
+"""
+HCM sarcomere panel mode
+Scans ClinVar and AlphaMissense once for every panel gene, fans the rows out to
+the per-gene caches used by MYH7VariantAnalyzer, then runs the gene-level
+analysis in a process pool and assembles one panel-wide table and a summary
+report broken down by gene.
+"""
+
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from .cache_manager import CacheManager
+from .clinvar_stream import CLINVAR_URL, DEFAULT_CHUNKSIZE, read_clinvar_variants
+from .report import write_summary_report
+from .table_cache import apply_schema, export_csv, write_table
+from .variant_analysis import HCM_GENE_PANEL, MYH7VariantAnalyzer
+
+logger = logging.getLogger(__name__)
+
+
+def _analyze_gene(gene: str, data_dir: str, results_dir: str, clinvar_source: str) -> pd.DataFrame:
+    """Gene-level analysis run inside a worker process"""
+    analyzer = MYH7VariantAnalyzer(data_dir=data_dir, results_dir=results_dir, gene=gene)
+    analyzer.clinvar_source = clinvar_source
+    combined = analyzer.combine_data()
+    analyzer.generate_summary_report(combined)
+    return combined
+
+
+class HCMPanelAnalyzer:
+    """Single-pass multi-gene driver for the HCM sarcomere panel"""
+
+    def __init__(self, genes: Optional[List[str]] = None, data_dir: str = "data/variants",
+                 results_dir: str = "results", max_workers: Optional[int] = None):
+        self.genes = list(genes) if genes is not None else list(HCM_GENE_PANEL)
+        unknown = [g for g in self.genes if g not in HCM_GENE_PANEL]
+        if unknown:
+            raise ValueError(f"Unknown panel genes: {unknown}")
+
+        self.data_dir = Path(data_dir)
+        self.results_dir = Path(results_dir)
+        self.data_dir.mkdir(parents=True, exist_ok=True)
+        self.results_dir.mkdir(parents=True, exist_ok=True)
+
+        self.max_workers = max_workers or min(len(self.genes), os.cpu_count() or 1)
+        self.clinvar_source = CLINVAR_URL
+
+        self.cache = CacheManager(self.data_dir / "cache")
+        self._source_ids: Dict[str, Dict[str, str]] = {}
+
+    def _analyzer(self, gene: str) -> MYH7VariantAnalyzer:
+        analyzer = MYH7VariantAnalyzer(self.data_dir, self.results_dir / gene, gene=gene)
+        analyzer.clinvar_source = self.clinvar_source
+        # Share one cache index and one set of validated source identities
+        analyzer.cache = self.cache
+        analyzer._source_ids = self._source_ids
+        return analyzer
+
+    def fetch_sources(self, force_refresh: bool = False,
+                      chunksize: int = DEFAULT_CHUNKSIZE) -> None:
+        """Scan each source once and write every gene's ClinVar/AlphaMissense cache entry"""
+        analyzers = {gene: self._analyzer(gene) for gene in self.genes}
+
+        clinvar_keys = {gene: a.clinvar_cache_key() for gene, a in analyzers.items()}
+        clinvar_genes = [
+            gene for gene in self.genes
+            if force_refresh or self.cache.lookup(clinvar_keys[gene], "clinvar") is None
+        ]
+        if clinvar_genes:
+            logger.info(f"Scanning ClinVar once for {len(clinvar_genes)} genes...")
+            clinvar = read_clinvar_variants(self.clinvar_source, clinvar_genes, chunksize=chunksize)
+            clinvar = MYH7VariantAnalyzer._with_variant_key(clinvar)
+            by_gene = dict(tuple(clinvar.groupby("GeneSymbol")))
+            for gene in clinvar_genes:
+                vars_df = by_gene.get(gene, clinvar.iloc[:0]).reset_index(drop=True)
+                self.cache.put_table(clinvar_keys[gene], "clinvar", vars_df, schema="clinvar",
+                                     ttl=analyzers[gene].cache_ttls["clinvar"])
+                logger.info(f"Found {len(vars_df)} {gene} variants from ClinVar")
+
+        am_keys = {gene: a.alphamissense_cache_key() for gene, a in analyzers.items()}
+        am_genes = [
+            gene for gene in self.genes
+            if force_refresh or self.cache.lookup(am_keys[gene], "alphamissense") is None
+        ]
+        if am_genes:
+            logger.info(f"Scanning AlphaMissense once for {len(am_genes)} genes...")
+            accessions = [HCM_GENE_PANEL[gene] for gene in am_genes]
+            am = MYH7VariantAnalyzer.read_alphamissense_rows(
+                accessions, self.data_dir, self.data_dir / "alphamissense_store"
+            )
+            by_accession = dict(tuple(am.groupby("uniprot")))
+            for gene in am_genes:
+                rows = by_accession.get(HCM_GENE_PANEL[gene], am.iloc[:0])
+                scores = analyzers[gene]._format_alphamissense(rows)
+                self.cache.put_table(am_keys[gene], "alphamissense", scores, schema="alphamissense",
+                                     ttl=analyzers[gene].cache_ttls["alphamissense"])
+                logger.info(f"Retrieved {len(scores)} {gene} AlphaMissense scores")
+
+    def run(self, force_refresh: bool = False) -> pd.DataFrame:
+        """Fetch once, analyze genes in parallel and save the panel-wide table"""
+        self.fetch_sources(force_refresh=force_refresh)
+
+        logger.info(f"Analyzing {len(self.genes)} genes with {self.max_workers} workers...")
+        with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+            futures = {
+                gene: pool.submit(_analyze_gene, gene, str(self.data_dir),
+                                  str(self.results_dir / gene), str(self.clinvar_source))
+                for gene in self.genes
+            }
+            tables = [futures[gene].result() for gene in self.genes]
+
+        # Per-gene categoricals have different categories; re-apply after concat
+        panel = apply_schema(pd.concat(tables, ignore_index=True), "combined")
+
+        output_file = self.results_dir / "HCM_panel_comprehensive.parquet"
+        write_table(panel, output_file, "combined")
+        export_csv(panel, output_file.with_suffix(".csv"))
+
+        write_summary_report(panel, self.results_dir, "HCM panel", by="GeneSymbol")
+
+        logger.info(f"Panel dataset saved with {len(panel)} variants across {len(self.genes)} genes")
+        return panel
@@ -0,0 +1,280 @@
+"""
+Stage DAG runner
+The analysis pipeline as a DAG of stages. Each stage declares its upstream
+stages, a fingerprint of its external inputs (usually the content-addressed
+cache key of what it computes) and the files it writes. A stage re-executes
+only when its input fingerprint, chained with the output fingerprints of its
+upstream stages, differs from the one recorded in the state file, or when one
+of its outputs is missing. Stages whose upstreams are done run concurrently in
+a thread pool (the fetches are network and subprocess bound; every stage reads
+and writes through the process-safe CacheManager). With a Recorder, every
+stage (skipped ones included) is instrumented and the run's manifest is
+written next to the state file.
+
+    python -m src.pipeline_dag --results results --rosetta-top-n 20
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from .cache_manager import CacheManager, code_version
+from .instrumentation import MANIFEST_FILE, Recorder
+
+logger = logging.getLogger(__name__)
+
+STATE_FILE = "pipeline_state.json"
+
+
+def fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+@dataclass
+class Stage:
+    name: str
+    run: Callable[[], Any]
+    after: Tuple[str, ...] = ()
+    # Identity of everything outside the DAG the stage reads; evaluated in the worker
+    inputs: Optional[Callable[[], Any]] = None
+    outputs: Tuple[Path, ...] = ()
+
+
+class Pipeline:
+    """Fingerprinting, concurrent runner for a set of stages"""
+
+    def __init__(self, stages: Sequence[Stage], state_path: Path, cache: CacheManager,
+                 max_workers: Optional[int] = None, recorder: Optional[Recorder] = None):
+        self.stages = {stage.name: stage for stage in stages}
+        if len(self.stages) != len(stages):
+            raise ValueError("Stage names must be unique")
+        for stage in stages:
+            missing = set(stage.after) - set(self.stages)
+            if missing:
+                raise ValueError(f"Stage {stage.name} depends on unknown stages {sorted(missing)}")
+        self.order = self._topological_order()
+        self.state_path = Path(state_path)
+        self.cache = cache
+        self.max_workers = max_workers or min(len(stages), os.cpu_count() or 1)
+        self.recorder = recorder
+        self.manifest_path = self.state_path.parent / MANIFEST_FILE
+        self._lock = threading.Lock()
+        try:
+            self.state: Dict[str, Dict[str, Any]] = json.loads(self.state_path.read_text())
+        except (OSError, ValueError):
+            self.state = {}
+
+    def _topological_order(self) -> List[str]:
+        order: List[str] = []
+        marks: Dict[str, str] = {}
+
+        def visit(name: str) -> None:
+            if marks.get(name) == "done":
+                return
+            if marks.get(name) == "visiting":
+                raise ValueError(f"Stage graph has a cycle through {name}")
+            marks[name] = "visiting"
+            for upstream in self.stages[name].after:
+                visit(upstream)
+            marks[name] = "done"
+            order.append(name)
+
+        for name in self.stages:
+            visit(name)
+        return order
+
+    def _input_fingerprint(self, stage: Stage, upstream: Dict[str, str]) -> str:
+        return fingerprint({
+            "inputs": stage.inputs() if stage.inputs is not None else None,
+            "upstream": {name: upstream[name] for name in stage.after},
+        })
+
+    def _output_fingerprint(self, stage: Stage, inputs: str) -> str:
+        # A stage without files is a pure function of its inputs (cached by key)
+        if not stage.outputs:
+            return inputs
+        return fingerprint([self.cache.file_identity(path) for path in stage.outputs])
+
+    def _execute(self, stage: Stage, upstream: Dict[str, str], force: bool) -> Tuple[str, str]:
+        """(status, output fingerprint) of one stage; runs in a worker thread"""
+        if self.recorder is None:
+            return self._execute_stage(stage, upstream, force)
+        with self.recorder.stage(f"dag.{stage.name}") as record:
+            status, outputs = self._execute_stage(stage, upstream, force)
+            if status == "skipped":
+                record.status = "skipped"
+        return status, outputs
+
+    def _execute_stage(self, stage: Stage, upstream: Dict[str, str], force: bool) -> Tuple[str, str]:
+        inputs = self._input_fingerprint(stage, upstream)
+        previous = self.state.get(stage.name, {})
+        fresh = (
+            not force
+            and previous.get("inputs") == inputs
+            and all(Path(path).exists() for path in stage.outputs)
+        )
+        if fresh:
+            logger.info(f"Stage {stage.name}: up to date")
+            # Recomputed so outputs edited outside the pipeline still invalidate downstream
+            return "skipped", self._output_fingerprint(stage, inputs)
+
+        logger.info(f"Stage {stage.name}: running")
+        start = time.perf_counter()
+        stage.run()
+        elapsed = time.perf_counter() - start
+        outputs = self._output_fingerprint(stage, inputs)
+        with self._lock:
+            self.state[stage.name] = {"inputs": inputs, "outputs": outputs, "seconds": round(elapsed, 3),
+                                      "finished": time.strftime("%Y-%m-%dT%H:%M:%S")}
+            self._save_state()
+        logger.info(f"Stage {stage.name}: done in {elapsed:.1f}s")
+        return "ran", outputs
+
+    def _save_state(self) -> None:
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2, sort_keys=True))
+        os.replace(tmp, self.state_path)
+
+    def run(self, targets: Optional[Sequence[str]] = None,
+            force: Sequence[str] = ()) -> Dict[str, str]:
+        """Run the targets (default: every stage) and their upstreams; name -> ran/skipped
+
+        Stages named in force re-execute regardless of their fingerprints. If a
+        stage fails, stages already running finish, nothing downstream starts
+        and the first error is re-raised.
+        """
+        wanted = set()
+        pending = list(targets or self.order)
+        while pending:
+            name = pending.pop()
+            if name not in self.stages:
+                raise ValueError(f"Unknown stage {name}; expected one of {self.order}")
+            if name not in wanted:
+                wanted.add(name)
+                pending.extend(self.stages[name].after)
+        remaining = [name for name in self.order if name in wanted]
+
+        fingerprints: Dict[str, str] = {}
+        status: Dict[str, str] = {}
+        if self.recorder is not None:
+            # One manifest per run, even when the analyzer (and its recorder) is reused
+            self.recorder.start_run()
+        try:
+            self._schedule(remaining, force, fingerprints, status)
+        finally:
+            if self.recorder is not None:
+                self.recorder.write_manifest(self.manifest_path)
+        return status
+
+    def _schedule(self, remaining: List[str], force: Sequence[str],
+                  fingerprints: Dict[str, str], status: Dict[str, str]) -> None:
+        error: Optional[BaseException] = None
+        running: Dict[Future, str] = {}
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while remaining or running:
+                if error is None:
+                    for name in [n for n in remaining if all(u in fingerprints for u in self.stages[n].after)]:
+                        remaining.remove(name)
+                        running[pool.submit(self._execute, self.stages[name], dict(fingerprints),
+                                            name in force)] = name
+                elif not running:
+                    break
+                if not running:
+                    raise ValueError(f"Stages {remaining} cannot be scheduled")
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        status[name], fingerprints[name] = future.result()
+                    except Exception as e:
+                        logger.error(f"Stage {name} failed: {e}")
+                        status[name] = "failed"
+                        error = error or e
+        if error is not None:
+            raise error
+
+
+def analysis_pipeline(analyzer, rosetta_top_n: Optional[int] = None,
+                      max_workers: Optional[int] = None) -> Pipeline:
+    """fetch ClinVar / AlphaMissense / pLDDT -> [ddG] -> combine -> figures, report
+
+    The ddG stage is included only when rosetta_top_n is given; without it the
+    combine stage still picks up an earlier run's published ddG results.
+    """
+    from . import rendering, report
+    from .table_cache import read_table
+
+    results_dir = analyzer.results_dir
+    combined_file = results_dir / f"{analyzer.gene}_variants_comprehensive.parquet"
+    report_file = results_dir / report.REPORT_FILE
+
+    def structure_inputs() -> Dict[str, str]:
+        # The structure must be on disk before its hash can key the pLDDT stage
+        analyzer._ensure_structure(analyzer.pdb_file)
+        return {
+            "plddt": analyzer.plddt_cache_key(analyzer.pdb_file),
+            "features": analyzer.features_cache_key(analyzer.pdb_file),
+        }
+
+    def structure() -> None:
+        analyzer.extract_alphafold_plddt()
+        analyzer.extract_structural_features()
+
+    def combined():
+        return read_table(combined_file)
+
+    stages = [
+        Stage("clinvar", analyzer.fetch_clinvar_variants, inputs=analyzer.clinvar_cache_key),
+        Stage("alphamissense", analyzer.fetch_alphamisense_scores, inputs=analyzer.alphamissense_cache_key),
+        Stage("plddt", structure, inputs=structure_inputs),
+    ]
+    combine_after: Tuple[str, ...] = ("clinvar", "alphamissense", "plddt")
+    if rosetta_top_n is not None:
+        stages.append(Stage(
+            "ddg", lambda: analyzer.run_rosetta_ddg_analysis(top_n=rosetta_top_n),
+            after=("clinvar", "alphamissense", "plddt"),
+            inputs=lambda: analyzer.rosetta_cache_key(analyzer.ddg_candidates(rosetta_top_n), rosetta_top_n),
+            outputs=(results_dir / "rosetta_ddg_results.parquet",),
+        ))
+        combine_after += ("ddg",)
+    stages += [
+        Stage("combine", analyzer.combine_data, after=combine_after, inputs=analyzer.combined_cache_key,
+              outputs=(combined_file,)),
+        # Figures keep their own per-figure manifest, so this stage is cheap when rerun
+        Stage("figures", lambda: analyzer.create_analysis_visualizations(combined()),
+              after=("combine",), inputs=lambda: code_version(rendering)),
+        Stage("report", lambda: analyzer.generate_summary_report(combined()), after=("combine",),
+              inputs=lambda: code_version(report), outputs=(report_file,)),
+    ]
+    return Pipeline(stages, results_dir / STATE_FILE, analyzer.cache, max_workers, analyzer.instrumentation)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the variant analysis stage DAG")
+    parser.add_argument("--gene", default="MYH7")
+    parser.add_argument("--data", default="data/variants")
+    parser.add_argument("--results", default="results")
+    parser.add_argument("--rosetta-top-n", type=int, help="Include the ddG stage for the top N variants")
+    parser.add_argument("--stage", action="append", help="Run only these stages (and their upstreams)")
+    parser.add_argument("--force", action="append", default=[], help="Re-execute these stages")
+    parser.add_argument("--workers", type=int)
+    args = parser.parse_args()
+
+    from .variant_analysis import MYH7VariantAnalyzer
+
+    analyzer = MYH7VariantAnalyzer(data_dir=args.data, results_dir=args.results, gene=args.gene)
+    pipeline = analysis_pipeline(analyzer, args.rosetta_top_n, args.workers)
+    print(json.dumps(pipeline.run(args.stage, args.force), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,377 @@
+"""
+Scalable figure rendering
+Figures are described declaratively (FigureSpec of Panels) and rendered from
+small payloads prepared in NumPy: scatter panels with more points than
+POINT_THRESHOLD are pre-binned into a 2-D histogram (counts, or the mean of the
+colour column per bin) instead of drawing every point, histograms and bar
+charts are counted up front. Independent figures render in a process pool,
+and a figure is skipped when the hash of its input columns and spec matches
+the one recorded in the output directory's render manifest.
+
+    python -m src.rendering results/MYH7_comprehensive_analysis.csv --out results/figures
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .cache_manager import code_version
+
+logger = logging.getLogger(__name__)
+
+POINT_THRESHOLD = 5000
+BINS = 120
+RENDER_MANIFEST = ".render_manifest.json"
+
+PathLike = Union[str, Path]
+
+# Reference line: (value, colour, linestyle, label); empty label for none
+Line = Tuple[float, str, str, str]
+
+
+@dataclass(frozen=True)
+class Panel:
+    """One axes: kind is scatter, hist or bar (counts of the x categories)"""
+    kind: str
+    x: str
+    y: Optional[str] = None
+    color: Optional[str] = None  # column mapped through cmap
+    facecolor: str = "steelblue"
+    cmap: str = "viridis"
+    colorbar: str = ""
+    title: str = ""
+    xlabel: str = ""
+    ylabel: str = ""
+    hlines: Tuple[Line, ...] = ()
+    vlines: Tuple[Line, ...] = ()
+    # Highlighted points: all of (column, ">" or "<", value) hold
+    highlight: Tuple[Tuple[str, str, float], ...] = ()
+    highlight_label: str = ""
+    annotate_corr: bool = False
+    bins: int = 40
+    size: float = 20
+    alpha: float = 0.6
+    grid: bool = True
+
+    def columns(self) -> List[str]:
+        names = [self.x, self.y, self.color] + [column for column, _, _ in self.highlight]
+        return list(dict.fromkeys(name for name in names if name))
+
+
+@dataclass(frozen=True)
+class FigureSpec:
+    name: str  # output file name
+    panels: Tuple[Panel, ...]
+    layout: Tuple[int, int] = (1, 1)
+    figsize: Tuple[float, float] = (10, 6)
+    dpi: int = 300
+    style: str = "seaborn-v0_8"
+    suptitle: str = ""
+
+    def columns(self) -> List[str]:
+        return list(dict.fromkeys(column for panel in self.panels for column in panel.columns()))
+
+
+def _highlight_mask(df: pd.DataFrame, panel: Panel) -> np.ndarray:
+    mask = np.ones(len(df), dtype=bool)
+    for column, op, value in panel.highlight:
+        values = df[column].to_numpy(dtype=float, na_value=np.nan)
+        mask &= values > value if op == ">" else values < value
+    return mask
+
+
+def _numeric(df: pd.DataFrame, column: str) -> np.ndarray:
+    return pd.to_numeric(df[column], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+
+
+def prepare_panel(df: pd.DataFrame, panel: Panel, threshold: int = POINT_THRESHOLD,
+                  bins: int = BINS) -> Dict[str, Any]:
+    """Reduce a panel's data to what the drawing step needs"""
+    if panel.kind == "bar":
+        counts = df[panel.x].astype("object").fillna("Unknown").value_counts()
+        return {"mode": "bar", "labels": [str(label) for label in counts.index], "counts": counts.to_numpy()}
+
+    x = _numeric(df, panel.x)
+    if panel.kind == "hist":
+        finite = x[np.isfinite(x)]
+        counts, edges = np.histogram(finite, bins=panel.bins)
+        return {"mode": "hist", "counts": counts, "edges": edges}
+
+    y = _numeric(df, panel.y)
+    c = _numeric(df, panel.color) if panel.color else None
+    valid = np.isfinite(x) & np.isfinite(y)
+    if c is not None:
+        valid &= np.isfinite(c)
+    payload: Dict[str, Any] = {"n": int(valid.sum())}
+    if panel.annotate_corr:
+        both = valid if c is None else np.isfinite(x) & np.isfinite(y)
+        payload["r"] = float(np.corrcoef(x[both], y[both])[0, 1]) if both.sum() > 1 else float("nan")
+    highlight = _highlight_mask(df, panel) & valid if panel.highlight else None
+    if highlight is not None:
+        payload["highlight_n"] = int(highlight.sum())
+
+    if payload["n"] <= threshold:
+        payload.update(mode="scatter", x=x[valid], y=y[valid], c=None if c is None else c[valid])
+        if highlight is not None:
+            payload["highlight"] = highlight[valid]
+        return payload
+
+    # Pre-binned: counts per cell, or the mean colour value per cell
+    xv, yv = x[valid], y[valid]
+    counts, xedges, yedges = np.histogram2d(xv, yv, bins=bins)
+    payload.update(mode="binned", xedges=xedges, yedges=yedges, counts=counts)
+    if c is not None:
+        sums, _, _ = np.histogram2d(xv, yv, bins=[xedges, yedges], weights=c[valid])
+        with np.errstate(invalid="ignore", divide="ignore"):
+            payload["mean"] = sums / counts
+    if highlight is not None:
+        # Highlighted points stay individual while they are few enough
+        if highlight.sum() <= threshold:
+            payload["hx"], payload["hy"] = xv[highlight[valid]], yv[highlight[valid]]
+        else:
+            payload["hcounts"] = np.histogram2d(xv[highlight[valid]], yv[highlight[valid]],
+                                                bins=[xedges, yedges])[0]
+    return payload
+
+
+def _draw_lines(ax, panel: Panel) -> None:
+    for value, colour, style, label in panel.hlines:
+        ax.axhline(value, color=colour, linestyle=style, alpha=0.7, label=label or None)
+    for value, colour, style, label in panel.vlines:
+        ax.axvline(value, color=colour, linestyle=style, linewidth=2, label=label or None)
+
+
+def _draw_panel(fig, ax, panel: Panel, payload: Dict[str, Any]) -> None:
+    from matplotlib.colors import LogNorm
+
+    mode = payload["mode"]
+    if mode == "bar":
+        positions = np.arange(len(payload["counts"]))
+        ax.bar(positions, payload["counts"], color=panel.facecolor)
+        ax.set_xticks(positions)
+        ax.set_xticklabels(payload["labels"], rotation=45, ha="right")
+    elif mode == "hist":
+        edges = payload["edges"]
+        ax.bar(edges[:-1], payload["counts"], width=np.diff(edges), align="edge",
+               alpha=0.7, color=panel.facecolor, edgecolor="black")
+    elif mode == "scatter":
+        if "highlight" in payload:
+            colours = np.where(payload["highlight"], "red", "lightgray")
+            ax.scatter(payload["x"], payload["y"], c=colours, alpha=panel.alpha, s=panel.size)
+        elif payload["c"] is not None:
+            mappable = ax.scatter(payload["x"], payload["y"], c=payload["c"], cmap=panel.cmap,
+                                  alpha=panel.alpha, s=panel.size)
+            fig.colorbar(mappable, ax=ax, label=panel.colorbar)
+        else:
+            ax.scatter(payload["x"], payload["y"], c=panel.facecolor, alpha=panel.alpha, s=panel.size)
+    else:
+        xedges, yedges = payload["xedges"], payload["yedges"]
+        counts = payload["counts"]
+        if "mean" in payload:
+            values = np.ma.masked_invalid(payload["mean"]).T
+            mappable = ax.pcolormesh(xedges, yedges, values, cmap=panel.cmap)
+            fig.colorbar(mappable, ax=ax, label=f"{panel.colorbar} (bin mean)")
+        else:
+            cmap = "Greys" if panel.highlight else "Blues"
+            mappable = ax.pcolormesh(xedges, yedges, np.ma.masked_equal(counts, 0).T,
+                                     cmap=cmap, norm=LogNorm())
+            fig.colorbar(mappable, ax=ax, label="Variants per bin")
+        if "hx" in payload:
+            ax.scatter(payload["hx"], payload["hy"], c="red", alpha=panel.alpha, s=panel.size)
+        elif "hcounts" in payload:
+            ax.pcolormesh(xedges, yedges, np.ma.masked_equal(payload["hcounts"], 0).T, cmap="Reds",
+                          norm=LogNorm(), alpha=0.8)
+
+    _draw_lines(ax, panel)
+    ax.set_xlabel(panel.xlabel or panel.x, fontsize=12)
+    ax.set_ylabel(panel.ylabel or (panel.y or "Number of Variants"), fontsize=12)
+    ax.set_title(panel.title, fontsize=14, fontweight="bold")
+    if "r" in payload:
+        ax.text(0.05, 0.95, f"r = {payload['r']:.3f}", transform=ax.transAxes, va="top",
+                bbox=dict(boxstyle="round", facecolor="white", alpha=0.8))
+    if "highlight_n" in payload and panel.highlight_label:
+        ax.text(0.05, 0.95, f"{panel.highlight_label}: {payload['highlight_n']}", transform=ax.transAxes,
+                va="top", bbox=dict(boxstyle="round", facecolor="white", alpha=0.8))
+    if any(label for *_, label in panel.hlines + panel.vlines):
+        ax.legend()
+    if panel.grid:
+        ax.grid(True, alpha=0.3)
+
+
+def draw_figure(spec: FigureSpec, payloads: Sequence[Optional[Dict[str, Any]]], path: PathLike) -> str:
+    """Draw prepared payloads and save the figure (runs in a worker process)"""
+    import matplotlib
+    matplotlib.use("Agg")
+    import matplotlib.pyplot as plt
+
+    plt.style.use(spec.style)
+    rows, cols = spec.layout
+    fig, axes = plt.subplots(rows, cols, figsize=spec.figsize, squeeze=False)
+    for ax, panel, payload in zip(axes.flat, spec.panels, payloads):
+        if payload is None:
+            ax.set_axis_off()
+            continue
+        _draw_panel(fig, ax, panel, payload)
+    for ax in list(axes.flat)[len(spec.panels):]:
+        ax.set_axis_off()
+    if spec.suptitle:
+        fig.suptitle(spec.suptitle, fontsize=16, fontweight="bold")
+    fig.tight_layout()
+    fig.savefig(path, dpi=spec.dpi, bbox_inches="tight")
+    plt.close(fig)
+    return str(path)
+
+
+def figure_hash(df: pd.DataFrame, spec: FigureSpec, threshold: int = POINT_THRESHOLD) -> str:
+    """Hash of the spec, the rendering code and the spec's input columns"""
+    h = hashlib.sha256()
+    h.update(json.dumps(asdict(spec), sort_keys=True, default=str).encode())
+    h.update(f"{threshold}:{code_version(prepare_panel, _draw_panel, draw_figure)}".encode())
+    columns = [column for column in spec.columns() if column in df.columns]
+    if columns:
+        h.update(pd.util.hash_pandas_object(df[columns], index=False).to_numpy().tobytes())
+    return h.hexdigest()[:16]
+
+
+def _usable(df: pd.DataFrame, panel: Panel) -> bool:
+    """The panel's columns exist and it has something to draw"""
+    if not all(column in df.columns for column in panel.columns()):
+        return False
+    if panel.kind == "bar":
+        return True
+    return bool(df[[c for c in (panel.x, panel.y) if c]].notna().all(axis=1).any())
+
+
+def render_figures(specs: Sequence[FigureSpec], data: pd.DataFrame, out_dir: PathLike,
+                   max_workers: Optional[int] = None, threshold: int = POINT_THRESHOLD,
+                   force: bool = False) -> Dict[str, str]:
+    """Render every stale figure; name -> "rendered" / "unchanged" / "skipped"
+
+    A figure whose panels all lack their columns is skipped; panels that
+    individually lack data are left blank.
+    """
+    out_dir = Path(out_dir)
+    out_dir.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_dir / RENDER_MANIFEST
+    try:
+        manifest = json.loads(manifest_path.read_text())
+    except (OSError, ValueError):
+        manifest = {}
+
+    status: Dict[str, str] = {}
+    jobs = []
+    for spec in specs:
+        usable = [_usable(data, panel) for panel in spec.panels]
+        if not any(usable):
+            status[spec.name] = "skipped"
+            continue
+        digest = figure_hash(data, spec, threshold)
+        if not force and manifest.get(spec.name) == digest and (out_dir / spec.name).exists():
+            status[spec.name] = "unchanged"
+            continue
+        payloads = [prepare_panel(data, panel, threshold) if ok else None
+                    for panel, ok in zip(spec.panels, usable)]
+        jobs.append((spec, payloads, out_dir / spec.name, digest))
+
+    if len(jobs) == 1 or max_workers == 1:
+        for spec, payloads, path, _ in jobs:
+            draw_figure(spec, payloads, path)
+    elif jobs:
+        workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(draw_figure, spec, payloads, path) for spec, payloads, path, _ in jobs]
+            for future in futures:
+                future.result()
+
+    for spec, _, _, digest in jobs:
+        manifest[spec.name] = digest
+        status[spec.name] = "rendered"
+    if jobs:
+        manifest_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    logger.info(
+        f"Figures in {out_dir}: {len(jobs)} rendered, "
+        f"{sum(s == 'unchanged' for s in status.values())} unchanged"
+    )
+    return status
+
+
+def analysis_figures(am: str = "AlphaMissense_score") -> List[FigureSpec]:
+    """The analyzer's per-gene figures"""
+    return [
+        FigureSpec("plddt_vs_alphamisense.png", (
+            Panel("scatter", "pLDDT", am, color="Residue", colorbar="Residue Position",
+                  title="Structural Confidence vs Pathogenicity", xlabel="AlphaFold Confidence (pLDDT)",
+                  ylabel="AlphaMissense Pathogenicity Score"),
+        )),
+        FigureSpec("rosetta_analysis.png", (
+            Panel("scatter", am, "Rosetta_ddG", title="Pathogenicity vs Structural Stability",
+                  xlabel="AlphaMissense Score", ylabel="Rosetta ΔΔG (REU)", alpha=0.7),
+            Panel("scatter", "pLDDT", "Rosetta_ddG", facecolor="orange", title="Confidence vs Stability Change",
+                  xlabel="pLDDT", ylabel="Rosetta ΔΔG (REU)", alpha=0.7),
+        ), layout=(1, 2), figsize=(15, 6)),
+        FigureSpec("clinical_significance_distribution.png", (
+            Panel("bar", "ClinicalSignificance", title="Distribution of Clinical Significance",
+                  xlabel="", ylabel="Number of Variants", grid=False),
+        ), figsize=(12, 6)),
+    ]
+
+
+def comprehensive_figure(df: pd.DataFrame, gene: str = "MYH7", am: str = "AlphaMissense") -> FigureSpec:
+    """The six-panel publication figure of run_analysis.py"""
+    am_mean = float(df[am].mean()) if am in df.columns else 0.0
+    return FigureSpec(f"{gene}_comprehensive_analysis.png", (
+        Panel("scatter", am, "Rosetta_ddG", title="🎯 Pathogenicity vs Structural Stability",
+              xlabel="AlphaMissense Pathogenicity Score", ylabel="Rosetta ΔΔG (REU)", size=30,
+              annotate_corr=True),
+        Panel("hist", am, facecolor="coral", title="🧬 Pathogenicity Distribution",
+              xlabel="AlphaMissense Score", bins=40,
+              vlines=((am_mean, "darkred", "--", ""), (0.8, "red", ":", "High pathogenicity"))),
+        Panel("hist", "Rosetta_ddG", facecolor="orange", title="⚖️ Stability Changes",
+              xlabel="Rosetta ΔΔG (REU)", bins=30,
+              vlines=((0.0, "red", "-", "Neutral"), (1.0, "darkred", "--", "Destabilizing"),
+                      (-1.0, "blue", "--", "Stabilizing"))),
+        Panel("scatter", "pLDDT", am, color="Residue", colorbar="Residue Position",
+              title="🗺️ Confidence vs Pathogenicity", xlabel="AlphaFold Confidence (pLDDT)",
+              ylabel="AlphaMissense Score", size=25,
+              hlines=((0.8, "red", ":", ""),), vlines=((90.0, "red", ":", ""),)),
+        Panel("scatter", am, "Rosetta_ddG", title="🚨 High-Impact Variants", xlabel="AlphaMissense Score",
+              ylabel="Rosetta ΔΔG (REU)", size=25, alpha=0.7,
+              hlines=((1.0, "red", "--", ""),), vlines=((0.8, "red", "--", ""),),
+              highlight=((am, ">", 0.8), ("Rosetta_ddG", ">", 1.0)), highlight_label="High-impact"),
+        Panel("scatter", "Residue", am, facecolor="purple", title="🧪 Pathogenicity Along Sequence",
+              xlabel="Residue Position", ylabel="AlphaMissense Score", size=15, alpha=0.5,
+              hlines=((0.8, "red", "--", ""),)),
+    ), layout=(2, 3), figsize=(16, 12))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Render the analysis figures for a combined table")
+    parser.add_argument("table", help="Combined table (.csv or .parquet)")
+    parser.add_argument("--out", default="results/figures")
+    parser.add_argument("--gene", default="MYH7")
+    parser.add_argument("--workers", type=int, help="Render processes (default: one per figure)")
+    parser.add_argument("--threshold", type=int, default=POINT_THRESHOLD,
+                        help="Scatter panels with more points are drawn pre-binned")
+    parser.add_argument("--force", action="store_true", help="Re-render unchanged figures")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    path = Path(args.table)
+    df = pd.read_parquet(path) if path.suffix == ".parquet" else pd.read_csv(path)
+    am = "AlphaMissense_score" if "AlphaMissense_score" in df.columns else "AlphaMissense"
+    specs = analysis_figures(am) + [comprehensive_figure(df, args.gene, am)]
+    status = render_figures(specs, df, args.out, args.workers, args.threshold, args.force)
+    print(json.dumps(status, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+"""
+Markdown summary report
+Built from the combined table alone, so it can be regenerated without the
+analyzer, its caches or any source refetch. Every number comes from one
+stats_engine pass.
+
+    python -m src.cli report --results results
+    python -m src.cli report --by Nearest_site
+"""
+
+import logging
+from pathlib import Path
+from typing import Optional, Union
+
+import pandas as pd
+
+from .stats_engine import VariantStats, compute_stats, variant_stats_spec
+
+logger = logging.getLogger(__name__)
+
+REPORT_FILE = "analysis_summary_report.md"
+
+
+def summary_report(data: pd.DataFrame, gene: str = "MYH7", by: Optional[str] = None) -> str:
+    """Markdown summary of a combined variant table, optionally broken down by a column"""
+    am = "AlphaMissense_score"
+    stats = compute_stats(data, variant_stats_spec(am, top_k=10))
+    
+    report = []
+    report.append(f"# {gene} Variant Analysis Summary Report\n")
+    
+    # Basic statistics
+    report.append(f"## Dataset Overview")
+    report.append(f"- Total variants analyzed: {len(data)}")
+    report.append(f"- Variants with AlphaMissense scores: {stats.agg(am, 'count')}")
+    report.append(f"- Variants with pLDDT scores: {stats.agg('pLDDT', 'count')}")
+    
+    if stats.has("Rosetta_ddG"):
+        report.append(f"- Variants with Rosetta ΔΔG: {stats.agg('Rosetta_ddG', 'count')}")
+    
+    # Score distributions
+    report.append(f"\n## Score Distributions")
+    if stats.has(am):
+        report.append(f"- AlphaMissense: mean={stats.agg(am, 'mean'):.3f}, std={stats.agg(am, 'std'):.3f}")
+    
+    if stats.has("pLDDT"):
+        report.append(f"- pLDDT: mean={stats.agg('pLDDT', 'mean'):.1f}, std={stats.agg('pLDDT', 'std'):.1f}")
+    
+    # Top pathogenic variants
+    if stats.has(am):
+        report.append(f"\n## Top 10 Most Pathogenic Variants (AlphaMissense)")
+        top_pathogenic = stats.top_rows("pathogenic")
+        for change, score in zip(top_pathogenic["ProteinChange"], top_pathogenic[am]):
+            report.append(f"- {change}: {score:.3f}")
+    
+    # Correlations
+    if stats.agg("Rosetta_ddG", "count") > 5:
+        report.append(f"\n## Correlations")
+        report.append(
+            f"- AlphaMissense vs Rosetta ΔΔG: r={stats.corr(am, 'Rosetta_ddG'):.3f}, "
+            f"ρ={stats.corr(am, 'Rosetta_ddG', 'spearman'):.3f}"
+        )
+    
+    if by is not None:
+        report.append(f"\n## By {by}")
+        report.append(_group_table(compute_stats(data, variant_stats_spec(am, top_k=1), by=by), am))
+    
+    return "\n".join(report)
+
+
+def _fmt(value: float, spec: str) -> str:
+    return "-" if pd.isna(value) else format(value, spec)
+
+
+def _group_table(stats: VariantStats, am: str) -> str:
+    """Markdown table with one row per group"""
+    lines = [
+        f"| {stats.by} | Variants | AlphaMissense mean | AlphaMissense > 0.8 | pLDDT mean | Top variant |",
+        "|---|---|---|---|---|---|",
+    ]
+    for group in stats.groups:
+        top = stats.top_rows("pathogenic", group) if "pathogenic" in stats.top else pd.DataFrame()
+        top_variant = f"{top['ProteinChange'].iloc[0]} ({top[am].iloc[0]:.3f})" if len(top) else "-"
+        lines.append(
+            f"| {'(none)' if pd.isna(group) else group} | {stats.rows[group]} | "
+            f"{_fmt(stats.agg(am, 'mean', group), '.3f')} | {stats.count('am_high', group)} | "
+            f"{_fmt(stats.agg('pLDDT', 'mean', group), '.1f')} | {top_variant} |"
+        )
+    return "\n".join(lines)
+
+
+def write_summary_report(data: pd.DataFrame, results_dir: Union[str, Path], gene: str = "MYH7",
+                         by: Optional[str] = None) -> str:
+    """Write REPORT_FILE into results_dir and return the text"""
+    report_text = summary_report(data, gene, by)
+    report_file = Path(results_dir) / REPORT_FILE
+    with open(report_file, 'w') as f:
+        f.write(report_text)
+    
+    logger.info(f"Summary report saved to {report_file}")
+    return report_text
@@ -0,0 +1,311 @@
+"""
+Resampling tests for correlations
+Bootstrap percentile confidence intervals and two-sided permutation p-values
+for Pearson and Spearman correlations, with optional strata (resampling and
+shuffling stay within each stratum), named subsets (e.g. pLDDT > 90,
+AlphaMissense > 0.9) and multiple-testing correction across every reported
+test. Resamples are drawn as (chunk x n) index matrices; a chunk is sized to
+stay under max_bytes. Bootstrap draws are reduced to per-pair counts, so
+Pearson sums are one matrix product and Spearman ranks of each resample
+come from cumulative counts over the tie blocks of the original sort order
+(ties averaged exactly as scipy/pandas do) without sorting any resample.
+
+    python -m src.resampling MYH7_variants_final_annotated.csv --x AlphaMissense --y Rosetta_ddG
+"""
+
+import argparse
+import logging
+from typing import Dict, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from .stats_engine import OPERATORS, Threshold
+
+logger = logging.getLogger(__name__)
+
+METHODS = ("pearson", "spearman")
+CORRECTIONS = ("holm", "bonferroni", "fdr_bh", "none")
+DEFAULT_MAX_BYTES = 256 * 2**20
+
+
+def manuscript_subsets(am: str = "AlphaMissense") -> Tuple[Threshold, ...]:
+    """Subset analyses reported next to the headline correlation"""
+    return (
+        Threshold("pLDDT > 90", "pLDDT", ">", 90),
+        Threshold("AlphaMissense > 0.9", am, ">", 0.9),
+    )
+
+
+class _Ranker:
+    """Tie blocks of one variable, for ranks under arbitrary per-pair counts"""
+
+    def __init__(self, values: np.ndarray):
+        self.order = np.argsort(values, kind="stable")
+        self.sorted = bool((self.order == np.arange(len(values))).all())
+        ordered = values[self.order]
+        first = np.concatenate(([True], ordered[1:] != ordered[:-1]))
+        self.starts = np.flatnonzero(first)
+        self.ties = len(self.starts) < len(values)
+        self.block = np.empty(len(values), dtype=np.intp)
+        self.block[self.order] = np.cumsum(first) - 1
+
+    def block_ranks(self, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """(rows x blocks) counts and centered average ranks of each tie block
+
+        Every resample has counts.sum(axis=1) observations, so the mean rank is
+        known exactly and ranks can be centered before any products.
+        """
+        ordered = counts if self.sorted else np.take(counts, self.order, axis=1)
+        block_counts = np.add.reduceat(ordered, self.starts, axis=1) if self.ties else ordered
+        ranks = np.cumsum(block_counts, axis=1)
+        half = block_counts - 1
+        half *= 0.5
+        ranks -= half
+        ranks -= (counts.sum(axis=1, keepdims=True) + 1) / 2
+        return block_counts, ranks
+
+
+def _spearman(counts: np.ndarray, rank_x: _Ranker, rank_y: _Ranker) -> np.ndarray:
+    """Row-wise Spearman rho with pair i counted counts[:, i] times
+
+    Squared rank sums need only the tie blocks of one variable; the cross sum
+    gathers y ranks once and reduces over the x blocks.
+    """
+    counts_x, ranks_x = rank_x.block_ranks(counts)
+    counts_y, ranks_y = rank_y.block_ranks(counts)
+    sxx = (counts_x * ranks_x * ranks_x).sum(axis=1, dtype=float)
+    syy = (counts_y * ranks_y * ranks_y).sum(axis=1, dtype=float)
+    weighted_y = np.take(ranks_y, rank_y.block, axis=1)
+    weighted_y *= counts
+    if not rank_x.sorted:
+        weighted_y = np.take(weighted_y, rank_x.order, axis=1)
+    if rank_x.ties:
+        weighted_y = np.add.reduceat(weighted_y, rank_x.starts, axis=1)
+    sxy = (weighted_y * ranks_x).sum(axis=1, dtype=float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+
+
+def _pearson(counts: np.ndarray, zx: np.ndarray, zy: np.ndarray) -> np.ndarray:
+    """Row-wise Pearson r of standardized zx, zy with pair i counted counts[:, i] times
+
+    Standardized inputs keep every resample mean near zero, so raw moments
+    from one matrix product lose no precision to cancellation.
+    """
+    total = counts.sum(axis=1, dtype=float)
+    moments = np.column_stack([zx, zy, zx * zx, zy * zy, zx * zy]).astype(counts.dtype)
+    sums = (counts @ moments).astype(float)
+    mean_x, mean_y = sums[:, 0] / total, sums[:, 1] / total
+    sxx = sums[:, 2] - total * mean_x ** 2
+    syy = sums[:, 3] - total * mean_y ** 2
+    sxy = sums[:, 4] - total * mean_x * mean_y
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.clip(sxy / np.sqrt(sxx * syy), -1.0, 1.0)
+
+
+def _standardize(values: np.ndarray) -> np.ndarray:
+    std = values.std()
+    return (values - values.mean()) / (std if std > 0 else 1.0)
+
+
+def _average_ranks(values: np.ndarray) -> np.ndarray:
+    ranker = _Ranker(values)
+    _, ranks = ranker.block_ranks(np.ones((1, len(values))))
+    return ranks[0, ranker.block] + (len(values) + 1) / 2
+
+
+def _chunks(n_resamples: int, n: int, max_bytes: int, per_element: int):
+    """Yield chunk sizes whose working matrices stay under max_bytes"""
+    size = max(1, min(n_resamples, max_bytes // max(1, n * per_element)))
+    for start in range(0, n_resamples, size):
+        yield min(size, n_resamples - start)
+
+
+def _strata_members(strata: Optional[np.ndarray], n: int) -> Sequence[np.ndarray]:
+    if strata is None:
+        return [np.arange(n)]
+    codes, _ = pd.factorize(strata, use_na_sentinel=False)
+    order = np.argsort(codes, kind="stable")
+    return np.split(order, np.cumsum(np.bincount(codes))[:-1])
+
+
+def correlation(x: np.ndarray, y: np.ndarray, method: str = "pearson") -> float:
+    """Correlation of complete pairs"""
+    if method not in METHODS:
+        raise ValueError(f"Unknown method {method}; expected one of {METHODS}")
+    if method == "spearman":
+        x, y = _average_ranks(x), _average_ranks(y)
+    return float(_pearson(np.ones((1, len(x))), _standardize(x), _standardize(y))[0])
+
+
+def bootstrap_distribution(x: np.ndarray, y: np.ndarray, methods: Sequence[str] = METHODS,
+                           n_resamples: int = 10_000, strata: Optional[np.ndarray] = None,
+                           rng: Optional[np.random.Generator] = None,
+                           max_bytes: int = DEFAULT_MAX_BYTES) -> Dict[str, np.ndarray]:
+    """method -> n_resamples bootstrap correlations (pairs resampled with replacement)"""
+    rng = rng or np.random.default_rng()
+    n = len(x)
+    # Pairs in x order, so x's tie blocks are contiguous in every count matrix
+    order = np.argsort(x, kind="stable")
+    x, y = x[order], y[order]
+    members = _strata_members(None if strata is None else strata[order], n)
+    zx, zy = _standardize(x), _standardize(y)
+    rankers = (_Ranker(x), _Ranker(y)) if "spearman" in methods else None
+    out = {method: [] for method in methods}
+    # Index and bincount matrices (int64), then float32 counts and rank temporaries
+    for rows in _chunks(n_resamples, n, max_bytes, per_element=16):
+        if len(members) == 1:
+            index = rng.integers(0, n, size=(rows, n))
+        else:
+            index = np.concatenate(
+                [group[rng.integers(0, len(group), size=(rows, len(group)))] for group in members], axis=1
+            )
+        index += (np.arange(rows) * n)[:, None]
+        # Counts, ranks (halves) and their partial sums are exact in float32 at these sizes
+        counts = np.bincount(index.ravel(), minlength=rows * n).reshape(rows, n).astype(np.float32)
+        del index
+        if "pearson" in methods:
+            out["pearson"].append(_pearson(counts, zx, zy))
+        if rankers:
+            out["spearman"].append(_spearman(counts, *rankers))
+    return {method: np.concatenate(values) for method, values in out.items()}
+
+
+def permutation_distribution(x: np.ndarray, y: np.ndarray, methods: Sequence[str] = METHODS,
+                             n_resamples: int = 10_000, strata: Optional[np.ndarray] = None,
+                             rng: Optional[np.random.Generator] = None,
+                             max_bytes: int = DEFAULT_MAX_BYTES) -> Dict[str, np.ndarray]:
+    """method -> n_resamples correlations with y shuffled (within strata) against x"""
+    rng = rng or np.random.default_rng()
+    n = len(x)
+    members = _strata_members(strata, n)
+    # Ranks are invariant under shuffling, so Spearman is Pearson of fixed ranks
+    scores = {"pearson": (x, y), "spearman": (_average_ranks(x), _average_ranks(y))}
+    standardized = {m: (_standardize(scores[m][0]), _standardize(scores[m][1])) for m in methods}
+    out = {method: [] for method in methods}
+    for rows in _chunks(n_resamples, n, max_bytes, per_element=16):
+        # One set of shuffles serves every method; each stratum is shuffled in place
+        if len(members) == 1:
+            shuffled = np.tile(np.arange(n), (rows, 1))
+            rng.permuted(shuffled, axis=1, out=shuffled)
+        else:
+            shuffled = np.empty((rows, n), dtype=np.intp)
+            for group in members:
+                block = np.tile(group, (rows, 1))
+                rng.permuted(block, axis=1, out=block)
+                shuffled[:, group] = block
+        for method in methods:
+            zx, zy = standardized[method]
+            # Standardized vectors: r is the mean product, one gather and one matvec
+            out[method].append(np.clip(np.take(zy, shuffled) @ zx / n, -1.0, 1.0))
+    return {method: np.concatenate(values) for method, values in out.items()}
+
+
+def adjust_pvalues(pvalues: Sequence[float], method: str = "holm") -> np.ndarray:
+    """Family-wise (Bonferroni, Holm) or false-discovery-rate (Benjamini-Hochberg) adjustment"""
+    p = np.asarray(pvalues, dtype=float)
+    m = len(p)
+    if method == "none" or m == 0:
+        return p.copy()
+    if method == "bonferroni":
+        return np.minimum(p * m, 1.0)
+    order = np.argsort(p, kind="stable")
+    adjusted = np.empty(m)
+    if method == "holm":
+        adjusted[order] = np.minimum(np.maximum.accumulate(p[order] * (m - np.arange(m))), 1.0)
+    elif method == "fdr_bh":
+        scaled = p[order] * m / np.arange(1, m + 1)
+        adjusted[order] = np.minimum(np.minimum.accumulate(scaled[::-1])[::-1], 1.0)
+    else:
+        raise ValueError(f"Unknown correction {method}; expected one of {CORRECTIONS}")
+    return adjusted
+
+
+def correlation_tests(df: pd.DataFrame, x: str = "AlphaMissense", y: str = "Rosetta_ddG",
+                      subsets: Sequence[Threshold] = (), methods: Sequence[str] = METHODS,
+                      n_resamples: int = 10_000, confidence: float = 0.95,
+                      correction: str = "holm", strata: Optional[str] = None, seed: int = 0,
+                      max_bytes: int = DEFAULT_MAX_BYTES) -> pd.DataFrame:
+    """One row per (subset, method): n, r, bootstrap CI, permutation p and adjusted p
+
+    The full table is always tested as subset "all"; each Threshold adds the
+    rows passing it. p-values are adjusted across every row of the result.
+    """
+    unknown = set(methods) - set(METHODS)
+    if unknown:
+        raise ValueError(f"Unknown methods {sorted(unknown)}; expected some of {METHODS}")
+    rng = np.random.default_rng(seed)
+    pairs = df[x].notna() & df[y].notna()
+    tail = (1 - confidence) / 2
+
+    rows = []
+    for subset in (None, *subsets):
+        mask = pairs.to_numpy()
+        if subset is not None:
+            mask = mask & OPERATORS[subset.op](df[subset.column], subset.value).fillna(False).to_numpy()
+        xv = df.loc[mask, x].to_numpy(dtype=float)
+        yv = df.loc[mask, y].to_numpy(dtype=float)
+        groups = df.loc[mask, strata].to_numpy() if strata else None
+        name = "all" if subset is None else subset.label
+        if len(xv) < 3:
+            logger.warning(f"Subset {name}: {len(xv)} complete pairs, skipped")
+            continue
+        boot = bootstrap_distribution(xv, yv, methods, n_resamples, groups, rng, max_bytes)
+        null = permutation_distribution(xv, yv, methods, n_resamples, groups, rng, max_bytes)
+        for method in methods:
+            r = correlation(xv, yv, method)
+            low, high = np.nanquantile(boot[method], [tail, 1 - tail])
+            # Two-sided, counting the observed statistic as one of the permutations
+            extreme = np.count_nonzero(np.abs(null[method]) >= abs(r) - 1e-12)
+            rows.append({
+                "subset": name, "method": method, "n": len(xv), "r": r,
+                "ci_low": low, "ci_high": high, "p_value": (extreme + 1) / (n_resamples + 1),
+            })
+
+    result = pd.DataFrame(rows, columns=["subset", "method", "n", "r", "ci_low", "ci_high", "p_value"])
+    result["p_adjusted"] = adjust_pvalues(result["p_value"], correction)
+    result.attrs.update(n_resamples=n_resamples, confidence=confidence, correction=correction,
+                        strata=strata, seed=seed)
+    return result
+
+
+def format_tests(result: pd.DataFrame) -> str:
+    """Plain-text lines in the manuscript's style"""
+    level = f"{result.attrs.get('confidence', 0.95):.0%}"
+    lines = []
+    for row in result.itertuples(index=False):
+        symbol = "r" if row.method == "pearson" else "ρ"
+        lines.append(
+            f"{row.subset} ({row.method}): {symbol} = {row.r:.4f}, {level} CI [{row.ci_low:.3f}, {row.ci_high:.3f}], "
+            f"p = {row.p_value:.3g} (adjusted {row.p_adjusted:.3g}), n = {row.n:,}"
+        )
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bootstrap CIs and permutation p-values for correlations")
+    parser.add_argument("table", help="Parquet or CSV table")
+    parser.add_argument("--x", default="AlphaMissense")
+    parser.add_argument("--y", default="Rosetta_ddG")
+    parser.add_argument("--resamples", type=int, default=10_000)
+    parser.add_argument("--confidence", type=float, default=0.95)
+    parser.add_argument("--correction", choices=CORRECTIONS, default="holm")
+    parser.add_argument("--strata", help="Resample and shuffle within groups of this column")
+    parser.add_argument("--no-subsets", action="store_true", help="Only test the full table")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", help="Write the result table to this CSV")
+    args = parser.parse_args()
+
+    df = pd.read_parquet(args.table) if args.table.endswith(".parquet") else pd.read_csv(args.table)
+    subsets = () if args.no_subsets else manuscript_subsets(args.x)
+    result = correlation_tests(df, args.x, args.y, subsets, n_resamples=args.resamples,
+                               confidence=args.confidence, correction=args.correction,
+                               strata=args.strata, seed=args.seed)
+    print(format_tests(result))
+    if args.out:
+        result.to_csv(args.out, index=False)
+
+
+if __name__ == "__main__":
+    main()
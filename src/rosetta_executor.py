@@ -0,0 +1,357 @@
+"""
+Parallel Rosetta ddg_monomer executor
+Runs point-mutation ddG jobs concurrently, each in its own scratch directory,
+collecting stdout/stderr, exit codes and runtimes. Timed-out jobs are killed
+together with any children they spawned. Results come back as the familiar
+ProteinChange / Rosetta_ddG / Status table.
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+import numpy as np
+import pandas as pd
+
+from .instrumentation import record_subprocess
+from .notation import AMINO_ACIDS, THREE_LETTER
+from .structure_crop import CropOptions, CroppableStructure
+
+logger = logging.getLogger(__name__)
+
+ONE_TO_THREE = dict(zip(AMINO_ACIDS, THREE_LETTER))
+
+OUTPUT_TAIL_CHARS = 2000
+CRASH_LOG = "ROSETTA_CRASH.log"
+
+
+@dataclass(frozen=True)
+class DDGTask:
+    """One point mutation in Rosetta mutfile terms (one-letter codes)"""
+    chain: str
+    position: int
+    wt: str
+    mut: str
+
+    @property
+    def name(self) -> str:
+        return f"{self.chain}{self.position}{self.wt}{self.mut}"
+
+    @property
+    def protein_change(self) -> str:
+        return f"{ONE_TO_THREE[self.wt]}{self.position}{ONE_TO_THREE[self.mut]}"
+
+    @property
+    def mutfile_line(self) -> str:
+        return f"{self.chain} {self.position} {self.wt} {self.mut}\n"
+
+    @classmethod
+    def from_mutfile_line(cls, line: str) -> Optional["DDGTask"]:
+        parts = line.strip().split()
+        if len(parts) != 4:
+            return None
+        chain, pos, wt, mut = parts
+        if wt not in ONE_TO_THREE or mut not in ONE_TO_THREE:
+            return None
+        return cls(chain, int(pos), wt, mut)
+
+
+@dataclass
+class DDGOutcome:
+    """Result of one ddg_monomer invocation"""
+    task: DDGTask
+    ddg: float = np.nan
+    status: str = "Pending"
+    returncode: Optional[int] = None
+    runtime: float = 0.0
+    stdout: str = ""
+    stderr: str = ""
+    workdir: Optional[str] = None
+    extra: dict = field(default_factory=dict)
+
+    def as_row(self) -> dict:
+        return {
+            "ProteinChange": self.task.protein_change,
+            "Rosetta_ddG": self.ddg,
+            "Status": self.status,
+        }
+
+
+def read_mutfile(path: Union[str, Path]) -> List[DDGTask]:
+    """Parse a one-mutation-per-line 'chain pos wt mut' file"""
+    with open(path) as f:
+        return [t for t in (DDGTask.from_mutfile_line(line) for line in f) if t is not None]
+
+
+def parse_ddg_scorefile(score_file: Union[str, Path]) -> float:
+    """Parse Rosetta score file to extract ΔΔG"""
+    try:
+        with open(score_file, 'r') as f:
+            lines = f.readlines()
+
+        # Find the data line (skip header)
+        for line in lines:
+            if line.startswith('SCORE:') and 'ddG' in line:
+                parts = line.split()
+                # The ddG value is typically in a specific column
+                # This may need adjustment based on exact Rosetta output format
+                for i, part in enumerate(parts):
+                    if part == 'ddG' and i + 1 < len(parts):
+                        return float(parts[i + 1])
+
+        # Fallback: try to find numeric values
+        for line in lines[1:]:  # Skip header
+            if not line.startswith('#') and line.strip():
+                parts = line.split()
+                if len(parts) >= 3:
+                    try:
+                        return float(parts[2])  # Assuming ddG is 3rd column
+                    except ValueError:
+                        continue
+
+        return np.nan
+
+    except Exception as e:
+        logger.error(f"Error parsing score file {score_file}: {e}")
+        return np.nan
+
+
+def kill_process_group(proc: subprocess.Popen, grace: float) -> None:
+    """SIGTERM the job's process group, then SIGKILL whatever is left after a grace period"""
+    for sig, wait in ((signal.SIGTERM, grace), (signal.SIGKILL, None)):
+        try:
+            os.killpg(proc.pid, sig)
+        except ProcessLookupError:
+            return
+        try:
+            proc.wait(timeout=wait)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+class RosettaDDGExecutor:
+    """Run ddg_monomer for many variants concurrently with isolated working directories"""
+
+    def __init__(self, executable: Union[str, Path], structure: Union[str, Path],
+                 max_workers: Optional[int] = None, timeout: float = 300,
+                 iterations: int = 3, scratch_root: Optional[Union[str, Path]] = None,
+                 keep_scratch: bool = False, extra_args: Optional[List[str]] = None,
+                 kill_grace: float = 10.0, crop: Optional[CropOptions] = None):
+        self.executable = str(Path(executable).resolve())
+        self.structure = str(Path(structure).resolve())
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.timeout = timeout
+        self.iterations = iterations
+        self.scratch_root = Path(scratch_root).resolve() if scratch_root else None
+        self.keep_scratch = keep_scratch
+        self.extra_args = list(extra_args or [])
+        self.kill_grace = kill_grace
+        self.crop = crop
+        self._croppable: Dict[str, CroppableStructure] = {}
+        self._live: set = set()
+        self._live_lock = threading.Lock()
+
+        if self.scratch_root is not None:
+            self.scratch_root.mkdir(parents=True, exist_ok=True)
+
+    def command(self, task: DDGTask, mutfile: Path, scorefile: str,
+                structure: Optional[str] = None) -> List[str]:
+        """ddg_monomer command line for one variant"""
+        return [
+            self.executable,
+            "-s", structure or self.structure,
+            "-ddg:mutfile", str(mutfile),
+            "-ddg:iterations", str(self.iterations),
+            "-out:file:scorefile", scorefile,
+            "-ddg:dump_pdbs", "false",
+            "-ignore_unrecognized_res",
+            "-mute", "all",
+            *self.extra_args,
+        ]
+
+    def _crop(self, task: DDGTask, structure: str, workdir: Path, outcome: DDGOutcome):
+        """Cropped structure and pose-numbered task for one variant"""
+        with self._live_lock:
+            if structure not in self._croppable:
+                self._croppable[structure] = CroppableStructure(structure)
+            croppable = self._croppable[structure]
+        crop = croppable.crop(task.chain, task.position, workdir / "site.pdb", self.crop,
+                              wt=ONE_TO_THREE[task.wt])
+        outcome.extra["crop_residues"] = crop.n_residues
+        outcome.extra["crop_segments"] = len(crop.segments)
+        return str(crop.path), DDGTask(task.chain, crop.site_pose, task.wt, task.mut)
+
+    def run_task(self, task: DDGTask, structure: Optional[str] = None) -> DDGOutcome:
+        """Run one variant in a fresh scratch directory"""
+        workdir = Path(tempfile.mkdtemp(prefix=f"ddg_{task.name}_", dir=self.scratch_root))
+        outcome = DDGOutcome(task=task, workdir=str(workdir))
+        structure = structure or self.structure
+        scorefile = f"score_{task.name}.sc"
+
+        start = time.perf_counter()
+        try:
+            # Cropped runs see the site renumbered in pose order
+            job_task = task
+            if self.crop is not None:
+                structure, job_task = self._crop(task, structure, workdir, outcome)
+
+            mutfile = workdir / "mutfile.txt"
+            mutfile.write_text(job_task.mutfile_line)
+            cmd = self.command(job_task, mutfile, scorefile, structure)
+
+            # New session so a timeout can take down the whole process group
+            launched = time.perf_counter()
+            proc = subprocess.Popen(
+                cmd, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, start_new_session=True,
+            )
+            with self._live_lock:
+                self._live.add(proc)
+            try:
+                stdout, stderr = proc.communicate(timeout=self.timeout)
+            except subprocess.TimeoutExpired:
+                kill_process_group(proc, self.kill_grace)
+                stdout, stderr = proc.communicate()
+                outcome.status = "Timeout"
+                logger.error(f"Timeout for variant {task.name}")
+            finally:
+                with self._live_lock:
+                    self._live.discard(proc)
+
+            outcome.returncode = proc.returncode
+            record_subprocess(
+                cmd, time.perf_counter() - launched, proc.returncode,
+                "timeout" if outcome.status == "Timeout" else "ok" if proc.returncode == 0 else "failed",
+            )
+            outcome.stdout = (stdout or "")[-OUTPUT_TAIL_CHARS:]
+            outcome.stderr = (stderr or "")[-OUTPUT_TAIL_CHARS:]
+
+            if outcome.status != "Timeout":
+                if proc.returncode == 0:
+                    score_path = workdir / scorefile
+                    if score_path.exists():
+                        outcome.ddg = parse_ddg_scorefile(score_path)
+                        outcome.status = "Success"
+                    else:
+                        logger.warning(f"Score file not found for {task.name}")
+                        outcome.status = "No output file"
+                else:
+                    logger.error(f"Rosetta failed for {task.name}: {outcome.stderr}")
+                    outcome.status = f"Error: {outcome.stderr[:100]}"
+
+            # Rosetta writes its crash report into the working directory
+            crash_log = workdir / CRASH_LOG
+            if crash_log.exists():
+                outcome.extra["crash_log"] = crash_log.read_text(errors="replace")[-OUTPUT_TAIL_CHARS:]
+
+        except (OSError, ValueError) as e:
+            # Crop/wild-type mismatches and missing binaries fail the same way on every attempt
+            logger.error(f"Could not launch Rosetta for {task.name}: {e}")
+            outcome.status = f"Invalid: {str(e)[:100]}"
+
+        finally:
+            outcome.runtime = time.perf_counter() - start
+            if not self.keep_scratch:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        return outcome
+
+    def run(self, tasks: Iterable[DDGTask],
+            on_result: Optional[Callable[[DDGOutcome], None]] = None) -> List[DDGOutcome]:
+        """Run all tasks with up to max_workers concurrent jobs, in input order"""
+        tasks = list(tasks)
+        outcomes: List[Optional[DDGOutcome]] = [None] * len(tasks)
+        logger.info(f"Running {len(tasks)} ddG jobs with {self.max_workers} workers...")
+
+        pool = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            futures = {pool.submit(self.run_task, task): i for i, task in enumerate(tasks)}
+            for done, future in enumerate(as_completed(futures), 1):
+                outcome = future.result()
+                outcomes[futures[future]] = outcome
+                logger.info(
+                    f"Processed variant {outcome.task.name} ({done}/{len(tasks)}): "
+                    f"{outcome.status} in {outcome.runtime:.1f}s"
+                )
+                if on_result is not None:
+                    on_result(outcome)
+        except BaseException:
+            # Ctrl-C or a failing callback: drop queued jobs and stop running ones
+            pool.shutdown(wait=False, cancel_futures=True)
+            self.terminate()
+            raise
+        finally:
+            pool.shutdown(wait=True)
+
+        return outcomes
+
+    def terminate(self) -> None:
+        """Kill every job currently running"""
+        with self._live_lock:
+            live = list(self._live)
+        for proc in live:
+            kill_process_group(proc, self.kill_grace)
+
+    def run_table(self, tasks: Iterable[DDGTask]) -> pd.DataFrame:
+        """Run all tasks and return the ProteinChange / Rosetta_ddG / Status table"""
+        outcomes = self.run(tasks)
+        return pd.DataFrame(
+            [o.as_row() for o in outcomes], columns=["ProteinChange", "Rosetta_ddG", "Status"]
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run ddg_monomer for a few mutations (one scheduler task)")
+    parser.add_argument("structure", help="Input PDB")
+    parser.add_argument("--executable", default="./ddg_monomer.linuxgccrelease")
+    parser.add_argument("--mutation", action="append", required=True, help="Mutfile line, e.g. 'A 403 R Q'")
+    parser.add_argument("--iterations", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=300)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--crop-radius", type=float, help="Run on the mutation site's environment only")
+    parser.add_argument("--crop-gap-fill", type=int, default=CropOptions.gap_fill,
+                        help="Keep unselected runs up to this length between cropped residues")
+    parser.add_argument("--cap-residues", type=int, default=CropOptions.cap_residues,
+                        help="Residues added at both ends of each cropped stretch")
+    parser.add_argument("--extra-arg", action="append", default=[], dest="extra_args",
+                        help="Extra ddg_monomer argument, repeatable (use --extra-arg=-flag for flags)")
+    parser.add_argument("--scratch", help="Scratch root (e.g. node-local storage)")
+    parser.add_argument("--out", required=True, help="JSON file for the outcome rows")
+    args = parser.parse_args()
+
+    tasks = [DDGTask.from_mutfile_line(line) for line in args.mutation]
+    if any(task is None for task in tasks):
+        parser.error("Mutations must be 'chain position wt mut' with one-letter codes")
+    executor = RosettaDDGExecutor(
+        args.executable, args.structure, max_workers=args.workers, timeout=args.timeout,
+        iterations=args.iterations, scratch_root=args.scratch, extra_args=args.extra_args,
+        crop=CropOptions(args.crop_radius, args.crop_gap_fill, args.cap_residues) if args.crop_radius else None,
+    )
+    outcomes = executor.run(tasks)
+    rows = [
+        {**o.as_row(), "Task": o.task.name, "ReturnCode": o.returncode, "Runtime": o.runtime}
+        for o in outcomes
+    ]
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = out.with_name(out.name + ".tmp")
+    tmp_path.write_text(json.dumps(rows, indent=1))
+    tmp_path.replace(out)
+    # Non-zero exit marks the scheduler task failed so it can be resubmitted
+    raise SystemExit(0 if all(o.status == "Success" for o in outcomes) else 1)
+
+
+if __name__ == "__main__":
+    main()
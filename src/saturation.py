@@ -0,0 +1,105 @@
+"""
+Saturation mutagenesis helpers
+Genetic-code tables for single-nucleotide reachability and wild-type sequence
+reconstruction for the saturation landscape, which is held in a VariantMatrix
+(every substitution as dense (n_positions, 20) arrays) and exported as a
+heatmap-ready matrix plus a long table.
+"""
+
+import logging
+from itertools import product
+from typing import Optional
+
+import numpy as np
+
+from .notation import AMINO_ACIDS, N_AA, THREE_LETTER, decode_keys
+
+logger = logging.getLogger(__name__)
+
+BASES = "TCAG"
+# Standard genetic code in TCAG order (codon index = 16 * b1 + 4 * b2 + b3)
+GENETIC_CODE = "FFLLSSSSYY**CC*WLLLLPPPPHHQQRRRRIIIMTTTTNNKKSSRRVVVVAAAADDEEGGGG"
+CODONS = ["".join(c) for c in product(BASES, repeat=3)]
+
+AA_INDEX = {aa: i for i, aa in enumerate(AMINO_ACIDS)}
+THREE_INDEX = {name.upper(): i for i, name in enumerate(THREE_LETTER)}
+
+# How landscape columns are stored in a VariantMatrix; all other scores are per residue
+VARIANT_COLUMNS = ("AlphaMissense_score", "ClinVar_observed", "SNV_reachable", "Rosetta_ddG")
+LABEL_COLUMNS = ("AlphaMissense_class", "ClinicalSignificance")
+
+
+def codon_reachability() -> np.ndarray:
+    """(64, 20) bool: amino acids reachable from each codon by one nucleotide change"""
+    table = np.zeros((len(CODONS), N_AA), dtype=bool)
+    for c, codon in enumerate(CODONS):
+        for i, base in product(range(3), BASES):
+            if base == codon[i]:
+                continue
+            aa = GENETIC_CODE[CODONS.index(codon[:i] + base + codon[i + 1:])]
+            if aa != "*":
+                table[c, AA_INDEX[aa]] = True
+    return table
+
+
+def amino_acid_reachability() -> np.ndarray:
+    """(20, 20) bool: wt -> mut reachable by one nucleotide change from any wt codon"""
+    per_codon = codon_reachability()
+    codon_aa = np.array([AA_INDEX.get(aa, -1) for aa in GENETIC_CODE])
+    table = np.zeros((N_AA, N_AA), dtype=bool)
+    for aa in range(N_AA):
+        table[aa] = per_codon[codon_aa == aa].any(axis=0)
+    return table
+
+
+def snv_reachable(wt: np.ndarray, cds: Optional[str] = None) -> np.ndarray:
+    """(n_positions, 20) bool SNV reachability
+
+    With the coding sequence the actual codon at each position is used;
+    without it a substitution counts as reachable if any codon of the wild-type
+    amino acid reaches it.
+    """
+    wt = np.asarray(wt)
+    if cds is None:
+        reach = amino_acid_reachability()[np.where(wt >= 0, wt, 0)]
+        reach[wt < 0] = False
+        return reach
+
+    cds = "".join(cds.split()).upper().replace("U", "T")
+    if len(cds) < 3 * len(wt):
+        raise ValueError(f"Coding sequence has {len(cds) // 3} codons for {len(wt)} positions")
+    index = {codon: i for i, codon in enumerate(CODONS)}
+    codons = np.array([index.get(cds[3 * i:3 * i + 3], -1) for i in range(len(wt))])
+
+    translated = np.array([AA_INDEX.get(GENETIC_CODE[c], -1) if c >= 0 else -1 for c in codons])
+    mismatch = (translated != wt) & (wt >= 0)
+    if mismatch.any():
+        raise ValueError(
+            f"Coding sequence disagrees with the protein at {mismatch.sum()} positions "
+            f"(first at {np.flatnonzero(mismatch)[0] + 1})"
+        )
+    reach = codon_reachability()[np.where(codons >= 0, codons, 0)]
+    reach[codons < 0] = False
+    return reach
+
+
+def wild_type_from_keys(keys: np.ndarray, length: Optional[int] = None) -> np.ndarray:
+    """Wild-type code per position (1-based positions -> index pos - 1) from variant keys"""
+    pos, wt, _ = decode_keys(keys[keys >= 0])
+    length = length or (int(pos.max()) if len(pos) else 0)
+    seq = np.full(length, -1, dtype=np.int16)
+    inside = pos <= length
+    seq[pos[inside] - 1] = wt[inside]
+    return seq
+
+
+def wild_type_from_residues(residues: np.ndarray, resnames: np.ndarray,
+                            length: Optional[int] = None) -> np.ndarray:
+    """Wild-type code per position from structure residue numbers and three-letter names"""
+    residues = np.asarray(residues, dtype=np.int64)
+    length = length or (int(residues.max()) if len(residues) else 0)
+    seq = np.full(length, -1, dtype=np.int16)
+    codes = np.array([THREE_INDEX.get(str(name).upper(), -1) for name in resnames], dtype=np.int16)
+    inside = (residues >= 1) & (residues <= length)
+    seq[residues[inside] - 1] = codes[inside]
+    return seq
@@ -0,0 +1,625 @@
+"""
+Job-array scheduler for ddG and Boltz tasks
+Packs tasks into SLURM job arrays (several tasks per array index, at most
+max_array_size indices per array) and tracks every task in a local SQLite
+database. Array tasks report back through small status files in the state
+directory, so compute nodes never write to the database; sync() ingests them
+and asks the backend about indices that died without reporting (timeouts,
+OOM kills, cancellations). Failed tasks are resubmitted as a new array that
+holds only them, at their original indices, so tasks that finished or ran
+out of attempts are never run again. LocalBackend runs the same array indices as local subprocesses from
+a worker pool, with the same status files and semantics, so pipelines run on
+a workstation and the scheduler can be exercised without a cluster.
+
+    python -m src.scheduler status data/variants/scheduler
+    python -m src.scheduler resubmit data/variants/scheduler --max-attempts 3
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import re
+import socket
+import sqlite3
+import subprocess
+import sys
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .boltz_batch import MANIFEST
+from .rosetta_executor import DDGTask, RosettaDDGExecutor
+
+logger = logging.getLogger(__name__)
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+PathLike = Union[str, Path]
+
+# Backend index states (SLURM names) that mean the index will not report back
+# SlurmBackend settings of the last submission, reused by the CLI's resubmit
+BACKEND_FILE = "slurm_backend.json"
+
+LOST_STATES = {
+    "FAILED", "TIMEOUT", "OUT_OF_MEMORY", "CANCELLED", "NODE_FAIL", "PREEMPTED",
+    "BOOT_FAIL", "DEADLINE", "COMPLETED", "LOST",
+}
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    name TEXT PRIMARY KEY,
+    spec TEXT NOT NULL,
+    state TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    array_id TEXT,
+    array_index INTEGER,
+    job_id TEXT,
+    queued REAL,
+    index_started REAL,
+    started REAL,
+    finished REAL,
+    returncode INTEGER,
+    host TEXT,
+    reason TEXT
+);
+CREATE TABLE IF NOT EXISTS submissions (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    array_id TEXT NOT NULL,
+    job_id TEXT NOT NULL,
+    backend TEXT NOT NULL,
+    indices TEXT NOT NULL,
+    submitted REAL NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class Task:
+    """One command to run; the name is its identity across submissions"""
+    name: str
+    command: Tuple[str, ...]
+    cwd: Optional[str] = None
+    env: Tuple[Tuple[str, str], ...] = ()
+
+    def spec(self) -> Dict[str, Any]:
+        return {"name": self.name, "command": list(self.command), "cwd": self.cwd, "env": dict(self.env)}
+
+
+def _status_file(state_dir: Path, name: str) -> Path:
+    safe = re.sub(r"[^A-Za-z0-9_.-]", "_", name)[:80]
+    return state_dir / "status" / f"{safe}-{hashlib.sha1(name.encode()).hexdigest()[:8]}.json"
+
+
+def _write_json(path: Path, data: Any) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    tmp_path.write_text(json.dumps(data, indent=1))
+    tmp_path.replace(path)
+
+
+def compress_indices(indices: Iterable[int]) -> str:
+    """SLURM --array range list, e.g. [0, 1, 2, 5] -> '0-2,5'"""
+    indices = sorted(set(indices))
+    ranges = []
+    for i in indices:
+        if ranges and i == ranges[-1][1] + 1:
+            ranges[-1][1] = i
+        else:
+            ranges.append([i, i])
+    return ",".join(f"{a}-{b}" if a != b else f"{a}" for a, b in ranges)
+
+
+def _new_array_id() -> str:
+    return f"array_{time.strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+
+
+def run_pack(state_dir: PathLike, array_id: str, index: int) -> int:
+    """Run every task of one array index in order; used by both backends"""
+    state_dir = Path(state_dir)
+    spec = json.loads((state_dir / "arrays" / f"{array_id}.json").read_text())
+    entries = spec["indices"][str(index)]
+    index_started = time.time()
+    host = socket.gethostname()
+    job = os.environ.get("SLURM_ARRAY_JOB_ID", "local")
+    failures = 0
+
+    for entry in entries:
+        status_path = _status_file(state_dir, entry["name"])
+        if status_path.exists():
+            previous = json.loads(status_path.read_text())
+            if previous.get("state") == "done":
+                continue
+        status = {
+            "name": entry["name"], "attempt": entry["attempt"], "state": "running",
+            "index_started": index_started, "started": time.time(), "host": host, "job": job,
+        }
+        _write_json(status_path, status)
+
+        log_stem = state_dir / "logs" / f"{status_path.stem}.{entry['attempt']}"
+        log_stem.parent.mkdir(parents=True, exist_ok=True)
+        with open(f"{log_stem}.out", "wb") as out, open(f"{log_stem}.err", "wb") as err:
+            try:
+                returncode = subprocess.call(
+                    entry["command"], cwd=entry["cwd"], stdout=out, stderr=err,
+                    env={**os.environ, **entry["env"]},
+                )
+            except OSError as e:
+                err.write(f"{e}\n".encode())
+                returncode = 127
+
+        status.update(state="done" if returncode == 0 else "failed", finished=time.time(),
+                      returncode=returncode)
+        _write_json(status_path, status)
+        failures += returncode != 0
+    return 1 if failures else 0
+
+
+class LocalBackend:
+    """Array indices run in a local worker pool; same status files as on the cluster"""
+    name = "local"
+
+    def __init__(self, max_workers: Optional[int] = None):
+        self.pool = ThreadPoolExecutor(max_workers=max_workers or os.cpu_count() or 1)
+        self._futures: Dict[Tuple[str, int], Future] = {}
+
+    def submit(self, state_dir: Path, array_id: str, indices: Sequence[int]) -> str:
+        job_id = f"local-{uuid.uuid4().hex[:8]}"
+        for index in indices:
+            self._futures[(job_id, index)] = self.pool.submit(run_pack, state_dir, array_id, index)
+        return job_id
+
+    def states(self, job_ids: Iterable[str]) -> Dict[Tuple[str, int], str]:
+        job_ids = set(job_ids)
+        states = {}
+        for (job_id, index), future in self._futures.items():
+            if job_id not in job_ids:
+                continue
+            if future.running():
+                states[(job_id, index)] = "RUNNING"
+            elif not future.done():
+                states[(job_id, index)] = "PENDING"
+            elif future.exception() is not None:
+                states[(job_id, index)] = "FAILED"
+            else:
+                states[(job_id, index)] = "COMPLETED"
+        # Jobs of another process (or one that exited) can never report back
+        for job_id in job_ids - {job for job, _ in self._futures}:
+            states[(job_id, -1)] = "LOST"
+        return states
+
+    def shutdown(self) -> None:
+        self.pool.shutdown(wait=True)
+
+
+@dataclass
+class SlurmBackend:
+    """sbatch job arrays; one array task runs one index through `python -m src.scheduler run`"""
+    partition: Optional[str] = None
+    account: Optional[str] = None
+    time: str = "4:00:00"
+    mem: str = "8G"
+    cpus_per_task: int = 1
+    gres: Optional[str] = None
+    max_concurrent: Optional[int] = None  # SLURM %N array throttle
+    setup: List[str] = field(default_factory=list)  # module loads, venv activation
+    python: str = "python"
+    name = "slurm"
+
+    def script(self, state_dir: Path, array_id: str) -> str:
+        directives = {
+            "job-name": f"hcm_{array_id}",
+            "output": str(state_dir / "logs" / "slurm_%A_%a.out"),
+            "error": str(state_dir / "logs" / "slurm_%A_%a.err"),
+            "partition": self.partition,
+            "account": self.account,
+            "time": self.time,
+            "mem": self.mem,
+            "cpus-per-task": self.cpus_per_task,
+            "gres": self.gres,
+        }
+        lines = ["#!/bin/bash"]
+        lines += [f"#SBATCH --{key}={value}" for key, value in directives.items() if value is not None]
+        lines += ["", *self.setup, f"cd {REPO_ROOT}",
+                  f'{self.python} -m src.scheduler run {state_dir} {array_id} "$SLURM_ARRAY_TASK_ID"', ""]
+        return "\n".join(lines)
+
+    def save(self, state_dir: Path) -> None:
+        _write_json(state_dir / BACKEND_FILE, asdict(self))
+
+    @classmethod
+    def load(cls, state_dir: PathLike) -> "SlurmBackend":
+        """Settings saved by the last submission from state_dir, else the defaults"""
+        path = Path(state_dir) / BACKEND_FILE
+        if not path.exists():
+            return cls()
+        saved = json.loads(path.read_text())
+        return cls(**{f.name: saved[f.name] for f in fields(cls) if f.name in saved})
+
+    def submit(self, state_dir: Path, array_id: str, indices: Sequence[int]) -> str:
+        # Resubmissions get new array ids, so their job scripts need the same settings
+        self.save(state_dir)
+        script = state_dir / "arrays" / f"{array_id}.job"
+        if not script.exists():
+            (state_dir / "logs").mkdir(parents=True, exist_ok=True)
+            script.write_text(self.script(state_dir, array_id))
+        array = compress_indices(indices)
+        if self.max_concurrent:
+            array += f"%{self.max_concurrent}"
+        result = subprocess.run(
+            ["sbatch", "--parsable", f"--array={array}", str(script)],
+            capture_output=True, text=True, check=True,
+        )
+        # --parsable prints "jobid" or "jobid;cluster"
+        return result.stdout.strip().split(";")[0]
+
+    def states(self, job_ids: Iterable[str]) -> Dict[Tuple[str, int], str]:
+        job_ids = sorted(set(job_ids))
+        if not job_ids:
+            return {}
+        result = subprocess.run(
+            ["sacct", "-n", "-P", "-X", "-o", "JobID,State", "-j", ",".join(job_ids)],
+            capture_output=True, text=True, check=True,
+        )
+        states = {}
+        for line in result.stdout.splitlines():
+            job, _, state = line.partition("|")
+            match = re.fullmatch(r"(\d+)_(\d+)", job)
+            if match:
+                # "CANCELLED by 1234" -> CANCELLED
+                states[(match.group(1), int(match.group(2)))] = state.split()[0] if state else ""
+        return states
+
+
+# Task columns a submission overwrites, restored if the backend rejects it
+RESTORED_COLUMNS = (
+    "state", "attempts", "array_id", "array_index", "job_id", "queued", "index_started",
+    "started", "finished", "returncode", "host", "reason",
+)
+
+
+class Scheduler:
+    """Packed job-array submissions with task state in a local SQLite database"""
+
+    def __init__(self, state_dir: PathLike, backend=None, pack_size: int = 1,
+                 max_array_size: int = 1000):
+        self.state_dir = Path(state_dir).resolve()
+        self.state_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.state_dir / "scheduler.sqlite"
+        self.backend = backend or LocalBackend()
+        self.pack_size = max(1, pack_size)
+        self.max_array_size = max_array_size
+        with self._connect() as db:
+            db.executescript(SCHEMA)
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        db = sqlite3.connect(self.db_path, timeout=60)
+        try:
+            db.execute("PRAGMA journal_mode=WAL")
+            db.row_factory = sqlite3.Row
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    # ------------------------------------------------------------------
+    # Submission
+    # ------------------------------------------------------------------
+    def add(self, tasks: Iterable[Task]) -> int:
+        """Register tasks; known tasks keep their state unless their command changed"""
+        added = 0
+        with self._connect() as db:
+            for task in tasks:
+                spec = json.dumps(task.spec(), sort_keys=True)
+                row = db.execute("SELECT spec FROM tasks WHERE name = ?", (task.name,)).fetchone()
+                if row is None:
+                    db.execute("INSERT INTO tasks (name, spec, state) VALUES (?, ?, 'pending')",
+                               (task.name, spec))
+                    added += 1
+                elif row["spec"] != spec:
+                    db.execute(
+                        "UPDATE tasks SET spec = ?, state = 'pending', attempts = 0, reason = NULL "
+                        "WHERE name = ?", (spec, task.name),
+                    )
+                    _status_file(self.state_dir, task.name).unlink(missing_ok=True)
+                    added += 1
+        return added
+
+    def submit(self) -> List[str]:
+        """Pack all pending tasks into arrays and submit them"""
+        with self._connect() as db:
+            rows = db.execute("SELECT name, spec, attempts FROM tasks WHERE state = 'pending' "
+                              "ORDER BY rowid").fetchall()
+        if not rows:
+            return []
+
+        per_array = self.pack_size * self.max_array_size
+        array_ids = []
+        for start in range(0, len(rows), per_array):
+            chunk = rows[start:start + per_array]
+            array_id = _new_array_id()
+            indices: Dict[str, List[Dict]] = {}
+            placement = []
+            for i, row in enumerate(chunk):
+                index = i // self.pack_size
+                entry = {**json.loads(row["spec"]), "attempt": row["attempts"] + 1}
+                indices.setdefault(str(index), []).append(entry)
+                placement.append((row["name"], index))
+                _status_file(self.state_dir, row["name"]).unlink(missing_ok=True)
+            _write_json(self.state_dir / "arrays" / f"{array_id}.json",
+                        {"array_id": array_id, "indices": indices})
+            self._submit_indices(array_id, sorted(int(i) for i in indices), placement)
+            array_ids.append(array_id)
+        return array_ids
+
+    def _submit_indices(self, array_id: str, indices: List[int],
+                        placement: List[Tuple[str, int]]) -> str:
+        # Rows are marked before the backend starts, so fast local tasks cannot report too early
+        queued = time.time()
+        names = [name for name, _ in placement]
+        with self._connect() as db:
+            select = f"SELECT {', '.join(RESTORED_COLUMNS)}, name FROM tasks WHERE name = ?"
+            previous = [dict(db.execute(select, (name,)).fetchone()) for name in names]
+            db.executemany(
+                "UPDATE tasks SET state = 'submitted', attempts = attempts + 1, array_id = ?, "
+                "array_index = ?, job_id = NULL, queued = ?, index_started = NULL, started = NULL, "
+                "finished = NULL, returncode = NULL, host = NULL, reason = NULL WHERE name = ?",
+                [(array_id, index, queued, name) for name, index in placement],
+            )
+        try:
+            job_id = self.backend.submit(self.state_dir, array_id, indices)
+        except Exception:
+            # Without a job id sync() could never resolve these rows; undo the marking
+            with self._connect() as db:
+                db.executemany(
+                    f"UPDATE tasks SET {', '.join(f'{c} = :{c}' for c in RESTORED_COLUMNS)} WHERE name = :name",
+                    previous,
+                )
+            logger.error(f"Submitting {array_id} failed; {len(placement)} tasks left as they were")
+            raise
+        with self._connect() as db:
+            db.executemany("UPDATE tasks SET job_id = ? WHERE name = ?",
+                           [(job_id, name) for name, _ in placement])
+            db.execute(
+                "INSERT INTO submissions (array_id, job_id, backend, indices, submitted) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (array_id, job_id, self.backend.name, compress_indices(indices), queued),
+            )
+        logger.info(f"Submitted {array_id} indices {compress_indices(indices)} as job {job_id} "
+                    f"({len(placement)} tasks)")
+        return job_id
+
+    def resubmit_failed(self, max_attempts: int = 3) -> List[str]:
+        """Re-run failed tasks with attempts left, as new arrays at their original indices
+
+        Each resubmission gets its own array spec holding only the selected
+        tasks, so packed neighbours that finished or are out of attempts do
+        not run again.
+        """
+        self.sync()
+        with self._connect() as db:
+            rows = db.execute(
+                "SELECT name, spec, attempts, array_id, array_index FROM tasks "
+                "WHERE state = 'failed' AND attempts < ? ORDER BY rowid",
+                (max_attempts,),
+            ).fetchall()
+        by_array: Dict[str, List[sqlite3.Row]] = {}
+        for row in rows:
+            by_array.setdefault(row["array_id"], []).append(row)
+
+        job_ids = []
+        for failed in by_array.values():
+            array_id = _new_array_id()
+            indices: Dict[str, List[Dict]] = {}
+            for row in failed:
+                entry = {**json.loads(row["spec"]), "attempt": row["attempts"] + 1}
+                indices.setdefault(str(row["array_index"]), []).append(entry)
+            _write_json(self.state_dir / "arrays" / f"{array_id}.json",
+                        {"array_id": array_id, "indices": indices})
+            placement = [(row["name"], row["array_index"]) for row in failed]
+            job_ids.append(self._submit_indices(array_id, sorted({i for _, i in placement}), placement))
+        return job_ids
+
+    # ------------------------------------------------------------------
+    # State
+    # ------------------------------------------------------------------
+    def sync(self) -> pd.DataFrame:
+        """Ingest status files and backend states for tasks still in flight"""
+        with self._connect() as db:
+            active = db.execute(
+                "SELECT name, attempts, job_id, array_index FROM tasks "
+                "WHERE state IN ('submitted', 'running')"
+            ).fetchall()
+            unreported = []
+            for row in active:
+                path = _status_file(self.state_dir, row["name"])
+                status = json.loads(path.read_text()) if path.exists() else None
+                if status is None or status.get("attempt") != row["attempts"]:
+                    unreported.append(row)
+                    continue
+                db.execute(
+                    "UPDATE tasks SET state = ?, index_started = ?, started = ?, finished = ?, "
+                    "returncode = ?, host = ? WHERE name = ?",
+                    (status["state"], status.get("index_started"), status.get("started"),
+                     status.get("finished"), status.get("returncode"), status.get("host"), row["name"]),
+                )
+                if status["state"] == "running":
+                    unreported.append(row)
+
+            # Indices that ended without their tasks reporting a result
+            job_ids = {row["job_id"] for row in unreported if row["job_id"]}
+            states = self._backend_states(job_ids)
+            lost_jobs = {job for (job, index), state in states.items() if index == -1}
+            for row in unreported:
+                state = "LOST" if row["job_id"] in lost_jobs else states.get((row["job_id"], row["array_index"]))
+                if state not in LOST_STATES:
+                    continue
+                path = _status_file(self.state_dir, row["name"])
+                status = json.loads(path.read_text()) if path.exists() else {}
+                if status.get("attempt") == row["attempts"] and status.get("state") in ("done", "failed"):
+                    continue
+                db.execute(
+                    "UPDATE tasks SET state = 'failed', reason = ? WHERE name = ?",
+                    (state if state != "COMPLETED" else "NO_STATUS", row["name"]),
+                )
+        return self.status()
+
+    def _backend_states(self, job_ids: set) -> Dict[Tuple[str, int], str]:
+        # Local jobs only exist inside the process that submitted them
+        local = {job for job in job_ids if job.startswith("local-")}
+        states = {}
+        if isinstance(self.backend, LocalBackend):
+            states.update(self.backend.states(local))
+        else:
+            states.update({(job, -1): "LOST" for job in local})
+        if job_ids - local:
+            states.update(self.backend.states(job_ids - local))
+        return states
+
+    def status(self) -> pd.DataFrame:
+        with self._connect() as db:
+            table = pd.read_sql_query(
+                "SELECT name, state, attempts, array_id, array_index, job_id, queued, index_started, "
+                "started, finished, returncode, host, reason FROM tasks ORDER BY rowid", db,
+            )
+        return table
+
+    def wait(self, poll_interval: float = 30.0, timeout: Optional[float] = None) -> pd.DataFrame:
+        """Sync until no task is submitted or running"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            table = self.sync()
+            in_flight = table["state"].isin(["submitted", "running"]).sum()
+            if not in_flight:
+                return table
+            if deadline is not None and time.monotonic() > deadline:
+                raise TimeoutError(f"{in_flight} tasks still in flight")
+            time.sleep(poll_interval)
+
+    def report(self) -> Dict[str, Any]:
+        """Task counts by state, queue wait, runtimes and throughput"""
+        table = self.status()
+        done = table[table["state"] == "done"]
+        started = table.dropna(subset=["index_started", "queued"])
+        wait = (started["index_started"] - started["queued"]).to_numpy()
+        runtime = (done["finished"] - done["started"]).to_numpy()
+        span = (done["finished"].max() - table["queued"].min()) if len(done) else np.nan
+
+        def summary(values: np.ndarray) -> Dict[str, float]:
+            if not len(values):
+                return {}
+            return {"mean": float(values.mean()), "median": float(np.median(values)),
+                    "max": float(values.max())}
+
+        return {
+            "tasks": len(table),
+            "states": table["state"].value_counts().to_dict(),
+            "queue_wait_s": summary(wait),
+            "runtime_s": summary(runtime),
+            "throughput_per_hour": float(len(done) / span * 3600) if span and span > 0 else None,
+            "failure_reasons": table["reason"].dropna().value_counts().to_dict(),
+        }
+
+
+# ----------------------------------------------------------------------
+# Task builders
+# ----------------------------------------------------------------------
+def ddg_tasks(executor: RosettaDDGExecutor, tasks: Iterable[DDGTask], out_dir: PathLike,
+              python: str = "python", scratch: Optional[str] = None) -> List[Task]:
+    """One scheduler task per variant, running the executor's settings via its CLI
+
+    scratch defaults to the executor's scratch root; pass node-local storage
+    when the array tasks should use a different one.
+    """
+    out_dir = Path(out_dir).resolve()
+    if scratch is None and executor.scratch_root is not None:
+        scratch = str(executor.scratch_root)
+    built = []
+    for task in tasks:
+        command = [
+            python, "-m", "src.rosetta_executor", executor.structure,
+            "--executable", executor.executable, "--mutation", task.mutfile_line.strip(),
+            "--iterations", str(executor.iterations), "--timeout", str(executor.timeout),
+            "--out", str(out_dir / f"{task.name}.json"),
+        ]
+        if executor.crop is not None:
+            command += ["--crop-radius", str(executor.crop.radius),
+                        "--crop-gap-fill", str(executor.crop.gap_fill),
+                        "--cap-residues", str(executor.crop.cap_residues)]
+        if scratch is not None:
+            command += ["--scratch", scratch]
+        # "=" form, since ddg_monomer options start with a dash
+        command += [f"--extra-arg={arg}" for arg in executor.extra_args]
+        built.append(Task(f"ddg:{task.name}", tuple(command), cwd=str(REPO_ROOT)))
+    return built
+
+
+def collect_ddg_results(out_dir: PathLike) -> pd.DataFrame:
+    """ProteinChange / Rosetta_ddG / Status table from the ddG task outputs"""
+    rows = []
+    for path in sorted(Path(out_dir).glob("*.json")):
+        rows.extend(json.loads(path.read_text()))
+    return pd.DataFrame(rows, columns=["ProteinChange", "Rosetta_ddG", "Status"])
+
+
+def boltz_shard_tasks(shard_root: PathLike, sampling_steps: int = 200, cache: str = "~/.boltz",
+                      extra_args: Sequence[str] = ()) -> List[Task]:
+    """One scheduler task per shard written by boltz_batch.write_shards"""
+    shard_root = Path(shard_root).resolve()
+    manifest = pd.read_csv(shard_root / MANIFEST)
+    cache = os.path.expanduser(cache)
+    built = []
+    for shard in sorted(manifest["Shard"].unique()):
+        name = f"shard_{shard:04d}"
+        command = (
+            "boltz", "predict", str(shard_root / name),
+            "--out_dir", str(shard_root / "results" / name), "--cache", cache,
+            "--accelerator", "gpu", "--devices", "1", "--sampling_steps", str(sampling_steps),
+            *extra_args,
+        )
+        built.append(Task(f"boltz:{shard_root.name}:{name}", command, cwd=str(shard_root)))
+    return built
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Job-array scheduler state and array task entry point")
+    sub = parser.add_subparsers(dest="command", required=True)
+    run = sub.add_parser("run", help="Run one array index (called from the array job script)")
+    run.add_argument("state_dir")
+    run.add_argument("array_id")
+    run.add_argument("index", type=int)
+    status = sub.add_parser("status", help="Sync and print the task summary")
+    status.add_argument("state_dir")
+    status.add_argument("--tasks", action="store_true", help="Also list every task")
+    resubmit = sub.add_parser("resubmit", help="Resubmit failed array indices to SLURM")
+    resubmit.add_argument("state_dir")
+    resubmit.add_argument("--max-attempts", type=int, default=3)
+    args = parser.parse_args()
+
+    if args.command == "run":
+        sys.exit(run_pack(args.state_dir, args.array_id, args.index))
+
+    scheduler = Scheduler(args.state_dir, backend=SlurmBackend.load(args.state_dir))
+    if args.command == "resubmit":
+        if not (Path(args.state_dir) / BACKEND_FILE).exists():
+            logger.warning(f"No {BACKEND_FILE} in {args.state_dir}; resubmitting with default SLURM settings")
+        job_ids = scheduler.resubmit_failed(args.max_attempts)
+        print(f"Resubmitted as {', '.join(job_ids) or 'nothing'}")
+        return
+    table = scheduler.sync()
+    print(json.dumps(scheduler.report(), indent=2))
+    if args.tasks:
+        print(table.to_string(index=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Single-pass statistics engine
+Computes every aggregate (count, mean, std, min, max), threshold count,
+top-k list and Pearson/Spearman correlation a report asks for from one
+float matrix of the requested columns, optionally per group (gene, domain).
+Rows are sorted by group once; every statistic is then a segmented numpy
+reduction over that matrix, so the table is not rescanned per statistic
+and no row is iterated in Python. The report, run_analysis.py and
+demo_analysis.py all render from the returned VariantStats.
+
+    stats = compute_stats(df, variant_stats_spec("AlphaMissense"), by="GeneSymbol")
+    stats.agg("AlphaMissense", "mean", group="MYH7")
+    python -m src.stats_engine results/MYH7_variants_comprehensive.parquet --by Nearest_site
+"""
+
+import argparse
+import logging
+import operator
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+logger = logging.getLogger(__name__)
+
+ALL = "all"  # group label of ungrouped statistics
+STATS = ("count", "mean", "std", "min", "max")
+OPERATORS = {">": operator.gt, ">=": operator.ge, "<": operator.lt, "<=": operator.le}
+
+
+@dataclass(frozen=True)
+class Threshold:
+    label: str
+    column: str
+    op: str  # one of OPERATORS
+    value: float
+
+
+@dataclass(frozen=True)
+class TopK:
+    name: str
+    column: str
+    k: int = 10
+    fields: Optional[Tuple[str, ...]] = None  # None keeps every column
+
+
+@dataclass(frozen=True)
+class StatsSpec:
+    """What to compute; columns absent from the table are skipped"""
+    columns: Tuple[str, ...] = ()
+    thresholds: Tuple[Threshold, ...] = ()
+    top: Tuple[TopK, ...] = ()
+    correlations: Tuple[Tuple[str, str], ...] = ()
+
+
+def variant_stats_spec(am: str = "AlphaMissense_score", top_k: int = 10) -> StatsSpec:
+    """Statistics every summary of a combined variant table reports"""
+    return StatsSpec(
+        columns=("ProteinChange", "Residue", am, "pLDDT", "Rosetta_ddG"),
+        thresholds=(
+            Threshold("am_high", am, ">", 0.8),
+            Threshold("plddt_high", "pLDDT", ">", 90),
+            Threshold("plddt_low", "pLDDT", "<", 50),
+            Threshold("destabilizing", "Rosetta_ddG", ">", 1.0),
+            Threshold("stabilizing", "Rosetta_ddG", "<", -1.0),
+        ),
+        top=(TopK("pathogenic", am, top_k),),
+        correlations=((am, "Rosetta_ddG"),),
+    )
+
+
+@dataclass
+class VariantStats:
+    """Result of compute_stats; every table is indexed by group first (ALL when ungrouped)"""
+    by: Optional[str]
+    rows: pd.Series  # group -> rows
+    aggregates: pd.DataFrame  # (group, column) -> count, mean, std, min, max
+    thresholds: pd.DataFrame  # (group, label) -> column, count, fraction
+    top: Dict[str, pd.DataFrame]  # name -> rows ordered by group then rank
+    correlations: pd.DataFrame  # (group, x, y) -> n, pearson, spearman
+
+    @property
+    def groups(self) -> List:
+        return list(self.rows.index)
+
+    def has(self, column: str) -> bool:
+        return column in self.aggregates.index.get_level_values(1)
+
+    def agg(self, column: str, stat: str, group=ALL):
+        """One aggregate (count 0 / NaN if the column was absent)"""
+        try:
+            return self.aggregates.at[(group, column), stat]
+        except KeyError:
+            return 0 if stat == "count" else np.nan
+
+    def count(self, label: str, group=ALL) -> int:
+        """Rows over threshold `label` (0 if its column was absent)"""
+        try:
+            return int(self.thresholds.at[(group, label), "count"])
+        except KeyError:
+            return 0
+
+    def top_rows(self, name: str, group=ALL) -> pd.DataFrame:
+        top = self.top[name]
+        # Rows without a group value form their own NaN group
+        match = top["Group"].isna() if pd.isna(group) else top["Group"] == group
+        return top[match].drop(columns="Group")
+
+    def corr(self, x: str, y: str, method: str = "pearson", group=ALL) -> float:
+        try:
+            return float(self.correlations.at[(group, x, y), method])
+        except KeyError:
+            return np.nan
+
+
+def _segments(codes: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """(row order sorted by group, group start offsets, rows per group)"""
+    # Small integer codes take numpy's radix sort path
+    order = np.argsort(codes.astype(np.min_scalar_type(max(n_groups - 1, 0))), kind="stable")
+    sizes = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(sizes) - sizes
+    return order, starts, sizes
+
+
+def _reduce(ufunc, values: np.ndarray, starts: np.ndarray, sizes: np.ndarray, empty):
+    """ufunc.reduceat per group along axis 0; empty groups get `empty`"""
+    if len(values) == 0:
+        return np.full((len(starts),) + values.shape[1:], empty, dtype=float)
+    out = ufunc.reduceat(values, np.minimum(starts, len(values) - 1), axis=0).astype(float)
+    out[sizes == 0] = empty
+    return out
+
+
+def _top_k(values: np.ndarray, k: int) -> np.ndarray:
+    """Offsets of the k largest non-NaN values, descending; ties keep the earlier row"""
+    valid = np.flatnonzero(~np.isnan(values))
+    if len(valid) > k:
+        v = values[valid]
+        kth = np.partition(v, len(v) - k)[len(v) - k]
+        above = valid[v > kth]
+        valid = np.concatenate([above, valid[v == kth][:k - len(above)]])
+    return valid[np.lexsort((valid, -values[valid]))]
+
+
+def _average_ranks(values: np.ndarray, starts: np.ndarray, sizes: np.ndarray) -> np.ndarray:
+    """1-based ranks within each contiguous group segment, ties averaged"""
+    ranks = np.empty(len(values))
+    for start, size in zip(starts, sizes):
+        segment = values[start:start + size]
+        sorter = np.argsort(segment, kind="stable")
+        ordered = segment[sorter]
+        first = np.concatenate(([True], ordered[1:] != ordered[:-1]))
+        tie_starts = np.flatnonzero(first)
+        tie_sizes = np.diff(np.append(tie_starts, size))
+        ranks[start + sorter] = (tie_starts + (tie_sizes + 1) / 2)[np.cumsum(first) - 1]
+    return ranks
+
+
+def _as_column_value(value: float, dtype) -> float:
+    """Threshold rounded to a float column's precision, so float32 scores compare as pandas does"""
+    if isinstance(dtype, np.dtype) and np.issubdtype(dtype, np.floating):
+        return float(np.asarray(value, dtype=dtype))
+    return value
+
+
+def _pearson(x: np.ndarray, y: np.ndarray, codes: np.ndarray, n_groups: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-group (n, r) of complete pairs, centered for accuracy"""
+    n = np.bincount(codes, minlength=n_groups).astype(float)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        dx = x - (np.bincount(codes, x, n_groups) / n)[codes]
+        dy = y - (np.bincount(codes, y, n_groups) / n)[codes]
+        sxy = np.bincount(codes, dx * dy, n_groups)
+        sxx = np.bincount(codes, dx * dx, n_groups)
+        syy = np.bincount(codes, dy * dy, n_groups)
+        r = sxy / np.sqrt(sxx * syy)
+    r[n < 2] = np.nan
+    return n.astype(int), np.clip(r, -1.0, 1.0)
+
+
+def compute_stats(df: pd.DataFrame, spec: StatsSpec, by: Optional[str] = None) -> VariantStats:
+    """All statistics of spec over df, per value of column `by` if given"""
+    if by is None:
+        codes = np.zeros(len(df), dtype=np.intp)
+        labels = [ALL]
+        order, starts, sizes = np.arange(len(df)), np.array([0]), np.array([len(df)])
+    else:
+        codes, uniques = pd.factorize(df[by], sort=True, use_na_sentinel=False)
+        labels = list(uniques)
+        order, starts, sizes = _segments(codes, len(labels))
+    n_groups = len(labels)
+    sorted_codes = codes[order]
+    grouped = by is not None
+    rows = pd.Series(sizes, index=pd.Index(labels, name=by or "group"), name="rows")
+
+    wanted = list(dict.fromkeys(
+        [*spec.columns, *(t.column for t in spec.thresholds), *(t.column for t in spec.top),
+         *(c for pair in spec.correlations for c in pair)]
+    ))
+    present = [c for c in wanted if c in df.columns]
+    numeric = [c for c in present if pd.api.types.is_numeric_dtype(df[c]) and not pd.api.types.is_bool_dtype(df[c])]
+    col = {c: i for i, c in enumerate(numeric)}
+
+    # The one pass over the table: requested numeric columns, group-sorted and
+    # column-major so every segmented reduction below runs over contiguous memory
+    X = np.empty((len(df), len(numeric)), order="F")
+    for c, j in col.items():
+        values = df[c].to_numpy(dtype=float, na_value=np.nan)
+        X[:, j] = values[order] if grouped else values
+    valid = ~np.isnan(X)
+
+    # Aggregates; non-numeric columns only get a count
+    counts = _reduce(np.add, valid.astype(np.int64), starts, sizes, 0).astype(int)
+    sums = _reduce(np.add, np.where(valid, X, 0.0), starts, sizes, 0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+        # Rows are group-sorted: repeating the transposed means stays column-major
+        centered = np.where(valid, X - np.repeat(means.T, sizes, axis=1).T, 0.0)
+        std = np.sqrt(_reduce(np.add, centered * centered, starts, sizes, 0.0) / (counts - 1))
+    std[counts < 2] = np.nan
+    mins = _reduce(np.fmin, X, starts, sizes, np.nan)
+    maxs = _reduce(np.fmax, X, starts, sizes, np.nan)
+
+    other = {c: i for i, c in enumerate(c for c in present if c not in col)}
+    present_mask = np.column_stack([df[c].notna().to_numpy() for c in other]) if other \
+        else np.empty((len(df), 0), dtype=bool)
+    other_counts = _reduce(np.add, (present_mask[order] if grouped else present_mask).astype(np.int64),
+                           starts, sizes, 0).astype(int)
+
+    agg_rows = []
+    for g, label in enumerate(labels):
+        for c in present:
+            if c in col:
+                j = col[c]
+                agg_rows.append((label, c, counts[g, j], means[g, j], std[g, j], mins[g, j], maxs[g, j]))
+            else:
+                agg_rows.append((label, c, other_counts[g, other[c]], np.nan, np.nan, np.nan, np.nan))
+    aggregates = pd.DataFrame(agg_rows, columns=["group", "column", *STATS]).set_index(["group", "column"])
+
+    # Threshold counts: one boolean matrix, one segmented sum
+    usable = [t for t in spec.thresholds if t.column in col]
+    if usable:
+        hits = np.column_stack([
+            OPERATORS[t.op](X[:, col[t.column]], _as_column_value(t.value, df[t.column].dtype)) for t in usable
+        ])
+        hit_counts = _reduce(np.add, hits.astype(np.int64), starts, sizes, 0).astype(int)
+    thr_rows = [
+        (label, t.label, t.column, hit_counts[g, i], hit_counts[g, i] / sizes[g] if sizes[g] else np.nan)
+        for g, label in enumerate(labels) for i, t in enumerate(usable)
+    ]
+    thresholds = pd.DataFrame(thr_rows, columns=["group", "label", "column", "count", "fraction"]) \
+        .set_index(["group", "label"])
+
+    # Top-k per group by partial sort (same order and ties as DataFrame.nlargest)
+    top: Dict[str, pd.DataFrame] = {}
+    for t in spec.top:
+        if t.column not in col:
+            continue
+        chosen = [starts[g] + _top_k(X[starts[g]:starts[g] + sizes[g], col[t.column]], t.k) for g in range(n_groups)]
+        fields = [c for c in t.fields if c in df.columns] if t.fields is not None else list(df.columns)
+        picked = np.concatenate(chosen) if chosen else np.empty(0, dtype=np.intp)
+        table = df.iloc[order[picked]][fields].reset_index(drop=True)
+        table.insert(0, "Group", np.repeat(np.asarray(labels, dtype=object), [len(c) for c in chosen]))
+        top[t.name] = table
+
+    # Correlations over complete pairs; Spearman is Pearson of within-group average ranks
+    corr_rows = []
+    for x, y in spec.correlations:
+        if x not in col or y not in col:
+            continue
+        xv, yv = X[:, col[x]], X[:, col[y]]
+        pair = ~np.isnan(xv) & ~np.isnan(yv)
+        pair_codes = sorted_codes[pair]
+        n, pearson = _pearson(xv[pair], yv[pair], pair_codes, n_groups)
+        # Complete pairs are still group-sorted, so groups are contiguous segments
+        pair_starts = np.cumsum(n) - n
+        _, spearman = _pearson(_average_ranks(xv[pair], pair_starts, n),
+                               _average_ranks(yv[pair], pair_starts, n), pair_codes, n_groups)
+        corr_rows += [(label, x, y, n[g], pearson[g], spearman[g]) for g, label in enumerate(labels)]
+    correlations = pd.DataFrame(corr_rows, columns=["group", "x", "y", "n", "pearson", "spearman"]) \
+        .set_index(["group", "x", "y"])
+
+    return VariantStats(by, rows, aggregates, thresholds, top, correlations)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Summary statistics of a combined variant table")
+    parser.add_argument("table", help="Parquet or CSV table")
+    parser.add_argument("--am", default="AlphaMissense_score", help="AlphaMissense score column")
+    parser.add_argument("--by", help="Group column, e.g. GeneSymbol or Nearest_site")
+    parser.add_argument("--top-k", type=int, default=10)
+    args = parser.parse_args()
+
+    df = pd.read_parquet(args.table) if args.table.endswith(".parquet") else pd.read_csv(args.table)
+    stats = compute_stats(df, variant_stats_spec(args.am, args.top_k), by=args.by)
+    with pd.option_context("display.width", 160, "display.max_rows", 200):
+        print(stats.aggregates.round(3))
+        print(stats.thresholds.round(3))
+        print(stats.correlations.round(3))
+        for name, rows in stats.top.items():
+            print(f"\nTop {args.top_k} by {name}:\n{rows.to_string(index=False)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,158 @@
+"""
+Vectorized per-residue structural features
+Loads backbone and CB coordinates once, builds KD-trees and computes for
+every residue at once: CA/CB contact counts at several radii, half-sphere
+exposure, a relative solvent accessibility approximation and the distance to
+the nearest annotated functional site.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .structure_scan import scan_structure
+
+logger = logging.getLogger(__name__)
+
+CONTACT_RADII = (8.0, 10.0, 12.0)
+HSE_RADIUS = 13.0
+
+# CB neighbours within 10 Å for a fully exposed / fully buried residue; RSA_approx
+# is linear in between (a neighbour-count proxy, not a true SASA calculation)
+RSA_EXPOSED_COUNT = 8
+RSA_BURIED_COUNT = 24
+
+# Approximate functional regions (UniProt numbering); extend or override per analysis
+FUNCTIONAL_SITES: Dict[str, Dict[str, Tuple[int, int]]] = {
+    "MYH7": {
+        "P-loop": (179, 186),
+        "Switch I": (233, 245),
+        "HCM loop": (403, 416),
+        "Switch II": (466, 475),
+        "Relay helix": (476, 507),
+        "Loop 2": (627, 646),
+        "SH1 helix": (705, 717),
+        "Converter": (718, 780),
+        "ELC binding IQ": (784, 806),
+    },
+}
+
+
+def virtual_cb(n: np.ndarray, ca: np.ndarray, c: np.ndarray) -> np.ndarray:
+    """Ideal CB positions from backbone N, CA, C (used for glycines)"""
+    b = ca - n
+    c_ = c - ca
+    a = np.cross(b, c_)
+    return -0.58273431 * a + 0.56802827 * b - 0.54067466 * c_ + ca
+
+
+def backbone_coordinates(structure: Union[str, Path, pd.DataFrame],
+                         chain: Optional[str] = None) -> Tuple[pd.DataFrame, np.ndarray, np.ndarray]:
+    """Residue table (Chain, Residue) with matching CA and CB arrays (virtual CB where missing)"""
+    atoms = structure if isinstance(structure, pd.DataFrame) else scan_structure(
+        structure, atoms=("N", "CA", "C", "CB")
+    )
+    if chain is not None:
+        atoms = atoms[atoms["Chain"] == chain]
+    atoms = atoms[atoms["InsertionCode"] == ""]
+
+    # Residue index per atom, keeping file order
+    keys = atoms["Chain"].astype(str) + ":" + atoms["Residue"].astype(str)
+    codes, uniques = pd.factorize(keys, sort=False)
+    n = len(uniques)
+    xyz_all = atoms[["x", "y", "z"]].to_numpy(dtype=np.float32)
+    names = atoms["Atom"].to_numpy()
+
+    def xyz(name: str) -> np.ndarray:
+        out = np.full((n, 3), np.nan, dtype=np.float32)
+        mask = names == name
+        out[codes[mask]] = xyz_all[mask]
+        return out
+
+    ca, cb = xyz("CA"), xyz("CB")
+    missing = np.isnan(cb).any(axis=1)
+    if missing.any():
+        cb[missing] = virtual_cb(xyz("N")[missing], ca[missing], xyz("C")[missing])
+    # Residues without a full backbone fall back to their CA
+    still_missing = np.isnan(cb).any(axis=1)
+    cb[still_missing] = ca[still_missing]
+
+    first = np.unique(codes, return_index=True)[1]
+    residues = pd.DataFrame({
+        "Chain": atoms["Chain"].to_numpy()[first],
+        "Residue": atoms["Residue"].to_numpy(dtype=np.int32)[first],
+    })
+    has_ca = ~np.isnan(ca).any(axis=1)
+    return residues[has_ca].reset_index(drop=True), ca[has_ca], cb[has_ca]
+
+
+def _neighbour_counts(tree: "cKDTree", points: np.ndarray, radius: float) -> np.ndarray:
+    # The query point itself is always within the radius
+    return tree.query_ball_point(points, radius, return_length=True) - 1
+
+
+def half_sphere_exposure(ca: np.ndarray, cb: np.ndarray, radius: float = HSE_RADIUS,
+                         tree: Optional["cKDTree"] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """HSE-up / HSE-down CA counts, split by the plane normal to each CA->CB vector"""
+    from scipy.spatial import cKDTree
+    tree = tree or cKDTree(ca)
+    pairs = tree.query_pairs(radius, output_type="ndarray")
+    i = np.concatenate([pairs[:, 0], pairs[:, 1]])
+    j = np.concatenate([pairs[:, 1], pairs[:, 0]])
+    up = np.einsum("ij,ij->i", ca[j] - ca[i], cb[i] - ca[i]) > 0
+    n = len(ca)
+    hse_up = np.bincount(i[up], minlength=n)
+    hse_down = np.bincount(i[~up], minlength=n)
+    return hse_up, hse_down
+
+
+def site_distances(residues: np.ndarray, ca: np.ndarray,
+                   sites: Dict[str, Tuple[int, int]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Distance from every CA to the nearest CA of any annotated site, and that site's name"""
+    from scipy.spatial import cKDTree
+    site_rows, site_names = [], []
+    for name, (start, end) in sites.items():
+        rows = np.flatnonzero((residues >= start) & (residues <= end))
+        site_rows.append(rows)
+        site_names.extend([name] * len(rows))
+    site_rows = np.concatenate(site_rows) if site_rows else np.array([], dtype=int)
+
+    if not len(site_rows):
+        return np.full(len(ca), np.nan, dtype=np.float32), np.full(len(ca), None, dtype=object)
+    distance, nearest = cKDTree(ca[site_rows]).query(ca)
+    return distance.astype(np.float32), np.asarray(site_names, dtype=object)[nearest]
+
+
+def compute_structural_features(structure: Union[str, Path, pd.DataFrame],
+                                sites: Optional[Dict[str, Tuple[int, int]]] = None,
+                                radii: Sequence[float] = CONTACT_RADII,
+                                chain: Optional[str] = None) -> pd.DataFrame:
+    """Per-residue features for a whole structure in one vectorized pass"""
+    # scipy is only needed here; importing it at module load slows every CLI command
+    from scipy.spatial import cKDTree
+    residues, ca, cb = backbone_coordinates(structure, chain)
+    if residues["Chain"].nunique() > 1:
+        logger.warning("Multiple chains present; features use all chains, Residue keys may repeat")
+
+    ca_tree, cb_tree = cKDTree(ca), cKDTree(cb)
+    features = {"Residue": residues["Residue"].to_numpy(dtype=np.int32)}
+    for radius in radii:
+        features[f"Contacts_CA_{radius:g}"] = _neighbour_counts(ca_tree, ca, radius).astype(np.int16)
+        features[f"Contacts_CB_{radius:g}"] = _neighbour_counts(cb_tree, cb, radius).astype(np.int16)
+
+    hse_up, hse_down = half_sphere_exposure(ca, cb, tree=ca_tree)
+    features["HSE_up"] = hse_up.astype(np.int16)
+    features["HSE_down"] = hse_down.astype(np.int16)
+
+    cb10 = _neighbour_counts(cb_tree, cb, 10.0)
+    rsa = 1 - (cb10 - RSA_EXPOSED_COUNT) / (RSA_BURIED_COUNT - RSA_EXPOSED_COUNT)
+    features["RSA_approx"] = np.clip(rsa, 0, 1).astype(np.float32)
+
+    distance, nearest = site_distances(features["Residue"], ca, sites or {})
+    features["Site_distance"] = distance
+    features["Nearest_site"] = pd.Categorical(nearest)
+
+    return pd.DataFrame(features)
@@ -0,0 +1,176 @@
+"""
+Mutation-site cropping for ddG jobs
+Cuts the local environment of a mutated residue out of a (prepared) structure:
+every residue with an atom within a radius of the site, short gaps between
+selected stretches filled in, and each stretch extended by cap residues so the
+artificial termini created by the cut sit away from the site. Stretches are
+written as separate TER-terminated segments and renumbered 1..N so mutfile
+positions and pose numbering agree.
+"""
+
+import logging
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .structure_scan import PDB_COLUMNS, pdb_atom_block, record_column
+
+logger = logging.getLogger(__name__)
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class CropOptions:
+    """How much of the structure around a mutation is kept"""
+    radius: float = 12.0  # Å, any atom of a residue to any atom of the mutated residue
+    gap_fill: int = 3  # unselected runs up to this length between selected residues are kept
+    cap_residues: int = 1  # residues added at both ends of each kept stretch
+
+    def options(self) -> Dict[str, float]:
+        return asdict(self)
+
+
+@dataclass
+class CropResult:
+    """A cropped structure and how its pose numbering maps back to the input"""
+    path: Path
+    site_pose: int
+    n_residues: int
+    segments: List[Tuple[str, int, int]] = field(default_factory=list)  # chain, first, last (input numbering)
+    residue_map: Dict[Tuple[str, int], int] = field(default_factory=dict)  # (chain, resseq) -> pose number
+
+
+class CroppableStructure:
+    """Atom records of one structure, parsed once and cropped around many sites"""
+
+    def __init__(self, path: PathLike):
+        self.path = Path(path)
+        block = pdb_atom_block(self.path.read_bytes())
+        if not len(block):
+            raise ValueError(f"No ATOM records in {self.path}")
+
+        altloc = record_column(block, *PDB_COLUMNS["altloc"])
+        block = block[np.isin(altloc, [b" ", b"A"])]
+        self.block = block
+
+        chain = record_column(block, *PDB_COLUMNS["chain"])
+        resseq = record_column(block, *PDB_COLUMNS["resseq"]).astype(np.int32)
+        icode = record_column(block, *PDB_COLUMNS["icode"])
+        self.coords = np.stack(
+            [record_column(block, *PDB_COLUMNS[axis]).astype(np.float32) for axis in ("x", "y", "z")],
+            axis=1,
+        )
+
+        # Residue index per atom, in file order
+        new_residue = np.ones(len(block), dtype=bool)
+        new_residue[1:] = (
+            (chain[1:] != chain[:-1]) | (resseq[1:] != resseq[:-1]) | (icode[1:] != icode[:-1])
+        )
+        self.atom_residue = np.cumsum(new_residue) - 1
+        starts = np.flatnonzero(new_residue)
+        self.res_chain = np.char.decode(chain[starts]).astype(str)
+        self.res_seq = resseq[starts]
+        self.res_icode = icode[starts]
+        self.res_name = np.char.decode(
+            np.char.strip(record_column(block, *PDB_COLUMNS["resname"])[starts])
+        ).astype(str)
+        self.n_residues = len(starts)
+
+        # A stretch also ends where the input itself has a chain or numbering break
+        self.res_break_before = np.ones(self.n_residues, dtype=bool)
+        self.res_break_before[1:] = (
+            (self.res_chain[1:] != self.res_chain[:-1]) | (np.diff(self.res_seq) > 1)
+        )
+
+    def site_index(self, chain: str, position: int) -> int:
+        hits = np.flatnonzero(
+            (self.res_chain == chain) & (self.res_seq == position) & (self.res_icode == b" ")
+        )
+        if not len(hits):
+            raise ValueError(f"Residue {chain}{position} not found in {self.path.name}")
+        return int(hits[0])
+
+    def select(self, site: int, options: CropOptions) -> np.ndarray:
+        """Boolean mask over residues kept for a site"""
+        site_coords = self.coords[self.atom_residue == site]
+        diff = self.coords[:, None, :] - site_coords[None, :, :]
+        atom_dist = np.sqrt((diff ** 2).sum(axis=2)).min(axis=1)
+
+        res_dist = np.full(self.n_residues, np.inf, dtype=np.float32)
+        np.minimum.at(res_dist, self.atom_residue, atom_dist)
+        keep = res_dist <= options.radius
+
+        # Fill short gaps between kept residues of the same continuous stretch
+        segment_id = np.cumsum(self.res_break_before)
+        kept = np.flatnonzero(keep)
+        for a, b in zip(kept[:-1], kept[1:]):
+            if 1 < b - a <= options.gap_fill + 1 and segment_id[a] == segment_id[b]:
+                keep[a:b] = True
+
+        # Caps: extend every kept stretch within its input segment
+        for _ in range(options.cap_residues):
+            grow = keep.copy()
+            grow[1:] |= keep[:-1] & (segment_id[1:] == segment_id[:-1])
+            grow[:-1] |= keep[1:] & (segment_id[:-1] == segment_id[1:])
+            keep = grow
+        return keep
+
+    def crop(self, chain: str, position: int, out_path: PathLike,
+             options: Optional[CropOptions] = None, wt: Optional[str] = None) -> CropResult:
+        """Write the cropped environment of one residue and return its pose mapping"""
+        options = options or CropOptions()
+        site = self.site_index(chain, position)
+        if wt is not None and self.res_name[site] != wt.upper():
+            raise ValueError(
+                f"Wild-type mismatch at {chain}{position}: structure has {self.res_name[site]}, "
+                f"variant expects {wt.upper()}"
+            )
+
+        keep = self.select(site, options)
+        kept = np.flatnonzero(keep)
+        pose = np.zeros(self.n_residues, dtype=np.int32)
+        pose[kept] = np.arange(1, len(kept) + 1)
+
+        # Kept residues start a new segment after any gap or input break
+        starts_segment = np.ones(len(kept), dtype=bool)
+        starts_segment[1:] = (np.diff(kept) > 1) | self.res_break_before[kept[1:]]
+
+        atoms = np.flatnonzero(keep[self.atom_residue])
+        block = self.block[atoms].copy()
+        atom_pose = pose[self.atom_residue[atoms]]
+        block[:, 6:11] = np.frombuffer(
+            "".join(f"{i % 100000:>5}" for i in range(1, len(atoms) + 1)).encode(), dtype=np.uint8
+        ).reshape(-1, 5)
+        block[:, 22:27] = np.frombuffer(
+            "".join(f"{p:>4} " for p in atom_pose).encode(), dtype=np.uint8
+        ).reshape(-1, 5)
+
+        first_atom = np.searchsorted(self.atom_residue[atoms], kept[starts_segment])
+        segments_atoms = np.split(block, first_atom[1:])
+        lines = []
+        for seg in segments_atoms:
+            lines.extend(row.tobytes().decode().rstrip() for row in seg)
+            lines.append("TER")
+        lines.append("END")
+
+        out_path = Path(out_path)
+        out_path.write_text("\n".join(lines) + "\n")
+
+        bounds = np.split(kept, np.flatnonzero(starts_segment)[1:])
+        segments = [(str(self.res_chain[s[0]]), int(self.res_seq[s[0]]), int(self.res_seq[s[-1]])) for s in bounds]
+        return CropResult(
+            path=out_path,
+            site_pose=int(pose[site]),
+            n_residues=len(kept),
+            segments=segments,
+            residue_map={(str(self.res_chain[i]), int(self.res_seq[i])): int(pose[i]) for i in kept},
+        )
+
+
+def crop_structure(structure: PathLike, chain: str, position: int, out_path: PathLike,
+                   options: Optional[CropOptions] = None, wt: Optional[str] = None) -> CropResult:
+    """One-off crop; use CroppableStructure to crop many sites from one file"""
+    return CroppableStructure(structure).crop(chain, position, out_path, options, wt)
@@ -0,0 +1,223 @@
+"""
+Wild-type structure preparation stage
+Repacks or relaxes the input structure once with Rosetta and stores the
+lowest-scoring model in the content-addressed cache, keyed by the input PDB
+hash, the preparation binary and the protocol options. Every ddG job is then
+pointed at the prepared structure instead of re-preparing the raw model.
+Prepared structures made for an older version of the input are reported as
+stale and dropped.
+"""
+
+import logging
+import shutil
+import subprocess
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Union
+
+from .cache_manager import CacheManager, code_version
+from .instrumentation import record_subprocess
+from .rosetta_executor import OUTPUT_TAIL_CHARS, kill_process_group
+
+logger = logging.getLogger(__name__)
+
+STAGE = "prepared_structure"
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class PrepProtocol:
+    """Rosetta WT preparation options; all of them are part of the cache key"""
+    executable: str = "./relax.linuxgccrelease"
+    mode: str = "relax"  # "relax" (constrained relax) or "repack" (fixbb repack only)
+    nstruct: int = 1
+    extra_args: tuple = field(default_factory=tuple)
+    timeout: float = 6 * 3600
+
+    def arguments(self) -> List[str]:
+        if self.mode == "relax":
+            # Backbone-constrained relax as recommended before ddg_monomer
+            args = [
+                "-relax:constrain_relax_to_start_coords",
+                "-relax:ramp_constraints", "false",
+                "-ex1", "-ex2", "-use_input_sc", "-flip_HNQ", "-no_optH", "false",
+            ]
+        elif self.mode == "repack":
+            args = ["-packing:repack_only", "-ex1", "-ex2", "-use_input_sc"]
+        else:
+            raise ValueError(f"Unknown preparation mode {self.mode!r}; expected 'relax' or 'repack'")
+        return args + ["-nstruct", str(self.nstruct), "-ignore_unrecognized_res", *self.extra_args]
+
+    def options(self) -> Dict[str, Any]:
+        """Options that determine the prepared structure (not where the binary lives)"""
+        options = asdict(self)
+        options.pop("executable")
+        options.pop("timeout")
+        return options
+
+
+def best_decoy(workdir: Path, scorefile: str = "score.sc") -> Optional[Path]:
+    """Lowest total_score model listed in a Rosetta score file"""
+    score_path = workdir / scorefile
+    best, best_score = None, float("inf")
+    if score_path.exists():
+        header = None
+        for line in score_path.read_text().splitlines():
+            if not line.startswith("SCORE:"):
+                continue
+            parts = line.split()
+            if header is None and "total_score" in parts:
+                header = parts
+                continue
+            if header is None or len(parts) != len(header):
+                continue
+            row = dict(zip(header, parts))
+            try:
+                score = float(row["total_score"])
+            except ValueError:
+                continue
+            decoy = workdir / f"{row['description']}.pdb"
+            if score < best_score and decoy.exists():
+                best, best_score = decoy, score
+
+    if best is None:
+        # No usable score file: fall back to the only model written
+        models = sorted(workdir.glob("*.pdb"))
+        best = models[0] if len(models) == 1 else None
+    return best
+
+
+class StructurePreparer:
+    """Prepare a wild-type structure once and reuse it from the cache"""
+
+    def __init__(self, cache: CacheManager, protocol: Optional[PrepProtocol] = None,
+                 scratch_root: Optional[PathLike] = None, keep_scratch: bool = False):
+        self.cache = cache
+        self.protocol = protocol or PrepProtocol()
+        self.scratch_root = Path(scratch_root).resolve() if scratch_root else None
+        self.keep_scratch = keep_scratch
+        if self.scratch_root is not None:
+            self.scratch_root.mkdir(parents=True, exist_ok=True)
+
+    def _executable_identity(self) -> Dict[str, str]:
+        executable = Path(self.protocol.executable)
+        if executable.exists():
+            return self.cache.file_identity(executable)
+        return {"path": str(executable)}
+
+    def key(self, structure: PathLike) -> str:
+        """Cache key of the prepared form of a structure"""
+        return self.cache.make_key(
+            STAGE,
+            {"structure": self.cache.file_identity(structure),
+             "executable": self._executable_identity()},
+            self.protocol.options(),
+            code_version(PrepProtocol, best_decoy, StructurePreparer._run),
+        )
+
+    def stale(self, structure: PathLike) -> List[Dict[str, Any]]:
+        """Prepared entries made from an earlier version of this input file"""
+        structure = Path(structure).resolve()
+        sha = self.cache.file_identity(structure)["sha256"]
+        return [
+            entry for entry in self.cache.entries(STAGE)
+            if entry["meta"].get("input") == str(structure)
+            and entry["meta"].get("input_sha256") != sha
+        ]
+
+    def check(self, prepared: PathLike, structure: PathLike) -> bool:
+        """Whether a prepared file is the current preparation of the input structure"""
+        path = self.cached(structure)
+        return path is not None and Path(prepared).resolve() == path.resolve()
+
+    def cached(self, structure: PathLike) -> Optional[Path]:
+        """Prepared structure if already in the cache; never runs the preparation"""
+        return self.cache.lookup(self.key(structure), STAGE)
+
+    def prepare(self, structure: PathLike, force_refresh: bool = False) -> Path:
+        """Path of the prepared structure, running the preparation on a cache miss"""
+        structure = Path(structure).resolve()
+        for entry in self.stale(structure):
+            logger.warning(
+                f"Prepared structure {entry['key'][:12]} is stale: {structure.name} has changed"
+            )
+            self.cache.invalidate(key=entry["key"])
+
+        key = self.key(structure)
+        if not force_refresh:
+            path = self.cache.lookup(key, STAGE)
+            if path is not None:
+                return path
+
+        prepared, meta = self._run(structure)
+        try:
+            return self.cache.put_file(key, STAGE, prepared, meta=meta)
+        finally:
+            shutil.rmtree(prepared.parent, ignore_errors=True)
+
+    def adopt(self, prepared: PathLike, structure: PathLike) -> Path:
+        """Register an existing prepared model (e.g. repacked_wt_round_3.pdb) for this protocol"""
+        structure = Path(structure).resolve()
+        meta = {
+            "input": str(structure),
+            "input_sha256": self.cache.file_identity(structure)["sha256"],
+            "adopted_from": str(Path(prepared).resolve()),
+            **self.protocol.options(),
+        }
+        return self.cache.put_file(self.key(structure), STAGE, prepared, meta=meta)
+
+    def _run(self, structure: Path):
+        executable = Path(self.protocol.executable)
+        if not executable.exists():
+            logger.error(f"Rosetta preparation executable not found: {executable}")
+            raise FileNotFoundError(f"Rosetta preparation executable not found: {executable}")
+
+        workdir = Path(tempfile.mkdtemp(prefix="wt_prep_", dir=self.scratch_root))
+        cmd = [
+            str(executable.resolve()), "-s", str(structure),
+            "-out:path:all", str(workdir), "-out:file:scorefile", "score.sc",
+            *self.protocol.arguments(),
+        ]
+        logger.info(f"Preparing wild-type structure {structure.name} ({self.protocol.mode})...")
+
+        start = time.perf_counter()
+        try:
+            proc = subprocess.Popen(
+                cmd, cwd=workdir, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                text=True, start_new_session=True,
+            )
+            try:
+                _, stderr = proc.communicate(timeout=self.protocol.timeout)
+            except subprocess.TimeoutExpired:
+                kill_process_group(proc, 10.0)
+                record_subprocess(cmd, time.perf_counter() - start, proc.returncode, "timeout")
+                raise RuntimeError(f"Structure preparation timed out after {self.protocol.timeout}s")
+            record_subprocess(cmd, time.perf_counter() - start, proc.returncode,
+                              "ok" if proc.returncode == 0 else "failed")
+            if proc.returncode != 0:
+                raise RuntimeError(f"Structure preparation failed: {stderr[-OUTPUT_TAIL_CHARS:]}")
+
+            decoy = best_decoy(workdir)
+            if decoy is None:
+                raise RuntimeError(f"Structure preparation wrote no model in {workdir}")
+
+            # Copy out before the scratch directory goes away
+            prepared = Path(tempfile.mkdtemp(prefix="wt_prepared_", dir=self.scratch_root)) / "prepared.pdb"
+            shutil.copyfile(decoy, prepared)
+        finally:
+            if not self.keep_scratch:
+                shutil.rmtree(workdir, ignore_errors=True)
+
+        runtime = time.perf_counter() - start
+        logger.info(f"Prepared {structure.name} in {runtime:.0f}s")
+        meta = {
+            "input": str(structure),
+            "input_sha256": self.cache.file_identity(structure)["sha256"],
+            "decoy": decoy.name,
+            "runtime": runtime,
+            **self.protocol.options(),
+        }
+        return prepared, meta
@@ -0,0 +1,131 @@
+"""
+Typed columnar cache layer
+Intermediate tables are cached as Parquet (or Arrow IPC) with explicit schemas:
+dictionary-encoded categoricals for repetitive strings, float32 scores and
+narrow integers. Reads can project columns and memory-map the file. CSV is only
+an export format for finished outputs.
+"""
+
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+logger = logging.getLogger(__name__)
+
+# Column dtypes per cached table; columns not listed are stored as inferred
+SCHEMAS: Dict[str, Dict[str, str]] = {
+    "clinvar": {
+        "GeneSymbol": "category",
+        "Type": "category",
+        "Name": "category",
+        "ClinicalSignificance": "category",
+        "ProteinChange": "string",
+        "Residue": "int32",
+        "VariantKey": "int64",
+    },
+    "alphamissense": {
+        "ProteinChange": "string",
+        "VariantKey": "int64",
+        "score": "float32",
+        "class": "category",
+    },
+    "plddt": {
+        "Residue": "int32",
+        "pLDDT": "float32",
+    },
+    "features": {
+        "Residue": "int32",
+        **{f"Contacts_{atom}_{r}": "int16" for r in (8, 10, 12) for atom in ("CA", "CB")},
+        "HSE_up": "int16",
+        "HSE_down": "int16",
+        "RSA_approx": "float32",
+        "Site_distance": "float32",
+        "Nearest_site": "category",
+    },
+    "rosetta": {
+        "ProteinChange": "string",
+        "VariantKey": "int64",
+        "Rosetta_ddG": "float32",
+        "Status": "category",
+    },
+}
+SCHEMAS["combined"] = {
+    **SCHEMAS["clinvar"],
+    "AlphaMissense_score": "float32",
+    "AlphaMissense_class": "category",
+    "pLDDT": "float32",
+    # Nullable counts: variants outside the modelled residues have no features
+    **{col: dtype.replace("int", "Int") for col, dtype in SCHEMAS["features"].items() if col != "Residue"},
+    # Mean over replicates, with their spread and count
+    "Rosetta_ddG": "float32",
+    "Rosetta_ddG_std": "float32",
+    "Rosetta_ddG_n": "Int16",
+}
+
+SCHEMAS["saturation"] = {
+    "Residue": "int32",
+    "WT": "category",
+    "Mut": "category",
+    "ProteinChange": "string",
+    "VariantKey": "int64",
+    "AlphaMissense_score": "float32",
+    "AlphaMissense_class": "category",
+    "ClinVar_observed": "bool",
+    "ClinicalSignificance": "category",
+    "SNV_reachable": "bool",
+    "pLDDT": "float32",
+    # Residue-level features are broadcast as float32 so missing residues stay NaN
+    **{col: "float32" for col in SCHEMAS["features"] if col not in ("Residue", "Nearest_site")},
+    "Rosetta_ddG": "float32",
+}
+
+TableSchema = Union[str, Dict[str, str], None]
+
+
+def apply_schema(df: pd.DataFrame, schema: TableSchema) -> pd.DataFrame:
+    """Cast the columns named in a schema; other columns are left untouched"""
+    if schema is None:
+        return df
+    dtypes = SCHEMAS[schema] if isinstance(schema, str) else schema
+    present = {col: dtype for col, dtype in dtypes.items() if col in df.columns}
+    return df.astype(present)
+
+
+def write_table(df: pd.DataFrame, path: Union[str, Path], schema: TableSchema = None) -> Path:
+    """Write a typed table as Parquet (``.parquet``) or Arrow IPC (``.arrow``)"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    table = pa.Table.from_pandas(apply_schema(df, schema), preserve_index=False)
+
+    # Write to a sibling temp file so readers never see a partial table
+    tmp_path = path.with_name(path.name + ".tmp")
+    if path.suffix == ".arrow":
+        # Uncompressed IPC so memory-mapped reads are zero-copy
+        feather.write_feather(table, tmp_path, compression="uncompressed")
+    else:
+        pq.write_table(table, tmp_path, compression="zstd")
+    tmp_path.replace(path)
+    return path
+
+
+def read_table(path: Union[str, Path], columns: Optional[List[str]] = None,
+               memory_map: bool = True) -> pd.DataFrame:
+    """Read a cached table, optionally projecting a subset of columns"""
+    path = Path(path)
+    if path.suffix == ".arrow":
+        table = feather.read_table(path, columns=columns, memory_map=memory_map)
+    else:
+        table = pq.read_table(path, columns=columns, memory_map=memory_map)
+    return table.to_pandas()
+
+
+def export_csv(df: pd.DataFrame, path: Union[str, Path]) -> Path:
+    """Write a finished table as CSV for sharing; never read back as a cache"""
+    path = Path(path)
+    df.to_csv(path, index=False)
+    return path
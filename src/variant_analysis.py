@@ -6,19 +6,36 @@ modular design, and extended functionality.
 
 import pandas as pd
 import numpy as np
-import requests
 import tempfile
-import re
 import os
-import subprocess
+import sys
 from pathlib import Path
 from typing import Dict, List, Tuple, Optional
-from Bio.PDB import PDBParser, PDBIO
-import matplotlib.pyplot as plt
-import seaborn as sns
 from dataclasses import dataclass
 import logging
 
+from . import (
+    clinvar_stream, ddg_journal, dedup, notation, rosetta_executor, saturation, structural_features,
+    structure_crop, variant_matrix,
+)
+from .alphamissense_store import INDEX_FILE as ALPHAMISSENSE_INDEX_FILE, AlphaMissenseStore
+from .boltz_batch import ShardPlan, read_sequence, write_job_script, write_shards
+from .cache_manager import CacheManager, code_version
+from .clinvar_stream import CLINVAR_URL, DEFAULT_CHUNKSIZE, read_clinvar_variants
+from .ddg_journal import DDGJournal, RetryPolicy, run_journaled, task_inputs_hash
+from .dedup import aggregate_replicates, broadcast, unique_variants, with_variant_key
+from .instrumentation import Recorder, instrumented, note, run_subprocess
+from .notation import INVALID_KEY, convert_notation, variant_keys
+from .rendering import analysis_figures, render_figures
+from .report import write_summary_report
+from .rosetta_executor import RosettaDDGExecutor, parse_ddg_scorefile, read_mutfile
+from .structure_crop import CropOptions
+from .structure_prep import StructurePreparer
+from .structural_features import FUNCTIONAL_SITES, compute_structural_features
+from .structure_scan import scan_structure
+from .table_cache import apply_schema, export_csv, read_table, write_table
+from .variant_matrix import VariantMatrix
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -32,6 +49,20 @@ THREE_TO_ONE = {
 }
 ONE_TO_THREE = {v: k for k, v in THREE_TO_ONE.items()}
 
+# HCM sarcomere panel: gene -> UniProt accession (also the AlphaFold DB key)
+HCM_GENE_PANEL = {
+    "MYH7": "P12883",
+    "MYBPC3": "Q14896",
+    "TNNT2": "P45379",
+    "TNNI3": "P19429",
+    "TPM1": "P09493",
+    "ACTC1": "P68032",
+    "MYL2": "P10916",
+    "MYL3": "P08590",
+}
+
+ALPHAMISSENSE_URL = "https://zenodo.org/record/8208688/files/AlphaMissense_aa_substitutions.tsv.gz"
+
 @dataclass
 class VariantData:
     """Container for variant analysis results"""
@@ -42,155 +73,227 @@ class VariantData:
     combined_df: Optional[pd.DataFrame] = None
 
 class MYH7VariantAnalyzer:
-    """Comprehensive MYH7 variant analysis pipeline"""
+    """Comprehensive variant analysis pipeline for MYH7 or another panel gene"""
     
-    def __init__(self, data_dir: str = "data/variants", results_dir: str = "results"):
+    def __init__(self, data_dir: str = "data/variants", results_dir: str = "results",
+                 gene: str = "MYH7"):
         self.data_dir = Path(data_dir)
         self.results_dir = Path(results_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
         self.results_dir.mkdir(parents=True, exist_ok=True)
         
-        # MYH7 specific identifiers
-        self.uniprot_id = "P12883"  # MYH7 UniProt ID
-        self.alphafold_id = "Q14896"  # AlphaFold ID for MYH7
-        
-    def fetch_clinvar_variants(self, force_refresh: bool = False) -> pd.DataFrame:
-        """Enhanced ClinVar variant fetching with caching"""
-        cache_file = self.data_dir / "clinvar_myh7.csv"
-        
-        if not force_refresh and cache_file.exists():
-            logger.info("Loading cached ClinVar data")
-            return pd.read_csv(cache_file)
+        if gene not in HCM_GENE_PANEL:
+            raise ValueError(f"Unknown gene {gene}; expected one of {sorted(HCM_GENE_PANEL)}")
+        
+        # Gene specific identifiers
+        self.gene = gene
+        self.uniprot_id = HCM_GENE_PANEL[gene]
+        self.alphafold_id = HCM_GENE_PANEL[gene]  # AlphaFold DB is keyed by UniProt
+        self.pdb_file = f"{gene}_native.pdb"
+        
+        # ClinVar variant_summary dump (URL or local path)
+        self.clinvar_source = CLINVAR_URL
+        
+        # Indexed AlphaMissense store (see alphamissense_store.py); used when built
+        self.alphamissense_store = self.data_dir / "alphamissense_store"
+        
+        self.rosetta_executable = "./ddg_monomer.linuxgccrelease"
+        self.rosetta_workers: Optional[int] = None  # defaults to one job per core
+        self.rosetta_timeout = 300
+        # Per-variant attempts survive crashes; finished variants are skipped on rerun
+        self.rosetta_journal = DDGJournal(self.data_dir / "rosetta_journal.sqlite")
+        self.rosetta_retry = RetryPolicy()
+        # Set to CropOptions() to run each ddG job on the mutation site's local environment
+        self.rosetta_crop: Optional[CropOptions] = None
+        
+        # Content-addressed cache shared by every stage (and by panel workers)
+        self.cache = CacheManager(self.data_dir / "cache")
+        self.cache_ttls: Dict[str, Optional[float]] = {
+            "clinvar": 7 * 24 * 3600,  # ClinVar publishes weekly
+            "alphamissense": None,
+            "plddt": None,
+            "features": None,
+            "saturation": None,
+            "rosetta": None,
+            "combined": None,
+        }
+        self._source_ids: Dict[str, Dict[str, str]] = {}
+        
+        # Annotated functional regions used for the Site_distance feature
+        self.functional_sites = dict(FUNCTIONAL_SITES.get(gene, {}))
+        
+        # Wild-type preparation (constrained relax) done once and reused by every ddG job
+        self.prepare_wt = True
+        self.structure_prep = StructurePreparer(self.cache, scratch_root=self.data_dir / "rosetta_scratch")
+        
+        # Per-stage timings, memory, rows, I/O and cache counts; profile stages by name
+        self.instrumentation = Recorder(self.cache, profile_dir=self.results_dir / "profiles")
+    
+    def _source_identity(self, source) -> Dict[str, str]:
+        """Source identity, resolved once per analyzer so URLs are validated once per run"""
+        if str(source) not in self._source_ids:
+            self._source_ids[str(source)] = self.cache.source_identity(source)
+        return self._source_ids[str(source)]
+    
+    def clinvar_cache_key(self) -> str:
+        """Cache key of this gene's filtered ClinVar table"""
+        return self.cache.make_key(
+            "clinvar",
+            {"clinvar": self._source_identity(self.clinvar_source)},
+            {"gene": self.gene},
+            code_version(clinvar_stream, notation, MYH7VariantAnalyzer._fetch_clinvar),
+        )
+    
+    def alphamissense_cache_key(self) -> str:
+        """Cache key of this gene's AlphaMissense table"""
+        if AlphaMissenseStore.exists(self.alphamissense_store):
+            source = self._source_identity(Path(self.alphamissense_store) / ALPHAMISSENSE_INDEX_FILE)
+        else:
+            source = self._source_identity(ALPHAMISSENSE_URL)
+        return self.cache.make_key(
+            "alphamissense",
+            {"alphamissense": source},
+            {"uniprot_id": self.uniprot_id},
+            code_version(notation, MYH7VariantAnalyzer._format_alphamissense),
+        )
+    
+    def plddt_cache_key(self, pdb_file: str) -> str:
+        """Cache key of the pLDDT table extracted from a structure file"""
+        return self.cache.make_key(
+            "plddt",
+            {"structure": self._source_identity(pdb_file)},
+            {},
+            code_version(MYH7VariantAnalyzer._extract_plddt),
+        )
         
-        logger.info("Fetching ClinVar variants for MYH7...")
+    @instrumented("clinvar")
+    def fetch_clinvar_variants(self, force_refresh: bool = False,
+                               chunksize: int = DEFAULT_CHUNKSIZE,
+                               columns: Optional[List[str]] = None) -> pd.DataFrame:
+        """Streaming ClinVar variant fetching with caching"""
+        return self.cache.cached_table(
+            "clinvar", lambda: self._fetch_clinvar(chunksize), self.clinvar_cache_key(),
+            schema="clinvar", ttl=self.cache_ttls["clinvar"],
+            force_refresh=force_refresh, columns=columns,
+        )
+    
+    def _fetch_clinvar(self, chunksize: int = DEFAULT_CHUNKSIZE) -> pd.DataFrame:
+        logger.info(f"Fetching ClinVar variants for {self.gene}...")
         try:
-            clinvar_url = "https://ftp.ncbi.nlm.nih.gov/pub/clinvar/tab_delimited/variant_summary.txt.gz"
-            clinvar = pd.read_csv(clinvar_url, sep="\t", compression="gzip", dtype=str)
-            
-            # Filter for MYH7 missense variants
-            mask = (
-                (clinvar.GeneSymbol == "MYH7") & 
-                clinvar.Type.str.contains("single nucleotide", na=False) &
-                clinvar.Name.str.contains(r"\(p\.[A-Za-z]{3}\d+[A-Za-z]{3}\)", na=False)
-            )
-            
-            vars_df = clinvar.loc[mask, ["GeneSymbol", "Type", "Name", "ClinicalSignificance"]].copy()
-            
-            # Extract protein change information
-            vars_df["ProteinChange"] = vars_df["Name"].str.extract(
-                r"\(p\.([A-Za-z]{3}\d+[A-Za-z]{3})\)"
-            )
-            vars_df = vars_df.dropna(subset=["ProteinChange"]).reset_index(drop=True)
-            vars_df["Residue"] = vars_df["ProteinChange"].str.extract(r"(\d+)").astype(int)
-            
-            # Cache results
-            vars_df.to_csv(cache_file, index=False)
-            logger.info(f"Found {len(vars_df)} MYH7 variants from ClinVar")
-            
+            # Stream the dump in column-projected chunks, filtering as we go
+            vars_df = read_clinvar_variants(self.clinvar_source, [self.gene], chunksize=chunksize)
+            vars_df = apply_schema(self._with_variant_key(vars_df), "clinvar")
+            logger.info(f"Found {len(vars_df)} {self.gene} variants from ClinVar")
             return vars_df
             
         except Exception as e:
             logger.error(f"Error fetching ClinVar data: {e}")
             raise
     
-    def fetch_alphamisense_scores(self, force_refresh: bool = False) -> pd.DataFrame:
+    @instrumented("alphamissense")
+    def fetch_alphamisense_scores(self, force_refresh: bool = False,
+                                  columns: Optional[List[str]] = None) -> pd.DataFrame:
         """Enhanced AlphaMissense score fetching"""
-        cache_file = self.data_dir / "alphamisense_myh7.csv"
-        
-        if not force_refresh and cache_file.exists():
-            logger.info("Loading cached AlphaMissense data")
-            return pd.read_csv(cache_file)
-        
+        return self.cache.cached_table(
+            "alphamissense", self._fetch_alphamissense, self.alphamissense_cache_key(),
+            schema="alphamissense", ttl=self.cache_ttls["alphamissense"],
+            force_refresh=force_refresh, columns=columns,
+        )
+    
+    def _fetch_alphamissense(self) -> pd.DataFrame:
         logger.info("Fetching AlphaMissense scores...")
         try:
-            # Download and process AlphaMissense data
-            am_url = "https://zenodo.org/record/8208688/files/AlphaMissense_aa_substitutions.tsv.gz"
-            
-            # Use subprocess to handle the download and filtering more reliably
-            temp_file = self.data_dir / "myh7_alphamisense_temp.tsv"
+            am = self.read_alphamissense_rows([self.uniprot_id], self.data_dir,
+                                              self.alphamissense_store)
+            note(rows_in=len(am))
+            am = apply_schema(self._format_alphamissense(am), "alphamissense")
+            logger.info(f"Retrieved {len(am)} AlphaMissense scores")
+            return am
             
-            # Download and filter for MYH7 (P12883)
-            subprocess.run([
+        except Exception as e:
+            logger.error(f"Error fetching AlphaMissense data: {e}")
+            raise
+    
+    @staticmethod
+    def read_alphamissense_rows(accessions: List[str], work_dir: Path,
+                                store_dir: Optional[Path] = None) -> pd.DataFrame:
+        """Read AlphaMissense rows for the given accessions in a single pass"""
+        if store_dir is not None and AlphaMissenseStore.exists(store_dir):
+            # Seek-and-read from the local indexed store, no network
+            return AlphaMissenseStore(store_dir).fetch_many(accessions)
+        
+        logger.info("No local AlphaMissense store; streaming the full dump")
+        
+        # Use subprocess to handle the download and filtering more reliably
+        temp_file = Path(work_dir) / "alphamisense_temp.tsv"
+        accession_pattern = "|".join(accessions)
+        
+        try:
+            run_subprocess([
                 "bash", "-c", 
-                f"curl -s {am_url} | zgrep -P '^#|{self.uniprot_id}\\t' > {temp_file}"
+                f"curl -s {ALPHAMISSENSE_URL} | zgrep -P '^#|^({accession_pattern})\\t' > {temp_file}"
             ], check=True)
             
             # Read the filtered data
-            am = pd.read_csv(
+            return pd.read_csv(
                 temp_file, sep="\t", comment="#",
                 names=["uniprot", "variant", "score", "class"]
             )
-            
-            # Convert single-letter to three-letter amino acid codes
-            am["ProteinChange"] = am["variant"].apply(self._convert_to_three_letter)
-            am = am.dropna(subset=["ProteinChange"])[["ProteinChange", "score", "class"]]
-            
-            # Cache results
-            am.to_csv(cache_file, index=False)
-            
+        finally:
             # Clean up temp file
             temp_file.unlink(missing_ok=True)
-            
-            logger.info(f"Retrieved {len(am)} AlphaMissense scores")
-            return am
-            
-        except Exception as e:
-            logger.error(f"Error fetching AlphaMissense data: {e}")
-            raise
     
-    def _convert_to_three_letter(self, variant: str) -> Optional[str]:
-        """Convert single-letter variant notation to three-letter"""
-        try:
-            match = re.match(r"^([A-Z])(\d+)([A-Z])$", variant)
-            if match:
-                wt, pos, mut = match.groups()
-                return f"{ONE_TO_THREE[wt]}{pos}{ONE_TO_THREE[mut]}"
-            return None
-        except KeyError:
-            return None
-    
-    def extract_alphafold_plddt(self, pdb_file: Optional[str] = None) -> pd.DataFrame:
+    def _format_alphamissense(self, am: pd.DataFrame) -> pd.DataFrame:
+        """Convert raw AlphaMissense rows to the cached ProteinChange/score/class table"""
+        # Convert single-letter to three-letter amino acid codes, whole column at once
+        am = am.assign(
+            ProteinChange=convert_notation(am["variant"], "one", "three"),
+            VariantKey=variant_keys(am["variant"], "one"),
+        )
+        am = am[am["VariantKey"] != INVALID_KEY]
+        return am[["ProteinChange", "VariantKey", "score", "class"]].reset_index(drop=True)
+    
+    @staticmethod
+    def _with_variant_key(df: pd.DataFrame) -> pd.DataFrame:
+        """Ensure a table carries the int64 VariantKey derived from ProteinChange"""
+        return with_variant_key(df, "three")
+    
+    @instrumented("plddt")
+    def extract_alphafold_plddt(self, pdb_file: Optional[str] = None,
+                                force_refresh: bool = False) -> pd.DataFrame:
         """Extract pLDDT scores from AlphaFold structure"""
         if pdb_file is None:
-            pdb_file = "MYH7_native.pdb"
-        
-        cache_file = self.data_dir / "alphafold_plddt.csv"
+            pdb_file = self.pdb_file
         
-        if cache_file.exists():
-            logger.info("Loading cached pLDDT data")
-            return pd.read_csv(cache_file)
-        
-        logger.info("Extracting pLDDT scores from AlphaFold structure...")
+        self._ensure_structure(pdb_file)
         
+        return self.cache.cached_table(
+            "plddt", lambda: self._extract_plddt(pdb_file), self.plddt_cache_key(pdb_file),
+            schema="plddt", ttl=self.cache_ttls["plddt"], force_refresh=force_refresh,
+        )
+    
+    def _ensure_structure(self, pdb_file: str) -> None:
+        """Download the AlphaFold model if the structure file is missing"""
         if not Path(pdb_file).exists():
             # Download AlphaFold structure
             af_url = f"https://alphafold.ebi.ac.uk/files/AF-{self.alphafold_id}-F1-model_v4.pdb"
             logger.info(f"Downloading AlphaFold structure from {af_url}")
+            import requests
             
             response = requests.get(af_url)
             response.raise_for_status()
             
             with open(pdb_file, 'wb') as f:
                 f.write(response.content)
-        
+    
+    def _extract_plddt(self, pdb_file: str) -> pd.DataFrame:
+        logger.info("Extracting pLDDT scores from AlphaFold structure...")
         try:
-            parser = PDBParser(QUIET=True)
-            structure = parser.get_structure("MYH7", pdb_file)
-            
-            records = []
-            for model in structure:
-                for chain in model:
-                    for residue in chain:
-                        if residue.id[0] == " ":  # Regular residue
-                            ca_atom = next((a for a in residue if a.get_name() == "CA"), None)
-                            if ca_atom:
-                                records.append({
-                                    "Residue": residue.id[1],
-                                    "pLDDT": ca_atom.get_bfactor()
-                                })
-            
-            plddt_df = pd.DataFrame(records)
-            plddt_df.to_csv(cache_file, index=False)
+            # pLDDT is stored in the B-factor column of each CA record
+            ca = scan_structure(pdb_file, atoms=("CA",))
+            plddt_df = apply_schema(
+                ca[["Residue", "BFactor"]].rename(columns={"BFactor": "pLDDT"}), "plddt"
+            )
             
             logger.info(f"Extracted pLDDT for {len(plddt_df)} residues")
             return plddt_df
@@ -199,35 +302,103 @@ class MYH7VariantAnalyzer:
             logger.error(f"Error extracting pLDDT: {e}")
             raise
     
+    def features_cache_key(self, pdb_file: str) -> str:
+        """Cache key of the per-residue structural feature table"""
+        return self.cache.make_key(
+            "features",
+            {"structure": self._source_identity(pdb_file)},
+            {"sites": self.functional_sites},
+            code_version(structural_features),
+        )
+    
+    @instrumented("features")
+    def extract_structural_features(self, pdb_file: Optional[str] = None,
+                                    force_refresh: bool = False) -> pd.DataFrame:
+        """Contacts, half-sphere exposure, RSA approximation and functional-site distance per residue"""
+        if pdb_file is None:
+            pdb_file = self.pdb_file
+        
+        self._ensure_structure(pdb_file)
+        
+        return self.cache.cached_table(
+            "features", lambda: compute_structural_features(pdb_file, self.functional_sites),
+            self.features_cache_key(pdb_file),
+            schema="features", ttl=self.cache_ttls["features"], force_refresh=force_refresh,
+        )
+    
+    def rosetta_cache_key(self, variants_df: pd.DataFrame, top_n: int) -> str:
+        """Cache key of a ddG run over a specific variant selection"""
+        executable = Path(self.rosetta_executable)
+        return self.cache.make_key(
+            "rosetta",
+            {
+                "structure": self._source_identity(self.pdb_file),
+                "executable": self._source_identity(executable) if executable.exists()
+                else {"path": str(executable)},
+                "prepared": self.structure_prep.key(self.pdb_file) if self.prepare_wt else None,
+            },
+            {
+                "crop": self.rosetta_crop.options() if self.rosetta_crop is not None else None,
+                "top_n": top_n,
+                "variants": sorted(int(k) for k in self._with_variant_key(variants_df)["VariantKey"]),
+            },
+            code_version(
+                MYH7VariantAnalyzer._create_rosetta_mutfile,
+                MYH7VariantAnalyzer._run_rosetta_ddg_monomer,
+                MYH7VariantAnalyzer._parse_rosetta_scorefile,
+                rosetta_executor,
+                ddg_journal,
+                structure_crop,
+            ),
+        )
+    
+    def ddg_candidates(self, top_n: int) -> pd.DataFrame:
+        """Unique ClinVar variants with the highest AlphaMissense scores
+        
+        Ranked from the ClinVar and AlphaMissense stages directly, so the ddG
+        stage does not wait for (or force a second) combine.
+        """
+        clinvar = self.fetch_clinvar_variants(columns=["ProteinChange", "VariantKey"])
+        clinvar = clinvar[clinvar["VariantKey"] != INVALID_KEY]
+        # ClinVar has one row per submission; rank unique variants to avoid spending ddG slots on repeats
+        unique, _ = unique_variants(clinvar)
+        am = self.fetch_alphamisense_scores(columns=["VariantKey", "score"])
+        unique = unique.merge(
+            am.rename(columns={"score": "AlphaMissense_score"}), on="VariantKey", how="inner"
+        )
+        return unique.nlargest(top_n, "AlphaMissense_score")
+    
+    @instrumented("rosetta")
     def run_rosetta_ddg_analysis(self, top_n: int = 20, force_refresh: bool = False) -> pd.DataFrame:
         """Enhanced Rosetta ΔΔG calculations with proper error handling"""
-        cache_file = self.results_dir / "rosetta_ddg_results.csv"
+        # The cache key hashes the structure, so it must be on disk first
+        self._ensure_structure(self.pdb_file)
+        top_variants = self.ddg_candidates(top_n)
+        
+        ddg_results = self.cache.cached_table(
+            "rosetta", lambda: self._compute_rosetta_ddg(top_variants, top_n),
+            self.rosetta_cache_key(top_variants, top_n),
+            schema="rosetta", ttl=self.cache_ttls["rosetta"], force_refresh=force_refresh,
+        )
         
-        if not force_refresh and cache_file.exists():
-            logger.info("Loading cached Rosetta ΔΔG data")
-            return pd.read_csv(cache_file)
+        # Publish as the current ddG results picked up by combine_data;
+        # the CSV copy is for reading, not for reloading
+        results_file = self.results_dir / "rosetta_ddg_results.parquet"
+        write_table(ddg_results, results_file, "rosetta")
+        export_csv(ddg_results, results_file.with_suffix(".csv"))
         
+        return ddg_results
+    
+    def _compute_rosetta_ddg(self, top_variants: pd.DataFrame, top_n: int) -> pd.DataFrame:
         logger.info(f"Running Rosetta ΔΔG analysis for top {top_n} variants...")
         
-        # Load combined data to get top variants
-        if not hasattr(self, '_combined_df') or self._combined_df is None:
-            logger.error("Must combine data first before running Rosetta analysis")
-            raise ValueError("Run combine_data() first")
-        
-        # Get top variants by AlphaMissense score
-        top_variants = self._combined_df.nlargest(top_n, "AlphaMissense_score")
-        
         # Create mutation file
         mutfile_path = self.data_dir / "top_variants_mutfile.txt"
         self._create_rosetta_mutfile(top_variants, mutfile_path)
         
         # Run Rosetta calculations
         ddg_results = self._run_rosetta_ddg_monomer(mutfile_path)
-        
-        # Cache results
-        ddg_results.to_csv(cache_file, index=False)
-        
-        return ddg_results
+        return apply_schema(self._with_variant_key(ddg_results), "rosetta")
     
     def _create_rosetta_mutfile(self, variants_df: pd.DataFrame, output_file: Path):
         """Create mutation file for Rosetta ddg_monomer"""
@@ -246,8 +417,8 @@ class MYH7VariantAnalyzer:
                     f.write(f"A {position} {wt_single} {mut_single}\n")
     
     def _run_rosetta_ddg_monomer(self, mutfile_path: Path) -> pd.DataFrame:
-        """Run Rosetta ddg_monomer with proper error handling"""
-        rosetta_executable = "./ddg_monomer.linuxgccrelease"
+        """Run Rosetta ddg_monomer for every mutfile line, concurrently and in isolated scratch dirs"""
+        rosetta_executable = self.rosetta_executable
         
         if not Path(rosetta_executable).exists():
             logger.error(f"Rosetta executable not found: {rosetta_executable}")
@@ -256,296 +427,301 @@ class MYH7VariantAnalyzer:
         # Make executable
         os.chmod(rosetta_executable, 0o755)
         
-        results = []
-        
-        with open(mutfile_path, 'r') as f:
-            for line_num, line in enumerate(f, 1):
-                parts = line.strip().split()
-                if len(parts) != 4:
-                    continue
-                
-                chain, pos, wt, mut = parts
-                variant_name = f"{chain}{pos}{wt}{mut}"
-                
-                logger.info(f"Processing variant {variant_name} ({line_num})")
-                
-                # Create individual mutation file
-                temp_mutfile = self.data_dir / f"temp_mut_{variant_name}.txt"
-                with open(temp_mutfile, 'w') as temp_f:
-                    temp_f.write(line)
-                
-                # Fixed Rosetta command options
-                cmd = [
-                    rosetta_executable,
-                    "-s", "MYH7_native.pdb",
-                    "-ddg:mutfile", str(temp_mutfile),
-                    "-ddg:iterations", "3",
-                    "-out:file:scorefile", f"score_{variant_name}.sc",
-                    "-ddg:dump_pdbs", "false",
-                    "-ignore_unrecognized_res",
-                    "-mute", "all"
-                ]
-                
-                try:
-                    result = subprocess.run(
-                        cmd, capture_output=True, text=True, timeout=300
-                    )
-                    
-                    if result.returncode == 0:
-                        # Parse score file
-                        score_file = f"score_{variant_name}.sc"
-                        if Path(score_file).exists():
-                            ddg_value = self._parse_rosetta_scorefile(score_file)
-                            results.append({
-                                "ProteinChange": f"{ONE_TO_THREE[wt]}{pos}{ONE_TO_THREE[mut]}",
-                                "Rosetta_ddG": ddg_value,
-                                "Status": "Success"
-                            })
-                        else:
-                            logger.warning(f"Score file not found for {variant_name}")
-                            results.append({
-                                "ProteinChange": f"{ONE_TO_THREE[wt]}{pos}{ONE_TO_THREE[mut]}",
-                                "Rosetta_ddG": np.nan,
-                                "Status": "No output file"
-                            })
-                    else:
-                        logger.error(f"Rosetta failed for {variant_name}: {result.stderr}")
-                        results.append({
-                            "ProteinChange": f"{ONE_TO_THREE[wt]}{pos}{ONE_TO_THREE[mut]}",
-                            "Rosetta_ddG": np.nan,
-                            "Status": f"Error: {result.stderr[:100]}"
-                        })
-                
-                except subprocess.TimeoutExpired:
-                    logger.error(f"Timeout for variant {variant_name}")
-                    results.append({
-                        "ProteinChange": f"{ONE_TO_THREE[wt]}{pos}{ONE_TO_THREE[mut]}",
-                        "Rosetta_ddG": np.nan,
-                        "Status": "Timeout"
-                    })
-                
-                finally:
-                    # Cleanup
-                    temp_mutfile.unlink(missing_ok=True)
-        
-        return pd.DataFrame(results)
+        executor = RosettaDDGExecutor(
+            rosetta_executable, self.ddg_structure(),
+            max_workers=self.rosetta_workers, timeout=self.rosetta_timeout,
+            scratch_root=self.data_dir / "rosetta_scratch", crop=self.rosetta_crop,
+        )
+        return run_journaled(
+            executor, read_mutfile(mutfile_path), self.rosetta_journal,
+            self._rosetta_inputs(executor), self.rosetta_retry,
+        )
+    
+    @instrumented("structure_prep")
+    def ddg_structure(self, force_refresh: bool = False) -> Path:
+        """Structure the ddG jobs start from: the prepared wild type, or the raw model"""
+        self._ensure_structure(self.pdb_file)
+        if not self.prepare_wt:
+            return Path(self.pdb_file)
+        try:
+            return self.structure_prep.prepare(self.pdb_file, force_refresh=force_refresh)
+        except FileNotFoundError as e:
+            logger.warning(f"{e}; running ddG on the unprepared {self.pdb_file}")
+            return Path(self.pdb_file)
+    
+    def _rosetta_inputs(self, executor: RosettaDDGExecutor) -> Dict:
+        """Everything besides the mutation that determines a journaled ddG value"""
+        return {
+            "structure": self._source_identity(executor.structure),
+            "executable": self._source_identity(executor.executable),
+            "iterations": executor.iterations,
+            "extra_args": executor.extra_args,
+            "crop": executor.crop.options() if executor.crop is not None else None,
+        }
+    
+    def rosetta_progress(self, mutfile_path: Optional[Path] = None) -> pd.DataFrame:
+        """ddG results table materialized from the journal, usable while a run is in progress"""
+        mutfile_path = mutfile_path or self.data_dir / "top_variants_mutfile.txt"
+        structure = self.structure_prep.cached(self.pdb_file) if self.prepare_wt else None
+        executor = RosettaDDGExecutor(self.rosetta_executable, structure or self.pdb_file,
+                                      crop=self.rosetta_crop)
+        tasks = read_mutfile(mutfile_path)
+        context = self._rosetta_inputs(executor)
+        return self.rosetta_journal.materialize(
+            tasks, [task_inputs_hash(task, context) for task in tasks]
+        )
     
     def _parse_rosetta_scorefile(self, score_file: str) -> float:
         """Parse Rosetta score file to extract ΔΔG"""
-        try:
-            with open(score_file, 'r') as f:
-                lines = f.readlines()
-            
-            # Find the data line (skip header)
-            for line in lines:
-                if line.startswith('SCORE:') and 'ddG' in line:
-                    parts = line.split()
-                    # The ddG value is typically in a specific column
-                    # This may need adjustment based on exact Rosetta output format
-                    for i, part in enumerate(parts):
-                        if part == 'ddG' and i + 1 < len(parts):
-                            return float(parts[i + 1])
-            
-            # Fallback: try to find numeric values
-            for line in lines[1:]:  # Skip header
-                if not line.startswith('#') and line.strip():
-                    parts = line.split()
-                    if len(parts) >= 3:
-                        try:
-                            return float(parts[2])  # Assuming ddG is 3rd column
-                        except ValueError:
-                            continue
-            
-            return np.nan
-            
-        except Exception as e:
-            logger.error(f"Error parsing score file {score_file}: {e}")
-            return np.nan
+        return parse_ddg_scorefile(score_file)
     
-    def combine_data(self) -> pd.DataFrame:
+    def combined_cache_key(self) -> str:
+        """Cache key of the combined table, chained from its inputs' keys"""
+        rosetta_file = self.results_dir / "rosetta_ddg_results.parquet"
+        sources = {
+            "clinvar": self.clinvar_cache_key(),
+            "alphamissense": self.alphamissense_cache_key(),
+            "plddt": self.plddt_cache_key(self.pdb_file),
+            "features": self.features_cache_key(self.pdb_file),
+            "rosetta": self.cache.file_identity(rosetta_file) if rosetta_file.exists() else None,
+        }
+        return self.cache.make_key(
+            "combined", sources, {"gene": self.gene},
+            code_version(notation, dedup, MYH7VariantAnalyzer._combine),
+        )
+    
+    @instrumented("combine")
+    def combine_data(self, force_refresh: bool = False) -> pd.DataFrame:
         """Combine all data sources into master dataframe"""
+        # The structure must be on disk before its hash can key the pLDDT stage
+        self._ensure_structure(self.pdb_file)
+        
+        combined = self.cache.cached_table(
+            "combined", self._combine, self.combined_cache_key(),
+            schema="combined", ttl=self.cache_ttls["combined"], force_refresh=force_refresh,
+        )
+        
+        # Store for later use
+        self._combined_df = combined
+        
+        # Save combined dataset
+        output_file = self.results_dir / f"{self.gene}_variants_comprehensive.parquet"
+        write_table(combined, output_file, "combined")
+        export_csv(combined, output_file.with_suffix(".csv"))
+        
+        logger.info(f"Combined dataset saved with {len(combined)} variants")
+        return combined
+    
+    def _combine(self) -> pd.DataFrame:
         logger.info("Combining all variant data sources...")
         
         # Fetch all data
         clinvar_df = self.fetch_clinvar_variants()
-        alphamisense_df = self.fetch_alphamisense_scores()
+        alphamisense_df = self.fetch_alphamisense_scores(columns=["VariantKey", "score", "class"])
         plddt_df = self.extract_alphafold_plddt()
         
-        # Start with ClinVar variants
-        combined = clinvar_df.copy()
+        note(rows_in=len(clinvar_df))
+        
+        # Start with ClinVar variants; all variant-level joins use the integer key
+        combined = self._with_variant_key(clinvar_df)
         
         # Merge AlphaMissense scores
+        alphamisense_df = self._with_variant_key(alphamisense_df)
+        alphamisense_df = alphamisense_df[alphamisense_df["VariantKey"] != INVALID_KEY]
         combined = combined.merge(
-            alphamisense_df.rename(columns={"score": "AlphaMissense_score", "class": "AlphaMissense_class"}),
-            on="ProteinChange", how="left"
+            alphamisense_df[["VariantKey", "score", "class"]].rename(
+                columns={"score": "AlphaMissense_score", "class": "AlphaMissense_class"}
+            ),
+            on="VariantKey", how="left"
         )
         
-        # Merge pLDDT scores
+        # Merge pLDDT scores and structural features
         combined = combined.merge(plddt_df, on="Residue", how="left")
+        combined = combined.merge(self.extract_structural_features(), on="Residue", how="left")
         
         # Load existing Rosetta data if available
-        rosetta_file = self.results_dir / "rosetta_ddg_results.csv"
+        rosetta_file = self.results_dir / "rosetta_ddg_results.parquet"
         if rosetta_file.exists():
-            rosetta_df = pd.read_csv(rosetta_file)
-            combined = combined.merge(
-                rosetta_df[["ProteinChange", "Rosetta_ddG"]], 
-                on="ProteinChange", how="left"
-            )
+            rosetta_df = read_table(rosetta_file, columns=["VariantKey", "Rosetta_ddG"])
+            rosetta_df = rosetta_df[rosetta_df["VariantKey"] != INVALID_KEY]
+            # Replicate ddG values become mean / std / n, broadcast to every submission row
+            combined = broadcast(aggregate_replicates(rosetta_df, "Rosetta_ddG"), combined)
         
-        # Store for later use
-        self._combined_df = combined
+        return apply_schema(combined, "combined")
+    
+    def saturation_cache_key(self, cds: Optional[str] = None) -> str:
+        """Cache key of the saturation landscape, chained from its inputs' keys"""
+        rosetta_file = self.results_dir / "rosetta_ddg_results.parquet"
+        sources = {
+            "clinvar": self.clinvar_cache_key(),
+            "alphamissense": self.alphamissense_cache_key(),
+            "plddt": self.plddt_cache_key(self.pdb_file),
+            "features": self.features_cache_key(self.pdb_file),
+            "rosetta": self.cache.file_identity(rosetta_file) if rosetta_file.exists() else None,
+        }
+        return self.cache.make_key(
+            "saturation", sources, {"gene": self.gene, "cds": cds},
+            code_version(saturation, variant_matrix, dedup, MYH7VariantAnalyzer._saturation),
+        )
+    
+    @instrumented("saturation")
+    def saturation_landscape(self, cds: Optional[str] = None,
+                             force_refresh: bool = False) -> pd.DataFrame:
+        """All 19 substitutions at every position, scored and flagged for SNV reachability
+        
+        Writes the long table and a position x amino-acid AlphaMissense matrix
+        for heatmaps. Pass the coding sequence to use actual codons for SNV
+        reachability; otherwise any codon of the wild-type residue counts.
+        """
+        self._ensure_structure(self.pdb_file)
+        
+        landscape = self.cache.cached_table(
+            "saturation", lambda: self._saturation(cds), self.saturation_cache_key(cds),
+            schema="saturation", ttl=self.cache_ttls["saturation"], force_refresh=force_refresh,
+        )
         
-        # Save combined dataset
-        output_file = self.results_dir / "MYH7_variants_comprehensive.csv"
-        combined.to_csv(output_file, index=False)
+        output_file = self.results_dir / f"{self.gene}_saturation.parquet"
+        write_table(landscape, output_file, "saturation")
+        export_csv(landscape, output_file.with_suffix(".csv"))
         
-        logger.info(f"Combined dataset saved with {len(combined)} variants")
-        return combined
+        # Memory-mappable array store for workers, plus the heatmap export
+        matrix = self.saturation_matrix(landscape)
+        matrix.save(self.results_dir / f"{self.gene}_variant_matrix")
+        heatmap = matrix.heatmap("AlphaMissense_score")
+        matrix_file = self.results_dir / f"{self.gene}_saturation_matrix.parquet"
+        write_table(heatmap, matrix_file)
+        export_csv(heatmap, matrix_file.with_suffix(".csv"))
+        
+        logger.info(
+            f"Saturation landscape: {len(landscape)} substitutions at {matrix.n_positions} positions"
+        )
+        return landscape
     
-    def create_analysis_visualizations(self, data: pd.DataFrame) -> None:
-        """Create comprehensive visualization suite"""
-        logger.info("Creating analysis visualizations...")
+    @staticmethod
+    def saturation_matrix(landscape: pd.DataFrame) -> VariantMatrix:
+        """VariantMatrix view of a saturation long table"""
+        variant = [c for c in saturation.VARIANT_COLUMNS if c in landscape.columns]
+        labels = [c for c in saturation.LABEL_COLUMNS if c in landscape.columns]
+        key_columns = ("Residue", "WT", "Mut", "ProteinChange", "VariantKey")
+        residue = [c for c in landscape.columns if c not in (*variant, *labels, *key_columns)]
+        return VariantMatrix.from_frame(landscape, variant, residue, labels)
+    
+    def _saturation(self, cds: Optional[str] = None) -> pd.DataFrame:
+        logger.info("Building saturation mutagenesis landscape...")
         
-        plt.style.use('seaborn-v0_8')
-        fig_dir = self.results_dir / "figures"
-        fig_dir.mkdir(exist_ok=True)
+        am = self.fetch_alphamisense_scores(columns=["VariantKey", "score", "class"])
+        clinvar = self._with_variant_key(
+            self.fetch_clinvar_variants(columns=["ProteinChange", "ClinicalSignificance"])
+        )
+        plddt = self.extract_alphafold_plddt()
+        features = self.extract_structural_features()
         
-        # 1. AlphaMissense vs pLDDT
-        fig, ax = plt.subplots(figsize=(10, 6))
-        scatter = ax.scatter(
-            data["pLDDT"], data["AlphaMissense_score"], 
-            alpha=0.6, c=data["Residue"], cmap="viridis"
+        am_keys = am["VariantKey"].to_numpy()
+        wt = self._wild_type_codes(am_keys)
+        
+        matrix = VariantMatrix(wt)
+        matrix.set_variant_score("AlphaMissense_score", am_keys, am["score"].to_numpy())
+        matrix.set_variant_score(
+            "ClinVar_observed", clinvar["VariantKey"].to_numpy(), np.ones(len(clinvar), dtype=bool),
+            dtype=bool, fill=False,
         )
-        ax.set_xlabel("AlphaFold Confidence (pLDDT)")
-        ax.set_ylabel("AlphaMissense Pathogenicity Score")
-        ax.set_title("Structural Confidence vs Pathogenicity")
-        plt.colorbar(scatter, label="Residue Position")
-        plt.tight_layout()
-        plt.savefig(fig_dir / "plddt_vs_alphamisense.png", dpi=300)
-        plt.close()
-        
-        # 2. Rosetta ΔΔG analysis (if available)
-        if "Rosetta_ddG" in data.columns and data["Rosetta_ddG"].notna().any():
-            fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 6))
-            
-            # ΔΔG vs AlphaMissense
-            mask = data["Rosetta_ddG"].notna()
-            ax1.scatter(
-                data.loc[mask, "AlphaMissense_score"], 
-                data.loc[mask, "Rosetta_ddG"], 
-                alpha=0.7
+        matrix.variant["SNV_reachable"] = saturation.snv_reachable(wt, cds)
+        rosetta_file = self.results_dir / "rosetta_ddg_results.parquet"
+        if rosetta_file.exists():
+            rosetta_df = aggregate_replicates(
+                read_table(rosetta_file, columns=["VariantKey", "Rosetta_ddG"]), "Rosetta_ddG"
             )
-            ax1.set_xlabel("AlphaMissense Score")
-            ax1.set_ylabel("Rosetta ΔΔG (REU)")
-            ax1.set_title("Pathogenicity vs Structural Stability")
-            ax1.grid(True, alpha=0.3)
-            
-            # ΔΔG vs pLDDT
-            ax2.scatter(
-                data.loc[mask, "pLDDT"], 
-                data.loc[mask, "Rosetta_ddG"], 
-                alpha=0.7, c="orange"
+            matrix.set_variant_score(
+                "Rosetta_ddG", rosetta_df["VariantKey"].to_numpy(), rosetta_df["Rosetta_ddG"].to_numpy()
             )
-            ax2.set_xlabel("pLDDT")
-            ax2.set_ylabel("Rosetta ΔΔG (REU)")
-            ax2.set_title("Confidence vs Stability Change")
-            ax2.grid(True, alpha=0.3)
-            
-            plt.tight_layout()
-            plt.savefig(fig_dir / "rosetta_analysis.png", dpi=300)
-            plt.close()
+        matrix.set_labels("AlphaMissense_class", am_keys, am["class"])
+        matrix.set_labels(
+            "ClinicalSignificance", clinvar["VariantKey"].to_numpy(), clinvar["ClinicalSignificance"]
+        )
         
-        # 3. Clinical significance distribution
-        if "ClinicalSignificance" in data.columns:
-            fig, ax = plt.subplots(figsize=(12, 6))
-            
-            # Clean up clinical significance categories
-            clinical_clean = data["ClinicalSignificance"].fillna("Unknown")
-            clinical_counts = clinical_clean.value_counts()
-            
-            ax.bar(range(len(clinical_counts)), clinical_counts.values)
-            ax.set_xticks(range(len(clinical_counts)))
-            ax.set_xticklabels(clinical_counts.index, rotation=45, ha='right')
-            ax.set_ylabel("Number of Variants")
-            ax.set_title("Distribution of Clinical Significance")
-            
-            plt.tight_layout()
-            plt.savefig(fig_dir / "clinical_significance_distribution.png", dpi=300)
-            plt.close()
+        matrix.set_residue_score("pLDDT", plddt["Residue"], plddt["pLDDT"])
+        for column in features.columns:
+            if column in ("Residue", "Nearest_site"):
+                continue
+            matrix.set_residue_score(
+                column, features["Residue"], features[column].to_numpy(dtype=np.float32)
+            )
+        
+        landscape = matrix.to_frame()
+        return apply_schema(landscape, "saturation")
+    
+    def _wild_type_codes(self, am_keys: Optional[np.ndarray] = None) -> np.ndarray:
+        """Wild-type code per position from AlphaMissense, gaps filled from the structure"""
+        if am_keys is None:
+            am_keys = self.fetch_alphamisense_scores(columns=["VariantKey"])["VariantKey"].to_numpy()
+        ca = scan_structure(self.pdb_file, atoms=("CA",))
+        n = max(
+            int(notation.decode_keys(am_keys[am_keys >= 0])[0].max()) if (am_keys >= 0).any() else 0,
+            int(ca["Residue"].max()) if len(ca) else 0,
+        )
+        wt = saturation.wild_type_from_keys(am_keys, n)
+        wt_structure = saturation.wild_type_from_residues(ca["Residue"], ca["ResName"], n)
+        return np.where(wt >= 0, wt, wt_structure)
+    
+    def wild_type_sequence(self) -> str:
+        """Reference protein sequence reconstructed from AlphaMissense and the structure"""
+        self._ensure_structure(self.pdb_file)
+        wt = self._wild_type_codes()
+        if (wt < 0).any():
+            raise ValueError(
+                f"Wild type unknown at {(wt < 0).sum()} positions (first {np.flatnonzero(wt < 0)[0] + 1}); "
+                "pass the reference sequence explicitly"
+            )
+        return "".join(notation.ONE_LETTER[wt])
+    
+    @instrumented("boltz_batch")
+    def prepare_boltz_batch(self, top_n: Optional[int] = None, sequence: Optional[str] = None,
+                            plan: Optional[ShardPlan] = None, out_dir: Optional[Path] = None,
+                            **job_options) -> pd.DataFrame:
+        """Sharded Boltz-2 inputs for the top unique variants by AlphaMissense score
+        
+        Every variant's wild-type residue is checked against the reference
+        (sequence, a FASTA/YAML path or string; by default reconstructed from
+        AlphaMissense and the structure). Writes shard directories, manifest.csv
+        and a SLURM array script predicting one shard per task.
+        """
+        if not hasattr(self, '_combined_df') or self._combined_df is None:
+            logger.error("Must combine data first before preparing Boltz inputs")
+            raise ValueError("Run combine_data() first")
         
-        logger.info(f"Visualizations saved to {fig_dir}")
+        reference = read_sequence(sequence) if sequence is not None else self.wild_type_sequence()
+        unique, _ = unique_variants(self._combined_df[self._combined_df["VariantKey"] != INVALID_KEY])
+        ranked = unique.sort_values("AlphaMissense_score", ascending=False, kind="stable")
+        if top_n is not None:
+            ranked = ranked.head(top_n)
+        
+        out_dir = Path(out_dir) if out_dir is not None else self.results_dir / "boltz_shards"
+        plan = plan or ShardPlan()
+        manifest = write_shards(ranked, reference, out_dir, plan)
+        n_shards = int(manifest["Shard"].max()) + 1 if len(manifest) else 0
+        script = write_job_script(out_dir, n_shards, plan, **job_options)
+        logger.info(f"Boltz batch ready: sbatch {script}")
+        return manifest
+    
+    @instrumented("figures")
+    def create_analysis_visualizations(self, data: pd.DataFrame, max_workers: Optional[int] = None,
+                                       force: bool = False) -> Dict[str, str]:
+        """Create comprehensive visualization suite (unchanged figures are not redrawn)"""
+        logger.info("Creating analysis visualizations...")
+        fig_dir = self.results_dir / "figures"
+        # Large tables are drawn as pre-binned densities, figures render in parallel
+        return render_figures(analysis_figures(), data, fig_dir, max_workers=max_workers, force=force)
     
+    @instrumented("report")
     def generate_summary_report(self, data: pd.DataFrame) -> str:
         """Generate comprehensive analysis summary"""
-        report = []
-        report.append("# MYH7 Variant Analysis Summary Report\n")
-        
-        # Basic statistics
-        report.append(f"## Dataset Overview")
-        report.append(f"- Total variants analyzed: {len(data)}")
-        report.append(f"- Variants with AlphaMissense scores: {data['AlphaMissense_score'].notna().sum()}")
-        report.append(f"- Variants with pLDDT scores: {data['pLDDT'].notna().sum()}")
-        
-        if "Rosetta_ddG" in data.columns:
-            report.append(f"- Variants with Rosetta ΔΔG: {data['Rosetta_ddG'].notna().sum()}")
-        
-        # Score distributions
-        report.append(f"\n## Score Distributions")
-        if "AlphaMissense_score" in data.columns:
-            am_stats = data["AlphaMissense_score"].describe()
-            report.append(f"- AlphaMissense: mean={am_stats['mean']:.3f}, std={am_stats['std']:.3f}")
-        
-        if "pLDDT" in data.columns:
-            plddt_stats = data["pLDDT"].describe()
-            report.append(f"- pLDDT: mean={plddt_stats['mean']:.1f}, std={plddt_stats['std']:.1f}")
-        
-        # Top pathogenic variants
-        if "AlphaMissense_score" in data.columns:
-            report.append(f"\n## Top 10 Most Pathogenic Variants (AlphaMissense)")
-            top_pathogenic = data.nlargest(10, "AlphaMissense_score")
-            for _, row in top_pathogenic.iterrows():
-                report.append(f"- {row['ProteinChange']}: {row['AlphaMissense_score']:.3f}")
-        
-        # Correlations
-        if "Rosetta_ddG" in data.columns and data["Rosetta_ddG"].notna().sum() > 5:
-            corr = data["AlphaMissense_score"].corr(data["Rosetta_ddG"])
-            report.append(f"\n## Correlations")
-            report.append(f"- AlphaMissense vs Rosetta ΔΔG: r={corr:.3f}")
-        
-        report_text = "\n".join(report)
-        
-        # Save report
-        report_file = self.results_dir / "analysis_summary_report.md"
-        with open(report_file, 'w') as f:
-            f.write(report_text)
-        
-        logger.info(f"Summary report saved to {report_file}")
-        return report_text
+        return write_summary_report(data, self.results_dir, self.gene)
 
 def main():
-    """Main analysis pipeline"""
-    analyzer = MYH7VariantAnalyzer()
-    
-    # Run complete analysis
-    combined_data = analyzer.combine_data()
-    
-    # Create visualizations
-    analyzer.create_analysis_visualizations(combined_data)
+    """Main analysis pipeline; unattended, see `python -m src.cli --help` for single steps"""
+    from .cli import main as cli_main
     
-    # Generate summary report
-    report = analyzer.generate_summary_report(combined_data)
-    print(report)
-    
-    # Optionally run Rosetta analysis for top variants
-    print("\nRun Rosetta ΔΔG analysis for top 20 variants? (y/n): ", end="")
-    if input().lower().startswith('y'):
-        rosetta_results = analyzer.run_rosetta_ddg_analysis(top_n=20)
-        print(f"Rosetta analysis complete. Results: {len(rosetta_results)} variants processed")
-        
-        # Re-combine with Rosetta results and update visualizations
-        updated_data = analyzer.combine_data()
-        analyzer.create_analysis_visualizations(updated_data)
-        analyzer.generate_summary_report(updated_data)
+    cli_main(sys.argv[1:] or ["run"])
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    main()
@@ -0,0 +1,254 @@
+"""
+Array-backed variant score store
+VariantMatrix keeps one dense (n_positions, 20) array per variant-level score
+(NaN where missing), one (n_positions,) array per residue-level score and
+category codes for label columns, all indexed by (position - 1, amino-acid
+code). Lookups are O(1) for one variant and a single fancy-index for arrays of
+variant keys. The store persists as a directory of .npy files that workers can
+memory-map instead of copying.
+"""
+
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
+import pandas as pd
+
+from .notation import AMINO_ACIDS, N_AA, THREE_LETTER, decode_keys, encode_keys
+
+logger = logging.getLogger(__name__)
+
+META_FILE = "matrix.json"
+FORMAT_VERSION = 1
+
+AA_INDEX = {aa: i for i, aa in enumerate(AMINO_ACIDS)}
+
+PathLike = Union[str, Path]
+
+
+def _aa_index(aa: Union[str, int]) -> int:
+    return AA_INDEX[aa] if isinstance(aa, str) else int(aa)
+
+
+class VariantMatrix:
+    """Dense per-(position, amino acid) and per-position score arrays for one protein"""
+
+    def __init__(self, wt: np.ndarray):
+        self.wt = np.asarray(wt, dtype=np.int16)
+        self.variant: Dict[str, np.ndarray] = {}
+        self.residue: Dict[str, np.ndarray] = {}
+        self.labels: Dict[str, Tuple[np.ndarray, List[str]]] = {}
+
+    @property
+    def n_positions(self) -> int:
+        return len(self.wt)
+
+    def __repr__(self) -> str:
+        return (f"VariantMatrix({self.n_positions} positions; variant={list(self.variant)}, "
+                f"residue={list(self.residue)}, labels={list(self.labels)})")
+
+    # ------------------------------------------------------------------
+    # Filling
+    # ------------------------------------------------------------------
+    def _cells(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(row, column, valid) indices for variant keys"""
+        keys = np.asarray(keys, dtype=np.int64)
+        pos, _, mut = decode_keys(keys)
+        valid = (keys >= 0) & (pos >= 1) & (pos <= self.n_positions)
+        return np.where(valid, pos - 1, 0), np.where(valid, mut, 0), valid
+
+    def set_variant_score(self, name: str, keys: np.ndarray, values: np.ndarray,
+                          dtype=np.float32, fill=np.nan) -> np.ndarray:
+        """Scatter per-variant values into a new (n_positions, 20) array"""
+        array = np.full((self.n_positions, N_AA), fill, dtype=dtype)
+        rows, cols, valid = self._cells(keys)
+        array[rows[valid], cols[valid]] = np.asarray(values)[valid]
+        self.variant[name] = array
+        return array
+
+    def set_residue_score(self, name: str, residues: np.ndarray, values: np.ndarray,
+                          dtype=np.float32, fill=np.nan) -> np.ndarray:
+        """Scatter per-residue values into a new (n_positions,) array"""
+        array = np.full(self.n_positions, fill, dtype=dtype)
+        residues = np.asarray(residues, dtype=np.int64)
+        valid = (residues >= 1) & (residues <= self.n_positions)
+        array[residues[valid] - 1] = np.asarray(values)[valid]
+        self.residue[name] = array
+        return array
+
+    def set_labels(self, name: str, keys: np.ndarray, labels: Sequence,
+                   categories: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Store a per-variant label column as int16 category codes (-1 missing)"""
+        labels = pd.Categorical(labels, categories=categories)
+        codes = np.full((self.n_positions, N_AA), -1, dtype=np.int16)
+        rows, cols, valid = self._cells(keys)
+        codes[rows[valid], cols[valid]] = labels.codes[valid]
+        self.labels[name] = (codes, [str(c) for c in labels.categories])
+        return codes
+
+    # ------------------------------------------------------------------
+    # Lookup
+    # ------------------------------------------------------------------
+    def get(self, name: str, position: int, aa: Union[str, int]):
+        """One value by (1-based position, amino acid); residue scores ignore the amino acid"""
+        if name in self.residue:
+            return self.residue[name][position - 1]
+        if name in self.labels:
+            codes, categories = self.labels[name]
+            code = codes[position - 1, _aa_index(aa)]
+            return categories[code] if code >= 0 else None
+        return self.variant[name][position - 1, _aa_index(aa)]
+
+    def lookup(self, name: str, keys: np.ndarray) -> np.ndarray:
+        """Values for an array of variant keys; NaN (or -1 codes) for invalid keys"""
+        rows, cols, valid = self._cells(keys)
+        if name in self.residue:
+            values = self.residue[name][rows].astype(np.float32)
+            values[~valid] = np.nan
+            return values
+        if name in self.labels:
+            codes = self.labels[name][0][rows, cols]
+            return np.where(valid, codes, -1).astype(np.int16)
+        array = self.variant[name]
+        values = array[rows, cols]
+        if not valid.all():
+            values = values.astype(np.float32) if values.dtype == bool else values.copy()
+            values[~valid] = np.nan if values.dtype.kind == "f" else 0
+        return values
+
+    def lookup_labels(self, name: str, keys: np.ndarray) -> pd.Categorical:
+        codes = self.lookup(name, keys)
+        return pd.Categorical.from_codes(codes, categories=self.labels[name][1])
+
+    # ------------------------------------------------------------------
+    # DataFrame conversion
+    # ------------------------------------------------------------------
+    def all_keys(self, include_wt: bool = False) -> np.ndarray:
+        """Keys of every substitution at positions with a known wild type"""
+        pos = np.repeat(np.arange(1, self.n_positions + 1), N_AA)
+        wt = np.repeat(self.wt, N_AA)
+        mut = np.tile(np.arange(N_AA, dtype=np.int16), self.n_positions)
+        keep = (wt >= 0) & (include_wt | (wt != mut))
+        return encode_keys(pos[keep], wt[keep], mut[keep])
+
+    def to_frame(self, keys: Optional[np.ndarray] = None,
+                 columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+        """Long table (one row per key, default every substitution) with the requested columns"""
+        keys = self.all_keys() if keys is None else np.asarray(keys, dtype=np.int64)
+        pos, wt, mut = decode_keys(keys)
+        valid = keys >= 0
+        wt_codes = np.where(valid, wt, -1)
+        mut_codes = np.where(valid, mut, -1)
+
+        table = {
+            "Residue": pos.astype(np.int32),
+            "WT": pd.Categorical.from_codes(wt_codes, categories=list(AMINO_ACIDS)),
+            "Mut": pd.Categorical.from_codes(mut_codes, categories=list(AMINO_ACIDS)),
+            "ProteinChange": pd.array(
+                np.where(valid, np.char.add(np.char.add(THREE_LETTER[np.where(valid, wt, 0)], pos.astype(str)),
+                                            THREE_LETTER[np.where(valid, mut, 0)]), None),
+                dtype="string",
+            ),
+            "VariantKey": keys,
+        }
+        wanted = list(columns) if columns is not None else [
+            *self.variant, *self.labels, *self.residue,
+        ]
+        for name in wanted:
+            table[name] = self.lookup_labels(name, keys) if name in self.labels else self.lookup(name, keys)
+        return pd.DataFrame(table)
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, variant_columns: Sequence[str] = (),
+                   residue_columns: Sequence[str] = (), label_columns: Sequence[str] = (),
+                   n_positions: Optional[int] = None) -> "VariantMatrix":
+        """Build from a VariantKey-keyed table such as the combined dataset"""
+        keys = df["VariantKey"].to_numpy(dtype=np.int64)
+        valid = keys >= 0
+        pos, wt, _ = decode_keys(keys[valid])
+        n_positions = n_positions or (int(pos.max()) if len(pos) else 0)
+
+        wt_seq = np.full(n_positions, -1, dtype=np.int16)
+        inside = pos <= n_positions
+        wt_seq[pos[inside] - 1] = wt[inside]
+        matrix = cls(wt_seq)
+
+        for column in variant_columns:
+            values = df[column]
+            dtype = bool if values.dtype == bool else np.float32
+            fill = False if dtype is bool else np.nan
+            matrix.set_variant_score(column, keys, values.to_numpy(dtype=dtype, na_value=fill),
+                                     dtype=dtype, fill=fill)
+        for column in label_columns:
+            categories = df[column].cat.categories if isinstance(df[column].dtype, pd.CategoricalDtype) else None
+            matrix.set_labels(column, keys, df[column], categories)
+        for column in residue_columns:
+            residues = df["Residue"].to_numpy(dtype=np.int64)
+            matrix.set_residue_score(column, residues, df[column].to_numpy(dtype=np.float32, na_value=np.nan))
+        return matrix
+
+    def heatmap(self, name: str, include_wt: bool = False) -> pd.DataFrame:
+        """Position x amino-acid frame of one variant score, for heatmaps"""
+        matrix = self.variant[name].astype(np.float32)
+        if not include_wt:
+            has_wt = self.wt >= 0
+            matrix[np.flatnonzero(has_wt), self.wt[has_wt]] = np.nan
+        frame = pd.DataFrame(matrix, columns=list(AMINO_ACIDS))
+        frame.insert(0, "WT", pd.Categorical.from_codes(self.wt, categories=list(AMINO_ACIDS)))
+        frame.insert(0, "Residue", np.arange(1, self.n_positions + 1, dtype=np.int32))
+        return frame
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+    def save(self, directory: PathLike) -> Path:
+        """Write every array as .npy plus a JSON manifest; the manifest is written last"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        arrays = {"wt": self.wt}
+        arrays.update({f"variant.{name}": a for name, a in self.variant.items()})
+        arrays.update({f"residue.{name}": a for name, a in self.residue.items()})
+        arrays.update({f"labels.{name}": codes for name, (codes, _) in self.labels.items()})
+
+        for stem, array in arrays.items():
+            tmp_path = directory / f"{stem}.npy.tmp"
+            with open(tmp_path, "wb") as f:
+                np.save(f, np.ascontiguousarray(array))
+            os.replace(tmp_path, directory / f"{stem}.npy")
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "n_positions": self.n_positions,
+            "variant": list(self.variant),
+            "residue": list(self.residue),
+            "labels": {name: categories for name, (_, categories) in self.labels.items()},
+        }
+        tmp_path = directory / f"{META_FILE}.tmp"
+        tmp_path.write_text(json.dumps(meta, indent=2))
+        os.replace(tmp_path, directory / META_FILE)
+        return directory
+
+    @classmethod
+    def load(cls, directory: PathLike, mmap: bool = True) -> "VariantMatrix":
+        """Open a saved matrix; with mmap the arrays are read-only views of the files"""
+        directory = Path(directory)
+        meta = json.loads((directory / META_FILE).read_text())
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported VariantMatrix format {meta.get('version')} in {directory}")
+        mode = "r" if mmap else None
+
+        matrix = cls(np.load(directory / "wt.npy", mmap_mode=mode))
+        for name in meta["variant"]:
+            matrix.variant[name] = np.load(directory / f"variant.{name}.npy", mmap_mode=mode)
+        for name in meta["residue"]:
+            matrix.residue[name] = np.load(directory / f"residue.{name}.npy", mmap_mode=mode)
+        for name, categories in meta["labels"].items():
+            matrix.labels[name] = (np.load(directory / f"labels.{name}.npy", mmap_mode=mode), categories)
+        return matrix
+
+    @staticmethod
+    def exists(directory: PathLike) -> bool:
+        return (Path(directory) / META_FILE).exists()
@@ -0,0 +1,44 @@
+"""
+stats_engine edge cases
+
+    python -m pytest tests
+"""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.report import summary_report
+from src.stats_engine import compute_stats, variant_stats_spec
+
+
+@pytest.fixture
+def variants():
+    return pd.DataFrame({
+        "GeneSymbol": ["MYH7", "MYH7", "MYBPC3"],
+        "ProteinChange": ["Arg403Gln", "Arg719Trp", "Glu258Lys"],
+        "AlphaMissense_score": [0.95, 0.85, 0.40],
+        "pLDDT": [92.0, 88.0, 45.0],
+        "Rosetta_ddG": [2.1, -1.5, 0.3],
+    })
+
+
+@pytest.mark.parametrize("by", [None, "GeneSymbol"])
+def test_empty_table(variants, by):
+    stats = compute_stats(variants.iloc[:0], variant_stats_spec(), by=by)
+    assert stats.groups == ([] if by else ["all"])
+    assert stats.count("am_high") == 0
+    assert np.isnan(stats.corr("AlphaMissense_score", "Rosetta_ddG"))
+    assert stats.top_rows("pathogenic").empty
+
+
+def test_empty_grouped_report(variants):
+    assert "## By GeneSymbol" in summary_report(variants.iloc[:0], "MYH7", by="GeneSymbol")
+
+
+def test_grouped_counts(variants):
+    stats = compute_stats(variants, variant_stats_spec(), by="GeneSymbol")
+    assert stats.groups == ["MYBPC3", "MYH7"]
+    assert stats.count("am_high", "MYH7") == 2
+    assert stats.count("plddt_low", "MYBPC3") == 1
+    assert list(stats.top_rows("pathogenic", "MYH7")["ProteinChange"]) == ["Arg403Gln", "Arg719Trp"]